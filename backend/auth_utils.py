@@ -1,12 +1,63 @@
+import importlib
 import os
+import threading
 import time
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 import jwt
 
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret-change-me")
 JWT_ALG = "HS256"
 JWT_TTL_SECONDS = int(os.getenv("JWT_TTL_SECONDS", "86400"))
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of tokens that already passed ``jwt.decode``.
+
+    Each entry remembers the token's ``exp`` and is dropped once it passes, so a
+    cached token is never accepted for longer than the JWT itself allows.
+    ``get_current_address`` is a sync dependency and runs on the threadpool,
+    hence the lock.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str, now: Optional[float] = None) -> Optional[str]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            sub, exp = entry
+            if exp <= now:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return sub
+
+    def put(self, token: str, sub: str, exp: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (sub, exp)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = VerifiedTokenCache(JWT_CACHE_MAX_ENTRIES)
 
 
 def create_jwt(address: str) -> str:
@@ -21,10 +72,34 @@ def create_jwt(address: str) -> str:
 
 
 def verify_jwt(token: str) -> Optional[str]:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
-        return str(payload.get("sub")) if payload.get("sub") else None
     except Exception:
         return None
+    sub = str(payload.get("sub")) if payload.get("sub") else None
+    exp = payload.get("exp")
+    if sub and isinstance(exp, (int, float)):
+        token_cache.put(token, sub, float(exp))
+    return sub
+
+
+def load_crypto() -> None:
+    """Import the eth_account stack (a few hundred ms) from the startup
+    warm-up, so the first ``/auth/verify`` does not pay for it; call sites
+    import it locally and this module never does at import time."""
+    importlib.import_module("eth_account.messages")
+
+
+def recover_message_signer(message: str, signature: str) -> str:
+    """Recover the address that signed an EIP-191 personal message.
 
+    Runs secp256k1 public-key recovery, which takes milliseconds of pure CPU;
+    call it through an executor rather than on the event loop.
+    """
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
 
+    return Account.recover_message(encode_defunct(text=message), signature=signature)
@@ -0,0 +1,132 @@
+"""Auth throughput benchmark.
+
+Simulates a login burst (``/auth/nonce`` + client-side signing + ``/auth/verify``
+for many wallets at once) and measures verify latency, logins/sec and the
+event-loop lag the burst causes. Also compares bearer-token verification with
+and without the verified-token cache::
+
+    cd backend
+    python -m benchmarks.bench_auth --wallets 200 --concurrency 50 --executor thread
+"""
+import os
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'bench_auth.sqlite')}",
+)
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import time  # noqa: E402
+from typing import List  # noqa: E402
+
+from eth_account import Account  # noqa: E402
+from eth_account.messages import encode_defunct  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+import auth_utils  # noqa: E402
+import routes.auth as auth_routes  # noqa: E402
+from benchmarks.common import SampledLagMonitor, percentiles, write_results  # noqa: E402
+from db import Base, engine  # noqa: E402
+from main import app  # noqa: E402
+
+
+def _sign(message: str, key: bytes) -> str:
+    return Account.sign_message(encode_defunct(text=message), key).signature.hex()
+
+
+async def _login(client: AsyncClient, account, slots: asyncio.Semaphore, verify_latencies: List[float]) -> bool:
+    async with slots:
+        nonce = await client.post("/auth/nonce", json={"address": account.address})
+        # Sign off-loop so client work does not pollute the server-side lag numbers.
+        signature = await asyncio.to_thread(_sign, nonce.json()["message"], account.key)
+        started = time.perf_counter()
+        res = await client.post("/auth/verify", json={"address": account.address, "signature": signature})
+        verify_latencies.append(time.perf_counter() - started)
+        return res.status_code == 200
+
+
+async def login_burst(wallets: int, concurrency: int) -> dict:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    accounts = [Account.create() for _ in range(wallets)]
+    verify_latencies: List[float] = []
+    slots = asyncio.Semaphore(concurrency)
+    monitor = SampledLagMonitor(0.005)
+    monitor.start()
+    started = time.perf_counter()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        outcomes = await asyncio.gather(*(_login(client, acct, slots, verify_latencies) for acct in accounts))
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+
+    return {
+        "scenario": "login_burst",
+        "wallets": wallets,
+        "concurrency": concurrency,
+        "executor": auth_routes.settings.auth_recover_executor,
+        "successful_logins": sum(outcomes),
+        "duration_seconds": round(elapsed, 3),
+        "logins_per_second": round(sum(outcomes) / elapsed, 2),
+        "verify_latency_ms": percentiles(verify_latencies, scale=1000),
+        "event_loop_lag_ms": percentiles(monitor.lags, scale=1000),
+    }
+
+
+def token_verification(iterations: int, distinct_tokens: int) -> List[dict]:
+    tokens = [auth_utils.create_jwt(Account.create().address) for _ in range(distinct_tokens)]
+    headers = [f"Bearer {token}" for token in tokens]
+    results = []
+    for cached in (False, True):
+        original_size = auth_utils.token_cache.max_entries
+        auth_utils.token_cache.clear()
+        auth_utils.token_cache.max_entries = original_size if cached else 0
+        started = time.perf_counter()
+        for idx in range(iterations):
+            auth_routes.get_current_address(headers[idx % distinct_tokens])
+        elapsed = time.perf_counter() - started
+        auth_utils.token_cache.max_entries = original_size
+        results.append(
+            {
+                "scenario": "token_verification",
+                "cache": cached,
+                "iterations": iterations,
+                "distinct_tokens": distinct_tokens,
+                "verifications_per_second": round(iterations / elapsed, 1),
+                "mean_us": round(elapsed / iterations * 1e6, 2),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wallets", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="signature recovery cap")
+    parser.add_argument("--token-iterations", type=int, default=50000)
+    parser.add_argument("--distinct-tokens", type=int, default=100)
+    parser.add_argument("--output", help="path of the JSON results file")
+    args = parser.parse_args()
+
+    auth_routes.rate_limiter.max_requests = 0
+    auth_routes.settings.auth_recover_executor = args.executor
+    if args.max_concurrency:
+        auth_routes.settings.auth_recover_max_concurrency = args.max_concurrency
+        auth_routes.reset_recover_slots()
+    auth_routes._recover_executor = auth_routes._build_recover_executor()
+
+    runs = [asyncio.run(login_burst(args.wallets, args.concurrency))]
+    runs.extend(token_verification(args.token_iterations, args.distinct_tokens))
+    for run in runs:
+        print(run)
+    path = write_results("auth", {k: v for k, v in vars(args).items() if k != "output"}, runs, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Load benchmark for BotManager and ``/ws/pnl``.
+
+Starts the fake Polymarket server, serves the real app with uvicorn, runs one
+bot loop per market and attaches websocket viewers, then reports tick rate,
+tick and phase latency percentiles, DB writes/sec and event-loop lag::
+
+    cd backend
+    python -m benchmarks.bench_bot_manager --markets 10,100,1000 --ws-clients 5 --duration 20
+
+Results are written as JSON under ``benchmarks/results/`` (or ``--output``).
+Set ``DATABASE_URL`` to benchmark against Postgres; the default is a local
+SQLite file.
+"""
+import os
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'bench_bot_manager.sqlite')}",
+)
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import time  # noqa: E402
+from collections import defaultdict  # noqa: E402
+from typing import Dict, List  # noqa: E402
+
+import uvicorn  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+from websockets.asyncio.client import connect  # noqa: E402
+
+import core.bot_manager as bot_manager_module  # noqa: E402
+from benchmarks.common import SampledLagMonitor, percentiles, write_results  # noqa: E402
+from benchmarks.fake_polymarket import FakePolymarketServer, FaultConfig  # noqa: E402
+from core.tracing import Span, Tracer  # noqa: E402
+from db import Base, SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+from models import Market, PnLTicks  # noqa: E402
+from settings import get_settings  # noqa: E402
+
+
+settings = get_settings()
+
+
+class CollectingExporter:
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+
+async def _reset_database(market_count: int) -> List[int]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(Market),
+            [
+                {"name": f"Bench {idx}", "external_id": f"bench-{idx}", "base_spread_bps": 50, "enabled": True}
+                for idx in range(market_count)
+            ],
+        )
+    async with SessionLocal() as session:
+        return list((await session.execute(select(Market.id))).scalars())
+
+
+async def _count_ticks() -> int:
+    async with SessionLocal() as session:
+        return int((await session.execute(select(func.count(PnLTicks.id)))).scalar_one())
+
+
+async def _ws_viewer(url: str, frames: Dict[int, int], idx: int, stop: asyncio.Event) -> None:
+    async with connect(url, max_size=None) as ws:
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(ws.recv(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            frames[idx] += 1
+
+
+async def run_scenario(market_count: int, ws_clients: int, duration: float, warmup: float, app_port: int) -> dict:
+    market_ids = await _reset_database(market_count)
+
+    exporter = CollectingExporter()
+    bot_manager_module.tracer = Tracer(exporter, batch_size=64)
+    manager = bot_manager_module.BotManager()
+    lag_monitor = SampledLagMonitor(0.01)
+    lag_monitor.start()
+
+    stop_viewers = asyncio.Event()
+    frames: Dict[int, int] = defaultdict(int)
+    viewers = [
+        asyncio.create_task(_ws_viewer(f"ws://127.0.0.1:{app_port}/ws/pnl", frames, idx, stop_viewers))
+        for idx in range(ws_clients)
+    ]
+
+    await asyncio.gather(*(manager.start_market_loop(mid) for mid in market_ids))
+    await asyncio.sleep(warmup)
+
+    ticks_before = sum(stats.ticks for stats in manager.loop_stats.values())
+    errors_before = sum(stats.errors for stats in manager.loop_stats.values())
+    rows_before = await _count_ticks()
+    frames_before = sum(frames.values())
+    lag_index = len(lag_monitor.lags)
+    measure_start_ns = time.time_ns()
+    started = time.perf_counter()
+
+    await asyncio.sleep(duration)
+
+    elapsed = time.perf_counter() - started
+    measure_end_ns = time.time_ns()
+    ticks = sum(stats.ticks for stats in manager.loop_stats.values()) - ticks_before
+    errors = sum(stats.errors for stats in manager.loop_stats.values()) - errors_before
+    frames_seen = sum(frames.values()) - frames_before
+    lags = lag_monitor.lags[lag_index:]
+
+    await manager.stop_all()
+    stop_viewers.set()
+    await asyncio.gather(*viewers, return_exceptions=True)
+    await lag_monitor.stop()
+    bot_manager_module.tracer.flush()
+    await asyncio.sleep(0.1)
+    rows = await _count_ticks() - rows_before
+
+    window = [s for s in exporter.spans if measure_start_ns <= s.start_ns and s.end_ns <= measure_end_ns]
+    tick_durations = [(s.end_ns - s.start_ns) / 1e9 for s in window if s.name == "bot_loop_tick"]
+    phase_durations: Dict[str, List[float]] = defaultdict(list)
+    for span in window:
+        if span.name != "bot_loop_tick":
+            phase_durations[span.name].append((span.end_ns - span.start_ns) / 1e9)
+
+    return {
+        "markets": market_count,
+        "ws_clients": ws_clients,
+        "duration_seconds": round(elapsed, 3),
+        "ticks": ticks,
+        "ticks_per_second": round(ticks / elapsed, 2),
+        "loop_errors": errors,
+        "db_writes": rows,
+        "db_writes_per_second": round(rows / elapsed, 2),
+        "ws_frames": frames_seen,
+        "ws_frames_per_second": round(frames_seen / elapsed, 2),
+        "tick_latency_ms": percentiles(tick_durations, scale=1000),
+        "phase_latency_ms": {name: percentiles(values, scale=1000) for name, values in sorted(phase_durations.items())},
+        "event_loop_lag_ms": percentiles(lags, scale=1000),
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    faults = FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    with FakePolymarketServer(faults) as fake:
+        settings.polymarket_api_base = fake.url
+        settings.polymarket_public_api_base = fake.url
+        settings.bot_loop_interval_seconds = args.interval
+
+        server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="off")
+        )
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        app_port = server.servers[0].sockets[0].getsockname()[1]
+
+        runs = []
+        try:
+            for market_count in args.markets:
+                result = await run_scenario(market_count, args.ws_clients, args.duration, args.warmup, app_port)
+                print(
+                    f"markets={result['markets']:>5} ticks/s={result['ticks_per_second']:>9} "
+                    f"p99={result['tick_latency_ms']['p99']}ms writes/s={result['db_writes_per_second']} "
+                    f"lag_p99={result['event_loop_lag_ms']['p99']}ms errors={result['loop_errors']}"
+                )
+                runs.append(result)
+        finally:
+            server.should_exit = True
+            await server_task
+    return {"runs": runs}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=lambda v: [int(x) for x in v.split(",")], default=[10, 100, 1000])
+    parser.add_argument("--ws-clients", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--interval", type=float, default=1.0, help="bot loop interval in seconds")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="path of the JSON results file")
+    args = parser.parse_args()
+
+    outcome = asyncio.run(run_benchmark(args))
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    config["database_url"] = os.environ["DATABASE_URL"].split("@")[-1]
+    path = write_results("bot_manager", config, outcome["runs"], args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
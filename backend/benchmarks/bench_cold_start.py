@@ -0,0 +1,139 @@
+"""Cold-start benchmark.
+
+Launches the app with uvicorn in a fresh process, repeatedly, and measures
+the time until the port answers ``/health`` (process alive) and until
+``/ready`` returns 200 (schema checked, pool and HTTP client warmed, loops
+resumed). Also times a bare ``import main`` and lists the slowest imports::
+
+    cd backend
+    python -m benchmarks.bench_cold_start --repeats 5
+
+Each run uses a fresh SQLite file unless ``DATABASE_URL`` is set, so the first
+boot creates the schema and later boots only check it.
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.common import percentiles, write_results
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _env(database_url: str) -> Dict[str, str]:
+    return {**os.environ, "DATABASE_URL": database_url, "PYTHONDONTWRITEBYTECODE": "1"}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _status(url: str) -> Optional[int]:
+    try:
+        with urllib.request.urlopen(url, timeout=0.5) as resp:
+            return resp.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+    except OSError:
+        return None
+
+
+def time_import(database_url: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], cwd=BACKEND_DIR, env=_env(database_url), check=True)
+    return time.perf_counter() - started
+
+
+def slowest_imports(database_url: str, top: int) -> List[dict]:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        env=_env(database_url),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)", line)
+        # only top-level packages, so nested imports are not double counted
+        if match and len(match.group(3)) <= 3:
+            rows.append({"module": match.group(4), "cumulative_ms": round(int(match.group(2)) / 1000, 1)})
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+
+def time_boot(database_url: str, timeout: float) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=_env(database_url),
+    )
+    live = ready = None
+    try:
+        while time.perf_counter() - started < timeout and ready is None:
+            if live is None and _status(f"{base}/health") == 200:
+                live = time.perf_counter() - started
+            if live is not None and _status(f"{base}/ready") == 200:
+                ready = time.perf_counter() - started
+            time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return {"live_seconds": live, "ready_seconds": ready}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--top-imports", type=int, default=10)
+    parser.add_argument("--output", help="path of the JSON results file")
+    args = parser.parse_args()
+
+    database_url = os.environ.get(
+        "DATABASE_URL",
+        f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_cold_start_'), 'app.sqlite')}",
+    )
+    imports = [time_import(database_url) for _ in range(args.repeats)]
+    boots = [time_boot(database_url, args.timeout) for _ in range(args.repeats)]
+    live = [boot["live_seconds"] for boot in boots if boot["live_seconds"] is not None]
+    ready = [boot["ready_seconds"] for boot in boots if boot["ready_seconds"] is not None]
+
+    runs = [
+        {
+            "repeats": args.repeats,
+            "import_ms": percentiles(imports, scale=1000),
+            "time_to_live_ms": percentiles(live, scale=1000),
+            "time_to_ready_ms": percentiles(ready, scale=1000),
+            "first_boot_ready_ms": round(boots[0]["ready_seconds"] * 1000, 1) if boots[0]["ready_seconds"] else None,
+            "failed_boots": sum(1 for boot in boots if boot["ready_seconds"] is None),
+            "slowest_imports": slowest_imports(database_url, args.top_imports),
+        }
+    ]
+    print(
+        f"import p50={runs[0]['import_ms']['p50']}ms live p50={runs[0]['time_to_live_ms']['p50']}ms "
+        f"ready p50={runs[0]['time_to_ready_ms']['p50']}ms"
+    )
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    config["database_url"] = database_url.split("@")[-1]
+    path = write_results("cold_start", config, runs, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
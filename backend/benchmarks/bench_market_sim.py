@@ -0,0 +1,75 @@
+"""Market simulator throughput benchmark.
+
+Times ``MarketSimulator.advance`` one step at a time (the live cadence) and in
+one catch-up call, and building Polymarket-shaped quotes with order books for
+every market, for each fleet size::
+
+    cd backend
+    python -m benchmarks.bench_market_sim --markets 1000,5000 --steps 200
+"""
+import argparse
+import time
+from typing import List
+
+from benchmarks.common import percentiles, write_results
+from core.market_sim import MarketSimulator
+
+
+def run_scenario(markets: int, args: argparse.Namespace) -> dict:
+    ids = [f"market-{idx}" for idx in range(markets)]
+    sim = MarketSimulator(seed=args.seed, factors=args.factors, depth_levels=args.depth_levels)
+    sim.add_markets(ids)
+
+    step_times: List[float] = []
+    for _ in range(args.steps):
+        started = time.perf_counter()
+        sim.advance()
+        step_times.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    sim.advance(args.steps)
+    catch_up = time.perf_counter() - started
+
+    quote_times: List[float] = []
+    for _ in range(args.quote_rounds):
+        started = time.perf_counter()
+        sim.quotes(ids)
+        quote_times.append(time.perf_counter() - started)
+    return {
+        "markets": markets,
+        "steps": args.steps,
+        "step_ms": percentiles(step_times, scale=1000),
+        "market_updates_per_second": round(markets * args.steps / sum(step_times), 1),
+        "catch_up_market_updates_per_second": round(markets * args.steps / catch_up, 1),
+        "quotes_ms": percentiles(quote_times, scale=1000),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=lambda v: [int(x) for x in v.split(",")], default=[1000, 5000])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--quote-rounds", type=int, default=10, help="full quote and book builds per fleet size")
+    parser.add_argument("--factors", type=int, default=3)
+    parser.add_argument("--depth-levels", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="path of the JSON results file")
+    args = parser.parse_args()
+
+    runs = []
+    for markets in args.markets:
+        result = run_scenario(markets, args)
+        print(
+            f"markets={markets:>6} step p50={result['step_ms']['p50']}ms "
+            f"{result['market_updates_per_second']} updates/s "
+            f"(catch-up {result['catch_up_market_updates_per_second']}) "
+            f"quotes p50={result['quotes_ms']['p50']}ms"
+        )
+        runs.append(result)
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    path = write_results("market_sim", config, runs, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Order-signing benchmark.
+
+Signs CTF Exchange orders with a local test key (no network, no funds) and
+compares signing on the event loop with the thread and process pools of
+``OrderSigner``. Orders arrive as concurrent bursts, the way quote updates
+from many markets would; each run reports orders per second, per-burst
+latency and the event-loop lag a heartbeat task saw meanwhile::
+
+    cd backend
+    python -m benchmarks.bench_order_signing --orders 5000 --burst 50 --workers 1,2,4
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import List, Sequence
+
+from benchmarks.common import SampledLagMonitor, percentiles, write_results
+from core.exchange import BUY, SELL, OrderRequest
+from core.order_signing import OrderPayload, OrderSigner, order_from_request, sign_orders
+
+
+TEST_KEY = "0x" + "42" * 32
+
+
+def _orders(count: int, maker: str) -> List[OrderPayload]:
+    return [
+        order_from_request(
+            OrderRequest(idx % 500, BUY if idx % 2 else SELL, 0.3 + (idx % 40) / 100, 10 + idx % 7),
+            token_id=10**70 + idx % 500,
+            maker=maker,
+            salt=idx,
+        )
+        for idx in range(count)
+    ]
+
+
+async def _on_loop(signer: OrderSigner, burst: Sequence[OrderPayload]) -> None:
+    sign_orders(signer.signing_key, burst)
+
+
+async def _pool(signer: OrderSigner, burst: Sequence[OrderPayload]) -> None:
+    await signer.sign_many(burst)
+
+
+async def run_scenario(mode: str, workers: int, orders: List[OrderPayload], args: argparse.Namespace) -> dict:
+    signer = OrderSigner(TEST_KEY, workers=workers, batch_size=args.batch_size, executor=mode)
+    sign = _on_loop if mode == "event_loop" else _pool
+    if mode != "event_loop":
+        await signer.warm_up()
+    else:
+        sign_orders(signer.signing_key, [])
+    bursts = [orders[start:start + args.burst] for start in range(0, len(orders), args.burst)]
+    latencies: List[float] = []
+
+    async def timed(burst: Sequence[OrderPayload]) -> None:
+        started = time.perf_counter()
+        await sign(signer, burst)
+        latencies.append(time.perf_counter() - started)
+
+    monitor = SampledLagMonitor(0.005)
+    monitor.start()
+    started = time.perf_counter()
+    for start in range(0, len(bursts), args.concurrency):
+        await asyncio.gather(*(timed(burst) for burst in bursts[start:start + args.concurrency]))
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+    signer.close()
+    return {
+        "mode": mode,
+        "workers": workers if mode != "event_loop" else None,
+        "orders": len(orders),
+        "burst": args.burst,
+        "orders_per_second": round(len(orders) / elapsed, 1),
+        "burst_latency_ms": percentiles(latencies, scale=1000),
+        "event_loop_lag_ms": percentiles(monitor.lags, scale=1000),
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> List[dict]:
+    orders = _orders(args.orders, OrderSigner(TEST_KEY).address)
+    scenarios = [("event_loop", 1)] + [(mode, workers) for mode in ("thread", "process") for workers in args.workers]
+    runs = []
+    for mode, workers in scenarios:
+        result = await run_scenario(mode, workers, orders, args)
+        print(
+            f"{mode:<10} workers={workers:>2} {result['orders_per_second']} orders/s "
+            f"burst p50={result['burst_latency_ms']['p50']}ms "
+            f"loop lag p99={result['event_loop_lag_ms']['p99']}ms"
+        )
+        runs.append(result)
+    return runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--burst", type=int, default=50, help="orders per sign_many call")
+    parser.add_argument("--concurrency", type=int, default=8, help="bursts in flight at once")
+    parser.add_argument("--batch-size", type=int, default=64, help="orders per pool task")
+    parser.add_argument(
+        "--workers",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=sorted({1, 2, max(1, os.cpu_count() or 1)}),
+    )
+    parser.add_argument("--output", help="path of the JSON results file")
+    args = parser.parse_args()
+
+    runs = asyncio.run(run_benchmark(args))
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    path = write_results("order_signing", config, runs, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Quote-update benchmark for the quoting engine.
+
+Runs one task per market that, like a bot loop tick, feeds a new mid to the
+simulated exchange, collects fills and re-quotes. Mids follow a seeded random
+walk. The benchmark reports quote updates per second, per-update latency and
+how many adapter calls and orders were needed, for each order batch size::
+
+    cd backend
+    python -m benchmarks.bench_quoting --markets 100,1000 --batch-sizes 1,100 --latency-ms 1
+
+``--latency-ms`` is added to every adapter call to model the exchange round
+trip, which is what batching amortises.
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import List
+
+from benchmarks.common import percentiles, write_results
+from core.exchange import SimulatedExchange
+from core.quoting import QuotingEngine
+
+
+async def _market(
+    engine: QuotingEngine,
+    market_id: int,
+    updates: int,
+    rng: random.Random,
+    latencies: List[float],
+    totals: Counter,
+) -> None:
+    mid = 0.2 + rng.random() * 0.6
+    inventory = 0.0
+    for _ in range(updates):
+        mid = min(0.95, max(0.05, mid + rng.gauss(0, 0.002)))
+        started = time.perf_counter()
+        fills = await engine.sync_fills(market_id, mid)
+        for fill in fills:
+            inventory += fill.size if fill.side == "buy" else -fill.size
+        placed, cancelled = await engine.requote(market_id, mid, inventory, spread_bps=100)
+        latencies.append(time.perf_counter() - started)
+        totals.update(fills=len(fills), placed=placed, cancelled=cancelled, unchanged=int(not placed and not cancelled))
+
+
+async def run_scenario(markets: int, updates: int, batch_size: int, args: argparse.Namespace) -> dict:
+    exchange = SimulatedExchange(latency_ms=args.latency_ms)
+    engine = QuotingEngine(
+        exchange,
+        quote_size=25,
+        inventory_cap=1000,
+        batch_size=batch_size,
+        max_delay=args.batch_delay_ms / 1000.0,
+    )
+    latencies: List[float] = []
+    totals: Counter = Counter()
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _market(engine, mid, updates, random.Random(f"{args.seed}:{mid}"), latencies, totals)
+            for mid in range(markets)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    calls = exchange.calls
+    await engine.close()
+    return {
+        "markets": markets,
+        "updates_per_market": updates,
+        "batch_size": batch_size,
+        "updates_per_second": round(markets * updates / elapsed, 1),
+        "update_latency_ms": percentiles(latencies, scale=1000),
+        "adapter_calls": calls,
+        "orders_placed": totals["placed"],
+        "orders_cancelled": totals["cancelled"],
+        "unchanged_updates": totals["unchanged"],
+        "fills": totals["fills"],
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> List[dict]:
+    runs = []
+    for markets in args.markets:
+        for batch_size in args.batch_sizes:
+            result = await run_scenario(markets, args.updates, batch_size, args)
+            print(
+                f"markets={markets:>5} batch={batch_size:>4} "
+                f"{result['updates_per_second']} updates/s "
+                f"p50={result['update_latency_ms']['p50']}ms p99={result['update_latency_ms']['p99']}ms "
+                f"calls={result['adapter_calls']}"
+            )
+            runs.append(result)
+    return runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=lambda v: [int(x) for x in v.split(",")], default=[100, 1000])
+    parser.add_argument("--batch-sizes", type=lambda v: [int(x) for x in v.split(",")], default=[1, 100])
+    parser.add_argument("--updates", type=int, default=50, help="quote updates per market")
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--batch-delay-ms", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="path of the JSON results file")
+    args = parser.parse_args()
+
+    runs = asyncio.run(run_benchmark(args))
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    path = write_results("quoting", config, runs, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Portfolio risk update benchmark.
+
+Feeds ``RiskEngine`` prices from a seeded factor model (a few shared factors
+plus idiosyncratic noise per market, so markets are correlated the way event
+markets on related outcomes are) and times each incremental update, for each
+portfolio size::
+
+    cd backend
+    python -m benchmarks.bench_risk --markets 100,1000,2000 --updates 200
+
+``--quiet-share`` is the share of markets whose price does not move on a
+given update, as between trades on a real book; quiet markets take the
+sparse covariance path.
+"""
+import argparse
+import time
+from typing import List
+
+import numpy as np
+
+from benchmarks.common import percentiles, write_results
+from core.risk import RiskEngine
+
+
+def run_scenario(markets: int, args: argparse.Namespace) -> dict:
+    rng = np.random.default_rng(args.seed)
+    loadings = rng.normal(0, 1, size=(markets, args.factors))
+    prices = rng.uniform(0.2, 0.8, size=markets)
+    positions = dict(enumerate(rng.normal(0, 100, size=markets).round()))
+    engine = RiskEngine(args.window, args.halflife, args.confidence, capacity=markets)
+    engine.update(dict(enumerate(prices)), positions)
+
+    latencies: List[float] = []
+    for _ in range(args.updates):
+        moves = 0.002 * (loadings @ rng.normal(0, 1, size=args.factors)) + rng.normal(0, 0.002, size=markets)
+        moves[rng.random(markets) < args.quiet_share] = 0.0
+        prices = np.clip(prices + moves, 0.01, 0.99)
+        started = time.perf_counter()
+        snapshot = engine.update(dict(enumerate(prices)), positions)
+        latencies.append(time.perf_counter() - started)
+    return {
+        "markets": markets,
+        "updates": args.updates,
+        "update_ms": percentiles(latencies, scale=1000),
+        "var_parametric": round(snapshot.var_parametric, 2),
+        "var_historical": round(snapshot.var_historical, 2) if snapshot.var_historical is not None else None,
+        "gross_exposure": round(snapshot.gross_exposure, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=lambda v: [int(x) for x in v.split(",")], default=[100, 1000, 2000])
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--factors", type=int, default=5)
+    parser.add_argument("--quiet-share", type=float, default=0.0)
+    parser.add_argument("--window", type=int, default=512)
+    parser.add_argument("--halflife", type=float, default=60.0)
+    parser.add_argument("--confidence", type=float, default=0.99)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="path of the JSON results file")
+    args = parser.parse_args()
+
+    runs = []
+    for markets in args.markets:
+        result = run_scenario(markets, args)
+        print(
+            f"markets={markets:>5} p50={result['update_ms']['p50']}ms p99={result['update_ms']['p99']}ms "
+            f"VaR={result['var_parametric']}"
+        )
+        runs.append(result)
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    path = write_results("risk", config, runs, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Warm-restart benchmark for BotManager.
+
+Seeds ``markets``, ``pnl_ticks`` history and ``bot_state`` checkpoints, then
+measures how long it takes until every loop has its state back and is
+running, for three strategies:
+
+- ``bulk_checkpoint``: ``BotManager.warm_restart`` (one query for all markets)
+- ``per_market_checkpoint``: one ``bot_state`` query per market
+- ``replay_ticks``: the latest ``pnl_ticks`` row per market, one query each
+  (what a restart without checkpoints would have to do; loses ``prev_price``)
+
+Loops are parked right after they start so only startup work is measured::
+
+    cd backend
+    python -m benchmarks.bench_startup --markets 100,500,1000 --ticks-per-market 50
+"""
+import os
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'bench_startup.sqlite')}",
+)
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import random  # noqa: E402
+import time  # noqa: E402
+from decimal import Decimal  # noqa: E402
+from typing import List  # noqa: E402
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from benchmarks.common import write_results  # noqa: E402
+from core.bot_manager import BotManager, MarketState  # noqa: E402
+from db import Base, SessionLocal, engine  # noqa: E402
+from models import BotState, Market, PnLTicks  # noqa: E402
+
+
+async def _seed(market_count: int, ticks_per_market: int, seed: int) -> List[int]:
+    rng = random.Random(seed)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(Market),
+            [
+                {"name": f"Bench {idx}", "external_id": f"bench-{idx}", "base_spread_bps": 50, "enabled": True}
+                for idx in range(market_count)
+            ],
+        )
+        market_ids = list((await conn.execute(select(Market.id))).scalars())
+        ticks = [
+            {"market_id": mid, "pnl": round(rng.uniform(-50, 50), 6), "inventory": 0}
+            for _ in range(ticks_per_market)
+            for mid in market_ids
+        ]
+        for start in range(0, len(ticks), 5000):
+            await conn.execute(insert(PnLTicks), ticks[start:start + 5000])
+        await conn.execute(
+            insert(BotState),
+            [
+                {
+                    "market_id": mid,
+                    "prev_price": round(rng.uniform(0.05, 0.95), 6),
+                    "pnl": round(rng.uniform(-50, 50), 6),
+                    "inventory": 0,
+                    "ticks": ticks_per_market,
+                    "priority": 0,
+                    "running": True,
+                }
+                for mid in market_ids
+            ],
+        )
+    return market_ids
+
+
+def _parked_manager() -> BotManager:
+    manager = BotManager()
+
+    async def parked_loop(_market_id: int) -> None:
+        await asyncio.Event().wait()
+
+    manager._run_market_loop = parked_loop  # type: ignore[method-assign]
+    return manager
+
+
+async def _bulk_checkpoint(manager: BotManager, market_ids: List[int]) -> None:
+    await manager.warm_restart()
+
+
+async def _per_market_checkpoint(manager: BotManager, market_ids: List[int]) -> None:
+    async with SessionLocal() as session:
+        for mid in market_ids:
+            manager.restore_states(await manager.load_states(session, [mid]))
+    await asyncio.gather(*(manager.start_market_loop(mid) for mid in market_ids))
+
+
+async def _replay_ticks(manager: BotManager, market_ids: List[int]) -> None:
+    async with SessionLocal() as session:
+        for mid in market_ids:
+            res = await session.execute(
+                select(PnLTicks).where(PnLTicks.market_id == mid).order_by(PnLTicks.id.desc()).limit(1)
+            )
+            tick = res.scalar_one_or_none()
+            if tick is not None:
+                manager.states[mid] = MarketState(
+                    pnl=Decimal(str(tick.pnl)), inventory=Decimal(str(tick.inventory))
+                )
+    await asyncio.gather(*(manager.start_market_loop(mid) for mid in market_ids))
+
+
+STRATEGIES = {
+    "bulk_checkpoint": _bulk_checkpoint,
+    "per_market_checkpoint": _per_market_checkpoint,
+    "replay_ticks": _replay_ticks,
+}
+
+
+async def run_scenario(market_count: int, ticks_per_market: int, repeats: int, seed: int) -> List[dict]:
+    market_ids = await _seed(market_count, ticks_per_market, seed)
+    runs = []
+    for name, strategy in STRATEGIES.items():
+        durations = []
+        for _ in range(repeats):
+            manager = _parked_manager()
+            started = time.perf_counter()
+            await strategy(manager, market_ids)
+            durations.append(time.perf_counter() - started)
+            restored = sum(1 for mid in market_ids if mid in manager.states)
+            running = sum(1 for mid in market_ids if manager.is_running(mid))
+            for task in manager.tasks.values():
+                task.cancel()
+            await asyncio.gather(*manager.tasks.values(), return_exceptions=True)
+        runs.append(
+            {
+                "strategy": name,
+                "markets": market_count,
+                "ticks_per_market": ticks_per_market,
+                "restored_markets": restored,
+                "running_markets": running,
+                "startup_ms_best": round(min(durations) * 1000, 2),
+                "startup_ms_mean": round(sum(durations) / len(durations) * 1000, 2),
+            }
+        )
+    return runs
+
+
+async def run_benchmark(args: argparse.Namespace) -> List[dict]:
+    runs = []
+    for market_count in args.markets:
+        for result in await run_scenario(market_count, args.ticks_per_market, args.repeats, args.seed):
+            print(
+                f"markets={result['markets']:>5} {result['strategy']:<22} "
+                f"best={result['startup_ms_best']}ms mean={result['startup_ms_mean']}ms "
+                f"restored={result['restored_markets']}"
+            )
+            runs.append(result)
+    await engine.dispose()
+    return runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markets", type=lambda v: [int(x) for x in v.split(",")], default=[100, 500, 1000])
+    parser.add_argument("--ticks-per-market", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="path of the JSON results file")
+    args = parser.parse_args()
+
+    runs = asyncio.run(run_benchmark(args))
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    config["database_url"] = os.environ["DATABASE_URL"].split("@")[-1]
+    path = write_results("startup", config, runs, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from core.loop_monitor import LoopLagMonitor
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentiles(
+    values: Iterable[float],
+    points: Sequence[float] = (50, 90, 99),
+    scale: float = 1.0,
+) -> Dict[str, Optional[float]]:
+    """Nearest-rank percentiles plus max/mean, multiplied by ``scale``."""
+    ordered = sorted(values)
+    out: Dict[str, Optional[float]] = {}
+    if not ordered:
+        for point in points:
+            out[f"p{point:g}"] = None
+        out.update({"max": None, "mean": None, "count": 0})
+        return out
+    for point in points:
+        rank = max(1, math.ceil(point / 100.0 * len(ordered)))
+        out[f"p{point:g}"] = round(ordered[rank - 1] * scale, 4)
+    out["max"] = round(ordered[-1] * scale, 4)
+    out["mean"] = round(sum(ordered) / len(ordered) * scale, 4)
+    out["count"] = len(ordered)
+    return out
+
+
+class SampledLagMonitor(LoopLagMonitor):
+    """Lag monitor that keeps every sample so runs can report percentiles."""
+
+    def __init__(self, interval_seconds: float = 0.01) -> None:
+        super().__init__(interval_seconds)
+        self.lags: List[float] = []
+
+    def record(self, lag: float) -> None:
+        super().record(lag)
+        self.lags.append(lag)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return (
+            subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=Path(__file__).resolve().parent,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            or None
+        )
+    except Exception:
+        return None
+
+
+def write_results(name: str, config: Dict[str, Any], runs: list, output: Optional[str] = None) -> Path:
+    """Store a benchmark run as JSON so results can be diffed across revisions."""
+    document = {
+        "benchmark": name,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": config,
+        "runs": runs,
+    }
+    if output:
+        path = Path(output)
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_DIR / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(json.dumps(document, indent=2) + "\n")
+    return path
@@ -0,0 +1,209 @@
+"""Local stand-in for the Polymarket HTTP and websocket APIs.
+
+Serves the endpoints ``polymarket_client`` talks to with configurable latency
+and error injection, so the bot can be load-tested without network access.
+Prices and books come from the seeded ``MarketSimulator`` in
+``core/market_sim.py``, one step per ``--step-seconds``::
+
+    python -m benchmarks.fake_polymarket --port 9100 --latency-ms 20 --error-rate 0.01 --seed 7
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+from core.market_sim import MarketSimulator
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    not_found_rate: float = 0.0
+    seed: int = 0
+    # simulated market time, not a fault, but every fake server needs it
+    step_seconds: float = 1.0
+
+
+class FakeMarketBook:
+    """Markets served by the fake API: a ``MarketSimulator`` that follows
+    ``clock``, so identical seeds give identical paths."""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        step_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.seed = seed
+        self.simulator = MarketSimulator(seed=seed, step_seconds=step_seconds)
+        self.clock = clock
+
+    def quotes(self, external_ids: List[str]) -> List[dict]:
+        self.simulator.sync(self.clock())
+        return self.simulator.quotes(external_ids)
+
+    def quote(self, external_id: str) -> dict:
+        return self.quotes([external_id])[0]
+
+
+def create_fake_polymarket_app(faults: Optional[FaultConfig] = None) -> FastAPI:
+    faults = faults or FaultConfig()
+    book = FakeMarketBook(faults.seed, faults.step_seconds)
+    rng = random.Random(faults.seed)
+    app = FastAPI(title="Fake Polymarket")
+    app.state.faults = faults
+    app.state.book = book
+    app.state.requests = 0
+
+    async def _inject() -> Optional[JSONResponse]:
+        app.state.requests += 1
+        delay = faults.latency_ms + (rng.uniform(0, faults.jitter_ms) if faults.jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        roll = rng.random()
+        if roll < faults.error_rate:
+            return JSONResponse(status_code=faults.error_status, content={"error": "injected"})
+        if roll < faults.error_rate + faults.not_found_rate:
+            return JSONResponse(status_code=404, content={"error": "not found"})
+        return None
+
+    @app.get("/markets/{external_id}")
+    async def market(external_id: str):
+        return await _inject() or book.quote(external_id)
+
+    @app.get("/markets-data/{external_id}")
+    async def market_data(external_id: str):
+        return await _inject() or book.quote(external_id)
+
+    @app.get("/markets")
+    async def markets(limit: int = 50):
+        failure = await _inject()
+        if failure:
+            return failure
+        return book.quotes([f"market-{idx}" for idx in range(limit)])
+
+    @app.websocket("/ws/market")
+    async def market_ws(ws: WebSocket):
+        """Sends a ``book`` event per subscribed asset, then every
+        ``interval`` a ``price_change`` for each asset whose mid or top of
+        book moved, and the full ``book`` again when ``books`` is set."""
+        await ws.accept()
+        try:
+            subscribe = await ws.receive_json()
+            assets = [str(a) for a in subscribe.get("assets_ids", [])]
+            interval = float(subscribe.get("interval", 1.0))
+            books = bool(subscribe.get("books", False))
+            last: Dict[str, Tuple[float, float, float]] = {}
+            first = True
+            while True:
+                now_ms = int(time.time() * 1000)
+                for quote in book.quotes(assets):
+                    asset = quote["slug"]
+                    top = (quote["midPrice"], quote["bestBid"], quote["bestAsk"])
+                    if first or books:
+                        await ws.send_json(
+                            {
+                                "event_type": "book",
+                                "asset_id": asset,
+                                "bids": quote["bids"],
+                                "asks": quote["asks"],
+                                "timestamp": now_ms,
+                            }
+                        )
+                    if not first and last.get(asset) != top:
+                        await ws.send_json(
+                            {
+                                "event_type": "price_change",
+                                "asset_id": asset,
+                                "price": quote["midPrice"],
+                                "best_bid": quote["bestBid"],
+                                "best_ask": quote["bestAsk"],
+                                "timestamp": now_ms,
+                            }
+                        )
+                    last[asset] = top
+                first = False
+                await asyncio.sleep(interval)
+        except WebSocketDisconnect:
+            pass
+
+    return app
+
+
+class FakePolymarketServer:
+    """Runs the fake API with uvicorn on a background thread and its own loop,
+    so injected latency does not compete with the event loop under test."""
+
+    def __init__(self, faults: Optional[FaultConfig] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.app = create_fake_polymarket_app(faults)
+        self.host = host
+        self.port = port
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws/market"
+
+    def start(self, timeout: float = 10.0) -> "FakePolymarketServer":
+        config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="fake-polymarket", daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("fake Polymarket server failed to start")
+            time.sleep(0.01)
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self) -> "FakePolymarketServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--step-seconds", type=float, default=1.0, help="simulated market time per step")
+    args = parser.parse_args()
+    faults = FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        step_seconds=args.step_seconds,
+    )
+    uvicorn.run(create_fake_polymarket_app(faults), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
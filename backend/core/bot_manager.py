@@ -2,15 +2,23 @@ import asyncio
 import logging
 import random
 import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from prometheus_client import Counter, Gauge, Histogram
-from sqlalchemy import select
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db import SessionLocal
-from models import Market, PnLTicks
+from db import IngestSessionLocal, dialect_insert
+from models import BotState, Market, PnLTicks
+from core.cadence import adaptive_mode, build_cadence_controller
+from core.loop_monitor import LoopLagMonitor
+from core.metrics import MarketSummaryCollector, aggregated_mode, market_label
+from core.pnl_feed import pnl_feed
+from core.quoting import build_quoting_engine
+from core.tracing import Span, tracer
 from polymarket_client import fetch_market_snapshot
 from settings import get_settings
 
@@ -24,6 +32,17 @@ LOOP_DURATION = Histogram(
     "Runtime of each bot loop iteration",
     ["market_id"],
 )
+PHASE_DURATION = Histogram(
+    "bot_loop_phase_duration_seconds",
+    "Runtime of each phase inside a bot loop iteration",
+    ["market_id", "phase"],
+)
+SLEEP_LATENESS = Histogram(
+    "bot_loop_sleep_lateness_seconds",
+    "How much later than requested the bot loop woke up from its sleep",
+    ["market_id"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
 LOOP_SUCCESS = Counter(
     "bot_loop_success_total",
     "Number of successful bot loop iterations",
@@ -49,11 +68,313 @@ PNL_GAUGE = Gauge(
     "Virtual PnL tracked by the paper trader",
     ["market_id"],
 )
+TICKS_DEDUPLICATED = Counter(
+    "bot_pnl_ticks_deduplicated_total",
+    "Ticks not written to pnl_ticks because PnL and inventory were unchanged",
+    ["market_id"],
+)
+EFFECTIVE_INTERVAL = Gauge(
+    "bot_loop_effective_interval_seconds",
+    "Interval until the next scheduled tick, after adaptive cadence and load shedding",
+    ["market_id"],
+)
+MISSED_TICKS = Counter(
+    "bot_loop_missed_ticks_total",
+    "Scheduled ticks skipped because the loop fell more than one interval behind",
+    ["market_id"],
+)
+SHED_LEVEL = Gauge(
+    "bot_load_shed_level",
+    "Current load-shedding level set by the event-loop lag watchdog",
+)
+PAUSED_MARKETS = Gauge(
+    "bot_markets_paused",
+    "Low-priority market loops currently paused by load shedding",
+)
+
+
+@dataclass
+class LoopStats:
+    """Latest timings for a market loop, served by ``/debug/loops``."""
+
+    started_at: float = field(default_factory=time.time)
+    last_tick_at: Optional[float] = None
+    last_duration: Optional[float] = None
+    last_sleep_lateness: Optional[float] = None
+    last_source: Optional[str] = None
+    last_error: Optional[str] = None
+    mid_price: Optional[float] = None
+    pnl: Optional[float] = None
+    liquidity: Optional[float] = None
+    ticks: int = 0
+    errors: int = 0
+    missed_ticks: int = 0
+    ticks_deduplicated: int = 0
+    interval: Optional[float] = None
+    phases: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class MarketState:
+    """What a market loop carries from one tick to the next, checkpointed to
+    ``bot_state`` so a restarted loop resumes instead of starting from zero."""
+
+    pnl: Decimal = Decimal("0")
+    inventory: Decimal = Decimal("0")
+    prev_price: Optional[Decimal] = None
+    ticks: int = 0
+
+    @classmethod
+    def from_row(cls, row: BotState) -> "MarketState":
+        return cls(
+            pnl=Decimal(str(row.pnl)),
+            inventory=Decimal(str(row.inventory)),
+            prev_price=Decimal(str(row.prev_price)) if row.prev_price is not None else None,
+            ticks=row.ticks,
+        )
+
+
+CHECKPOINT_CHUNK_SIZE = 500
+CHECKPOINT_ROWS = Counter(
+    "bot_checkpoint_rows_total",
+    "Market states written to bot_state by checkpoints",
+)
+
+
+LOOP_PHASES = ("market_lookup", "snapshot_fetch", "pnl_compute", "quoting", "db_commit")
+PER_MARKET_METRICS = (
+    LOOP_DURATION,
+    SLEEP_LATENESS,
+    LOOP_SUCCESS,
+    LOOP_ERRORS,
+    MISSED_TICKS,
+    TICKS_DEDUPLICATED,
+    EFFECTIVE_INTERVAL,
+    MIDPRICE_GAUGE,
+    LIQUIDITY_GAUGE,
+    PNL_GAUGE,
+)
+
+
+def should_persist_tick(
+    last_written: Optional[Tuple[Decimal, Decimal, float]],
+    pnl: Decimal,
+    inventory: Decimal,
+    now: float,
+) -> bool:
+    """Whether a tick needs a ``pnl_ticks`` row. With dedup on, rows are
+    written only when PnL or inventory moved by more than the epsilon, plus a
+    heartbeat row so readers can tell a flat market from a dead loop. The
+    table is then a step function: each row holds until the next one."""
+    if not settings.bot_tick_dedup or last_written is None:
+        return True
+    last_pnl, last_inventory, written_at = last_written
+    heartbeat = settings.bot_tick_heartbeat_seconds
+    if heartbeat > 0 and now - written_at >= heartbeat:
+        return True
+    epsilon = Decimal(str(settings.bot_tick_dedup_epsilon))
+    return abs(pnl - last_pnl) > epsilon or abs(inventory - last_inventory) > epsilon
+
+
+def _forget_market_metrics(market_id: int) -> None:
+    label = str(market_id)
+    for metric in PER_MARKET_METRICS:
+        try:
+            metric.remove(label)
+        except KeyError:
+            pass
+    for phase in LOOP_PHASES:
+        try:
+            PHASE_DURATION.remove(label, phase)
+        except KeyError:
+            pass
 
 
 class BotManager:
     def __init__(self) -> None:
         self.tasks: Dict[int, asyncio.Task] = {}
+        self.loop_stats: Dict[int, LoopStats] = {}
+        self.priorities: Dict[int, int] = {}
+        self.shed_level = 0
+        self._unpaused = asyncio.Event()
+        self._unpaused.set()
+        self._watchdog_task: Optional[asyncio.Task] = None
+        self.states: Dict[int, MarketState] = {}
+        self._dirty: Set[int] = set()
+        self._checkpoint_lock: Optional[asyncio.Lock] = None
+        self._checkpoint_task: Optional[asyncio.Task] = None
+        self.cadence = build_cadence_controller()
+        self.quoting = build_quoting_engine()
+
+    def _sheddable(self, market_id: int) -> bool:
+        return self.priorities.get(market_id, 0) <= settings.bot_shed_max_priority
+
+    def _interval_for(self, market_id: int) -> float:
+        if adaptive_mode():
+            interval = self.cadence.interval_for(market_id)
+        else:
+            interval = settings.bot_loop_interval_seconds
+        if self.shed_level and self._sheddable(market_id):
+            interval *= settings.bot_shed_interval_multiplier ** self.shed_level
+        return interval
+
+    def _paused(self, market_id: int) -> bool:
+        return self.shed_level >= settings.bot_shed_pause_level and self._sheddable(market_id)
+
+    def set_shed_level(self, level: int) -> None:
+        level = max(0, min(level, settings.bot_shed_pause_level))
+        if level == self.shed_level:
+            return
+        logger.warning("Bot load shedding level %s -> %s", self.shed_level, level)
+        self.shed_level = level
+        SHED_LEVEL.set(level)
+        if level >= settings.bot_shed_pause_level:
+            self._unpaused.clear()
+            PAUSED_MARKETS.set(sum(1 for mid in self.tasks if self._sheddable(mid)))
+        else:
+            self._unpaused.set()
+            PAUSED_MARKETS.set(0)
+
+    async def _watchdog(self, monitor: LoopLagMonitor) -> None:
+        threshold = settings.bot_lag_shed_threshold_seconds
+        while True:
+            await asyncio.sleep(settings.bot_watchdog_interval_seconds)
+            lag = monitor.ewma_lag
+            if lag > threshold:
+                self.set_shed_level(self.shed_level + 1)
+            elif lag < threshold / 2:
+                self.set_shed_level(self.shed_level - 1)
+
+    def start_watchdog(self, monitor: LoopLagMonitor) -> None:
+        if self._watchdog_task and not self._watchdog_task.done():
+            return
+        self._watchdog_task = asyncio.create_task(self._watchdog(monitor), name="bot-lag-watchdog")
+
+    async def stop_watchdog(self) -> None:
+        if not self._watchdog_task:
+            return
+        self._watchdog_task.cancel()
+        try:
+            await self._watchdog_task
+        except asyncio.CancelledError:
+            pass
+        self._watchdog_task = None
+        self.set_shed_level(0)
+
+    async def load_states(
+        self,
+        session: AsyncSession,
+        market_ids: Optional[Iterable[int]] = None,
+        running_only: bool = False,
+    ) -> List[BotState]:
+        """Checkpoints for ``market_ids`` (all markets when omitted) in one query."""
+        query = select(BotState)
+        if market_ids is not None:
+            query = query.where(BotState.market_id.in_(list(market_ids)))
+        if running_only:
+            query = query.where(BotState.running.is_(True))
+        res = await session.execute(query)
+        return list(res.scalars())
+
+    def restore_states(self, rows: Iterable[BotState]) -> None:
+        """Adopt checkpointed state for markets whose loops are not running;
+        a live loop's state is always newer than its checkpoint."""
+        for row in rows:
+            if not self.is_running(row.market_id):
+                self.states[row.market_id] = MarketState.from_row(row)
+
+    async def warm_restart(self) -> int:
+        """Resume every loop that was running when the last process stopped."""
+        async with IngestSessionLocal() as session:
+            rows = await self.load_states(session, running_only=True)
+        self.restore_states(rows)
+        await asyncio.gather(*(self.start_market_loop(row.market_id, priority=row.priority) for row in rows))
+        logger.info("Warm restart resumed %s market loops", len(rows))
+        return len(rows)
+
+    async def checkpoint(self) -> int:
+        """Write the state of every market that changed since the last
+        checkpoint with one multi-row upsert per chunk."""
+        if self._checkpoint_lock is None:
+            self._checkpoint_lock = asyncio.Lock()
+        async with self._checkpoint_lock:
+            dirty, self._dirty = self._dirty, set()
+            rows = [
+                {
+                    "market_id": market_id,
+                    "prev_price": state.prev_price,
+                    "pnl": state.pnl,
+                    "inventory": state.inventory,
+                    "ticks": state.ticks,
+                    "priority": self.priorities.get(market_id, 0),
+                    "running": self.is_running(market_id),
+                }
+                for market_id in sorted(dirty)
+                if (state := self.states.get(market_id)) is not None
+            ]
+            if not rows:
+                return 0
+            try:
+                async with IngestSessionLocal() as session:
+                    insert = dialect_insert(session)
+                    for start in range(0, len(rows), CHECKPOINT_CHUNK_SIZE):
+                        stmt = insert(BotState).values(rows[start:start + CHECKPOINT_CHUNK_SIZE])
+                        updated = {key: getattr(stmt.excluded, key) for key in rows[0] if key != "market_id"}
+                        updated["updated_at"] = func.now()
+                        await session.execute(
+                            stmt.on_conflict_do_update(index_elements=[BotState.market_id], set_=updated)
+                        )
+                    await session.commit()
+            except Exception as exc:
+                # keep them dirty so the next checkpoint retries
+                self._dirty |= dirty
+                logger.warning("Bot state checkpoint failed: %r", exc)
+                return 0
+            CHECKPOINT_ROWS.inc(len(rows))
+            for market_id in dirty:
+                if not self.is_running(market_id):
+                    self.states.pop(market_id, None)
+            return len(rows)
+
+    async def _checkpointer(self) -> None:
+        while True:
+            await asyncio.sleep(settings.bot_checkpoint_interval_seconds)
+            await self.checkpoint()
+
+    def start_checkpointer(self) -> None:
+        if self._checkpoint_task and not self._checkpoint_task.done():
+            return
+        self._checkpoint_task = asyncio.create_task(self._checkpointer(), name="bot-state-checkpointer")
+
+    async def stop_checkpointer(self) -> None:
+        """Stop periodic checkpoints and write a final one in which running
+        loops stay marked as running, so the next process resumes them."""
+        if self._checkpoint_task:
+            self._checkpoint_task.cancel()
+            try:
+                await self._checkpoint_task
+            except asyncio.CancelledError:
+                pass
+            self._checkpoint_task = None
+        self._dirty.update(self.tasks)
+        await self.checkpoint()
+
+    @contextmanager
+    def _phase(
+        self,
+        labels: Dict[str, str],
+        phases: Dict[str, float],
+        name: str,
+        parent: Optional[Span],
+    ) -> Iterator[None]:
+        started = time.perf_counter()
+        with tracer.span(name, parent=parent, **labels):
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - started
+                phases[name] = elapsed
+                PHASE_DURATION.labels(phase=name, **labels).observe(elapsed)
 
     async def _fetch_market(self, session: AsyncSession, market_id: int) -> Optional[Market]:
         res = await session.execute(select(Market).where(Market.id == market_id))
@@ -61,71 +382,195 @@ class BotManager:
 
     async def _run_market_loop(self, market_id: int) -> None:
         position_size = Decimal(str(settings.bot_quote_size))
-        prev_price: Optional[Decimal] = None
-        pnl: Decimal = Decimal("0")
-        inventory: Decimal = Decimal("0")
+        state = self.states.setdefault(market_id, MarketState())
+        last_written: Optional[Tuple[Decimal, Decimal, float]] = None
 
         backoff = settings.bot_loop_interval_seconds
 
-        labels = {"market_id": str(market_id)}
+        labels = {"market_id": market_label(market_id)}
+        per_market_gauges = not aggregated_mode()
+        stats = self.loop_stats.setdefault(market_id, LoopStats())
+        if state.ticks:
+            stats.pnl = float(state.pnl)
+        # Fixed-rate schedule: each tick is due one interval after the previous
+        # deadline, not after the previous tick finished, so work time does not
+        # stretch the period.
+        next_deadline = time.monotonic()
 
         try:
             while True:
                 loop_started = time.perf_counter()
+                phases: Dict[str, float] = {}
+                failed = False
                 try:
-                    async with SessionLocal() as session:  # type: AsyncSession
-                        market = await self._fetch_market(session, market_id)
-                        if not market:
-                            logger.warning("Bot loop for market %s stopped: market not found", market_id)
-                            return
-
-                        snapshot = await fetch_market_snapshot(market.external_id)
-                        price = Decimal(str(snapshot["mid_price"]))
-
-                        if prev_price is not None:
-                            pnl += (price - prev_price) * position_size
-
-                        session.add(
-                            PnLTicks(
-                                market_id=market_id,
-                                pnl=pnl,
-                                inventory=inventory,
-                            )
-                        )
-                        await session.commit()
+                    with tracer.span("bot_loop_tick", **labels) as root:
+                        async with IngestSessionLocal() as session:  # type: AsyncSession
+                            with self._phase(labels, phases, "market_lookup", root):
+                                market = await self._fetch_market(session, market_id)
+                            if not market:
+                                logger.warning("Bot loop for market %s stopped: market not found", market_id)
+                                return
+
+                            with self._phase(labels, phases, "snapshot_fetch", root):
+                                snapshot = await fetch_market_snapshot(market.external_id)
+
+                            with self._phase(labels, phases, "pnl_compute", root):
+                                price = Decimal(str(snapshot["mid_price"]))
+                                pnl = state.pnl
+                                # paper trading marks a fixed position; quoting marks what was filled
+                                position = state.inventory if self.quoting is not None else position_size
+                                if state.prev_price is not None:
+                                    pnl += (price - state.prev_price) * position
+                                inventory = state.inventory
+
+                            if self.quoting is not None:
+                                with self._phase(labels, phases, "quoting", root):
+                                    fills = await self.quoting.sync_fills(market_id, float(price))
+                                    for fill in fills:
+                                        filled = Decimal(str(fill.size)) * (1 if fill.side == "buy" else -1)
+                                        inventory += filled
+                                        pnl += (price - Decimal(str(fill.price))) * filled
+                                    if fills:
+                                        # the adapter hands fills out once; keep them (and this
+                                        # tick's mark) in state now so a failed requote or
+                                        # commit below cannot drop them
+                                        state.prev_price = price
+                                        state.pnl = pnl
+                                        state.inventory = inventory
+                                        self._dirty.add(market_id)
+                                    await self.quoting.requote(
+                                        market_id, float(price), float(inventory), market.base_spread_bps
+                                    )
 
-                        prev_price = price
-                        backoff = settings.bot_loop_interval_seconds
+                            persist = should_persist_tick(last_written, pnl, inventory, time.monotonic())
+                            if persist:
+                                with self._phase(labels, phases, "db_commit", root):
+                                    session.add(
+                                        PnLTicks(
+                                            market_id=market_id,
+                                            pnl=pnl,
+                                            inventory=inventory,
+                                        )
+                                    )
+                                    await session.commit()
+                                last_written = (pnl, inventory, time.monotonic())
+                            else:
+                                TICKS_DEDUPLICATED.labels(**labels).inc()
+                                stats.ticks_deduplicated += 1
 
-                        LOOP_SUCCESS.labels(**labels).inc()
-                        MIDPRICE_GAUGE.labels(**labels).set(float(price))
-                        PNL_GAUGE.labels(**labels).set(float(pnl))
-                        liquidity = snapshot.get("liquidity")
-                        if isinstance(liquidity, (int, float)):
-                            LIQUIDITY_GAUGE.labels(**labels).set(float(liquidity))
+                            state.prev_price = price
+                            state.pnl = pnl
+                            state.inventory = inventory
+                            state.ticks += 1
+                            self._dirty.add(market_id)
+                            backoff = settings.bot_loop_interval_seconds
+                            if persist:
+                                pnl_feed.publish(market_id, float(pnl), float(inventory))
+
+                            LOOP_SUCCESS.labels(**labels).inc()
+                            liquidity = snapshot.get("liquidity")
+                            if not isinstance(liquidity, (int, float)):
+                                liquidity = None
+                            if adaptive_mode():
+                                self.cadence.observe(
+                                    market_id,
+                                    float(price),
+                                    snapshot.get("best_bid"),
+                                    snapshot.get("best_ask"),
+                                    liquidity,
+                                )
+                            if per_market_gauges:
+                                MIDPRICE_GAUGE.labels(**labels).set(float(price))
+                                PNL_GAUGE.labels(**labels).set(float(pnl))
+                                if liquidity is not None:
+                                    LIQUIDITY_GAUGE.labels(**labels).set(float(liquidity))
+
+                            stats.mid_price = float(price)
+                            stats.pnl = float(pnl)
+                            if liquidity is not None:
+                                stats.liquidity = float(liquidity)
+                            stats.ticks += 1
+                            stats.last_tick_at = time.time()
+                            stats.last_source = snapshot.get("source")
+                            stats.last_error = None
 
                 except asyncio.CancelledError:
                     raise
                 except Exception as exc:  # pragma: no cover - error path exercised in integration
+                    failed = True
                     LOOP_ERRORS.labels(**labels).inc()
+                    stats.errors += 1
+                    stats.last_error = repr(exc)
                     logger.exception("Bot loop error for market %s: %s", market_id, exc)
                     backoff = min(
                         backoff * settings.bot_retry_backoff_seconds,
                         settings.bot_max_backoff_seconds,
                     )
                 finally:
-                    LOOP_DURATION.labels(**labels).observe(time.perf_counter() - loop_started)
+                    duration = time.perf_counter() - loop_started
+                    LOOP_DURATION.labels(**labels).observe(duration)
+                    stats.last_duration = duration
+                    stats.phases = phases
+
+                if failed:
+                    jitter = random.uniform(0, max(0.05, backoff * 0.1))
+                    next_deadline = time.monotonic() + backoff + jitter
+                else:
+                    interval = self._interval_for(market_id)
+                    stats.interval = interval
+                    if per_market_gauges:
+                        EFFECTIVE_INTERVAL.labels(**labels).set(interval)
+                    next_deadline += interval
+                    behind = time.monotonic() - next_deadline
+                    if behind >= interval:
+                        # Run late ticks once, but skip whole intervals we can
+                        # no longer honour instead of bursting to catch up.
+                        missed = int(behind // interval)
+                        next_deadline += missed * interval
+                        MISSED_TICKS.labels(**labels).inc(missed)
+                        stats.missed_ticks += missed
+
+                await asyncio.sleep(max(0.0, next_deadline - time.monotonic()))
+                lateness = max(0.0, time.monotonic() - next_deadline)
+                SLEEP_LATENESS.labels(**labels).observe(lateness)
+                stats.last_sleep_lateness = lateness
 
-                jitter = random.uniform(0, max(0.05, backoff * 0.1))
-                await asyncio.sleep(backoff + jitter)
+                if self._paused(market_id):
+                    await self._unpaused.wait()
+                    next_deadline = time.monotonic()
 
         except asyncio.CancelledError:
             raise
+        finally:
+            # a loop that ends on its own (market deleted) must not keep
+            # exporting its summary series; a restart installs fresh stats
+            if self.loop_stats.get(market_id) is stats:
+                del self.loop_stats[market_id]
 
-    async def start_market_loop(self, market_id: int) -> None:
-        existing = self.tasks.get(market_id)
-        if existing and not existing.done():
+    def risk_inputs(self) -> Tuple[Dict[int, float], Dict[int, float]]:
+        """Latest price and position (shares) of every running market that
+        has ticked. Paper trading holds ``BOT_QUOTE_SIZE`` in every market."""
+        prices: Dict[int, float] = {}
+        positions: Dict[int, float] = {}
+        for market_id in self.tasks:
+            state = self.states.get(market_id)
+            if state is None or state.prev_price is None or not self.is_running(market_id):
+                continue
+            prices[market_id] = float(state.prev_price)
+            positions[market_id] = float(state.inventory) if self.quoting is not None else settings.bot_quote_size
+        return prices, positions
+
+    def is_running(self, market_id: int) -> bool:
+        task = self.tasks.get(market_id)
+        return bool(task and not task.done())
+
+    async def start_market_loop(self, market_id: int, priority: int = 0) -> None:
+        self.priorities[market_id] = priority
+        if self.is_running(market_id):
             return
+        self.loop_stats[market_id] = LoopStats()
+        self.states.setdefault(market_id, MarketState())
+        self._dirty.add(market_id)
         task = asyncio.create_task(self._run_market_loop(market_id))
         self.tasks[market_id] = task
 
@@ -140,9 +585,24 @@ class BotManager:
             except asyncio.CancelledError:
                 pass
         self.tasks.pop(market_id, None)
+        self.loop_stats.pop(market_id, None)
+        if self.quoting is not None:
+            try:
+                await self.quoting.cancel_market(market_id)
+            except Exception as exc:
+                logger.warning("Cancelling quotes for market %s failed: %r", market_id, exc)
+        if market_id in self.states:
+            # records running=False so a warm restart leaves this market stopped
+            self._dirty.add(market_id)
+            await self.checkpoint()
+        self.priorities.pop(market_id, None)
+        self.cadence.forget(market_id)
+        if not aggregated_mode():
+            _forget_market_metrics(market_id)
 
     async def stop_all(self) -> None:
         await asyncio.gather(*(self.stop_market_loop(mid) for mid in list(self.tasks)))
 
 
 bot_manager = BotManager()
+REGISTRY.register(MarketSummaryCollector(lambda: bot_manager.loop_stats))
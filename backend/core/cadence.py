@@ -0,0 +1,155 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from prometheus_client import Gauge
+
+from settings import get_settings
+
+
+settings = get_settings()
+
+CADENCE_DEMAND = Gauge(
+    "bot_cadence_demand_ticks_per_second",
+    "Ticks per second the adaptive cadence would run before the budget cap",
+)
+CADENCE_BUDGET_SCALE = Gauge(
+    "bot_cadence_budget_scale",
+    "Factor applied to every adaptive interval to stay within the tick budget (1 = no throttling)",
+)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+@dataclass
+class _MarketCadence:
+    interval: float
+    last_price: Optional[float] = None
+    last_seen: Optional[float] = None
+    variance_rate: Optional[float] = None
+    spread: Optional[float] = None
+    liquidity: Optional[float] = None
+
+
+class CadenceController:
+    """Per-market tick intervals for ``BOT_CADENCE_MODE=adaptive``.
+
+    Each market keeps an EWMA of its squared price change per second. The
+    interval is chosen so the expected move per tick is about
+    ``max(target_move, spread_fraction * spread)``, scaled up for thin
+    markets and down for deep ones, moved by at most 2x per tick and clamped
+    to ``[min_interval, max_interval]``. If the fleet would then exceed
+    ``max_ticks_per_second``, every interval is stretched by the same factor,
+    so the budget wins over ``max_interval``.
+    """
+
+    def __init__(
+        self,
+        base_interval: float,
+        min_interval: float,
+        max_interval: float,
+        max_ticks_per_second: float = 0.0,
+        target_move: float = 0.002,
+        spread_fraction: float = 0.25,
+        reference_liquidity: float = 1000.0,
+        ewma_alpha: float = 0.2,
+    ) -> None:
+        self.base_interval = _clamp(base_interval, min_interval, max_interval)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_ticks_per_second = max_ticks_per_second
+        self.target_move = target_move
+        self.spread_fraction = spread_fraction
+        self.reference_liquidity = reference_liquidity
+        self.ewma_alpha = ewma_alpha
+        self.markets: Dict[int, _MarketCadence] = {}
+        self.demand = 0.0
+
+    @property
+    def budget_scale(self) -> float:
+        if self.max_ticks_per_second <= 0 or self.demand <= self.max_ticks_per_second:
+            return 1.0
+        return self.demand / self.max_ticks_per_second
+
+    def _state(self, market_id: int) -> _MarketCadence:
+        state = self.markets.get(market_id)
+        if state is None:
+            state = self.markets[market_id] = _MarketCadence(self.base_interval)
+            self._set_demand(self.demand + 1 / state.interval)
+        return state
+
+    def _set_demand(self, demand: float) -> None:
+        self.demand = max(0.0, demand)
+        CADENCE_DEMAND.set(self.demand)
+        CADENCE_BUDGET_SCALE.set(self.budget_scale)
+
+    def _target_interval(self, state: _MarketCadence) -> float:
+        if state.variance_rate is None:
+            return state.interval
+        target = self.target_move
+        if state.spread is not None and state.spread > 0:
+            target = max(target, self.spread_fraction * state.spread)
+        raw = target * target / state.variance_rate if state.variance_rate > 0 else self.max_interval
+        if state.liquidity and self.reference_liquidity > 0:
+            raw *= _clamp(math.sqrt(self.reference_liquidity / state.liquidity), 0.5, 2.0)
+        raw = _clamp(raw, state.interval / 2, state.interval * 2)
+        return _clamp(raw, self.min_interval, self.max_interval)
+
+    def observe(
+        self,
+        market_id: int,
+        price: float,
+        best_bid: Optional[float] = None,
+        best_ask: Optional[float] = None,
+        liquidity: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> float:
+        """Feed one successful tick and return the market's new interval."""
+        now = time.monotonic() if now is None else now
+        state = self._state(market_id)
+        if state.last_price is not None and state.last_seen is not None and now > state.last_seen:
+            sample = (price - state.last_price) ** 2 / (now - state.last_seen)
+            if state.variance_rate is None:
+                state.variance_rate = sample
+            else:
+                state.variance_rate += self.ewma_alpha * (sample - state.variance_rate)
+        state.last_price = price
+        state.last_seen = now
+        if best_bid is not None and best_ask is not None:
+            state.spread = max(0.0, best_ask - best_bid)
+        if liquidity is not None:
+            state.liquidity = liquidity
+        new_interval = self._target_interval(state)
+        self._set_demand(self.demand + 1 / new_interval - 1 / state.interval)
+        state.interval = new_interval
+        return self.interval_for(market_id)
+
+    def interval_for(self, market_id: int) -> float:
+        state = self.markets.get(market_id)
+        interval = state.interval if state is not None else self.base_interval
+        return interval * self.budget_scale
+
+    def forget(self, market_id: int) -> None:
+        state = self.markets.pop(market_id, None)
+        if state is not None:
+            self._set_demand(self.demand - 1 / state.interval)
+
+
+def adaptive_mode() -> bool:
+    return settings.bot_cadence_mode == "adaptive"
+
+
+def build_cadence_controller() -> CadenceController:
+    return CadenceController(
+        base_interval=settings.bot_loop_interval_seconds,
+        min_interval=settings.bot_min_interval_seconds,
+        max_interval=settings.bot_max_interval_seconds,
+        max_ticks_per_second=settings.bot_cadence_max_ticks_per_second,
+        target_move=settings.bot_cadence_target_move,
+        spread_fraction=settings.bot_cadence_spread_fraction,
+        reference_liquidity=settings.bot_cadence_reference_liquidity,
+        ewma_alpha=settings.bot_cadence_ewma_alpha,
+    )
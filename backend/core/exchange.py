@@ -0,0 +1,198 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Protocol, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+BUY = "buy"
+SELL = "sell"
+
+
+class OrderRequest(NamedTuple):
+    market_id: int
+    side: str
+    price: float
+    size: float
+
+
+class Fill(NamedTuple):
+    order_id: str
+    market_id: int
+    side: str
+    price: float
+    size: float
+    ts: float
+
+
+class ExchangeAdapter(Protocol):
+    """Where the quoting engine sends orders.
+
+    Calls take whole batches so an adapter can map them onto the exchange's
+    batch endpoints. ``place_orders`` returns one order id per request, in
+    order; ``signatures`` holds the EIP-712 signature of each request when
+    an order signer is configured, which a live venue requires. ``observe_mid`` lets a simulated venue fill resting orders the mid
+    traded through; live adapters learn about fills from the venue and can
+    ignore it.
+    """
+
+    async def place_orders(
+        self, orders: Sequence[OrderRequest], signatures: Optional[Sequence[str]] = None
+    ) -> List[str]: ...
+
+    async def cancel_orders(self, order_ids: Sequence[str]) -> None: ...
+
+    async def observe_mid(self, market_id: int, mid: float) -> None: ...
+
+    async def fetch_fills(self, market_id: int) -> List[Fill]: ...
+
+    async def close(self) -> None: ...
+
+
+@dataclass
+class _Order:
+    order_id: str
+    market_id: int
+    side: str
+    price: float
+    remaining: float
+    owned: bool = True
+
+
+class _Book:
+    """One market's price levels; each level is FIFO, so matching is
+    price-time priority."""
+
+    def __init__(self) -> None:
+        self.levels: Dict[str, Dict[float, "OrderedDict[str, _Order]"]] = {BUY: {}, SELL: {}}
+        # ascending on both sides; the best bid is the last entry, the best ask the first
+        self.prices: Dict[str, List[float]] = {BUY: [], SELL: []}
+
+    def add(self, order: _Order) -> None:
+        levels = self.levels[order.side]
+        level = levels.get(order.price)
+        if level is None:
+            level = levels[order.price] = OrderedDict()
+            bisect.insort(self.prices[order.side], order.price)
+        level[order.order_id] = order
+
+    def remove(self, order: _Order) -> None:
+        level = self.levels[order.side].get(order.price)
+        if level is None or level.pop(order.order_id, None) is None:
+            return
+        if not level:
+            del self.levels[order.side][order.price]
+            prices = self.prices[order.side]
+            del prices[bisect.bisect_left(prices, order.price)]
+
+    def best(self, side: str) -> Optional[float]:
+        prices = self.prices[side]
+        if not prices:
+            return None
+        return prices[-1] if side == BUY else prices[0]
+
+
+class SimulatedExchange:
+    """In-process central limit order book standing in for the venue.
+
+    Orders placed through the adapter are ours; ``submit_taker`` injects
+    somebody else's flow. An incoming order first matches the opposite side
+    at the resting orders' prices, then rests with whatever is left.
+    ``observe_mid`` treats the new mid as external trading: every order of
+    ours priced at or through it fills in full. Only fills of our orders are
+    reported. ``latency_ms`` is added to every call to model the round trip.
+    """
+
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self.latency = latency_ms / 1000.0
+        self.books: Dict[int, _Book] = defaultdict(_Book)
+        self.orders: Dict[str, _Order] = {}
+        self.fills: Dict[int, List[Fill]] = defaultdict(list)
+        self.calls = 0
+        # signatures the orders were placed with, by order id
+        self.signatures: Dict[str, str] = {}
+        self._ids = itertools.count(1)
+
+    async def _round_trip(self) -> None:
+        self.calls += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+    def _fill(self, order: _Order, price: float, size: float) -> None:
+        order.remaining -= size
+        if order.owned:
+            self.fills[order.market_id].append(
+                Fill(order.order_id, order.market_id, order.side, price, size, time.time())
+            )
+        if order.remaining <= 1e-12:
+            self.books[order.market_id].remove(order)
+            self.orders.pop(order.order_id, None)
+
+    def _match(self, incoming: _Order) -> None:
+        book = self.books[incoming.market_id]
+        opposite = SELL if incoming.side == BUY else BUY
+        while incoming.remaining > 1e-12:
+            best = book.best(opposite)
+            if best is None or (best > incoming.price if incoming.side == BUY else best < incoming.price):
+                break
+            for resting in list(book.levels[opposite][best].values()):
+                size = min(resting.remaining, incoming.remaining)
+                self._fill(resting, best, size)
+                self._fill(incoming, best, size)
+                if incoming.remaining <= 1e-12:
+                    break
+
+    def _submit(self, request: OrderRequest, owned: bool) -> str:
+        order = _Order(f"sim-{next(self._ids)}", request.market_id, request.side, request.price, request.size, owned)
+        self.orders[order.order_id] = order
+        self._match(order)
+        if order.remaining > 1e-12:
+            self.books[order.market_id].add(order)
+        return order.order_id
+
+    def submit_taker(self, request: OrderRequest) -> str:
+        """Somebody else's order; it trades against ours but is never reported."""
+        return self._submit(request, owned=False)
+
+    async def place_orders(
+        self, orders: Sequence[OrderRequest], signatures: Optional[Sequence[str]] = None
+    ) -> List[str]:
+        await self._round_trip()
+        order_ids = [self._submit(order, owned=True) for order in orders]
+        if signatures is not None:
+            self.signatures.update(zip(order_ids, signatures))
+        return order_ids
+
+    async def cancel_orders(self, order_ids: Sequence[str]) -> None:
+        await self._round_trip()
+        for order_id in order_ids:
+            order = self.orders.pop(order_id, None)
+            if order is not None:
+                self.books[order.market_id].remove(order)
+
+    async def observe_mid(self, market_id: int, mid: float) -> None:
+        book = self.books.get(market_id)
+        if book is None:
+            return
+        for side, crossed in ((BUY, lambda price: price >= mid), (SELL, lambda price: price <= mid)):
+            for price in [price for price in book.prices[side] if crossed(price)]:
+                for order in list(book.levels[side][price].values()):
+                    if order.owned:
+                        self._fill(order, order.price, order.remaining)
+
+    async def fetch_fills(self, market_id: int) -> List[Fill]:
+        return self.fills.pop(market_id, [])
+
+    async def close(self) -> None:
+        return None
+
+
+def build_exchange_adapter(name: str, latency_ms: float = 0.0) -> ExchangeAdapter:
+    if name != "simulated":
+        logger.warning("Unknown exchange adapter %r; using the simulated exchange", name)
+    return SimulatedExchange(latency_ms)
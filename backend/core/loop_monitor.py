@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from prometheus_client import Gauge, Histogram
+
+from settings import get_settings
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when the heartbeat task asked to wake up and when it ran",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+EVENT_LOOP_LAG_CURRENT = Gauge(
+    "event_loop_lag_current_seconds",
+    "Most recent event loop lag sample",
+)
+
+
+class LoopLagMonitor:
+    """Heartbeat task that measures how late the event loop schedules it.
+
+    A healthy loop wakes the heartbeat within a millisecond or two of its
+    deadline; anything more is time other callbacks held the loop.
+    """
+
+    def __init__(self, interval_seconds: float, ewma_alpha: float = 0.2) -> None:
+        self.interval_seconds = interval_seconds
+        self.ewma_alpha = ewma_alpha
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.ewma_lag = 0.0
+        self.samples = 0
+        self.last_sample_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, lag: float) -> None:
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        if self.samples == 0:
+            self.ewma_lag = lag
+        else:
+            self.ewma_lag += self.ewma_alpha * (lag - self.ewma_lag)
+        self.samples += 1
+        self.last_sample_at = time.time()
+        EVENT_LOOP_LAG.observe(lag)
+        EVENT_LOOP_LAG_CURRENT.set(lag)
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval_seconds)
+            self.record(max(0.0, time.perf_counter() - started - self.interval_seconds))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="event-loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "samples": self.samples,
+            "last_lag_seconds": self.last_lag,
+            "ewma_lag_seconds": self.ewma_lag,
+            "max_lag_seconds": self.max_lag,
+            "last_sample_at": self.last_sample_at,
+        }
+
+
+loop_lag_monitor = LoopLagMonitor(settings.event_loop_monitor_interval_seconds)
@@ -0,0 +1,299 @@
+import hashlib
+import importlib
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from settings import get_settings
+
+
+settings = get_settings()
+
+# random streams; a draw is identified by (seed, market, step, stream)
+_STREAM_IDIO = 1
+_STREAM_FACTOR = 1 << 16
+_STREAM_LEVEL = 1 << 20
+_STREAM_PARAMS = 1 << 24
+# steps generated per vectorized block when catching up
+_CHUNK_STEPS = 256
+
+
+def load_numpy() -> None:
+    """Import numpy (~100ms) from the startup warm-up or on first use rather
+    than when this module is imported; the functions below import it locally,
+    which only costs a ``sys.modules`` lookup once it is loaded."""
+    importlib.import_module("numpy")
+
+
+def market_key(external_id: str) -> int:
+    """Stable 64-bit key of a market id (``hash()`` is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(external_id.encode(), digest_size=8).digest(), "big")
+
+
+def _splitmix(z):
+    import numpy as np
+
+    z = z + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _uniform(key, step, stream):
+    """Uniforms in (0, 1] that depend only on their arguments, which
+    broadcast against each other like any numpy operands."""
+    import numpy as np
+
+    # broadcast first: uint64 arithmetic only wraps silently on arrays
+    key, step, stream = np.broadcast_arrays(*(np.asarray(v, dtype=np.uint64) for v in (key, step, stream)))
+    h = _splitmix(_splitmix(_splitmix(key) ^ step) ^ stream)
+    return ((h >> np.uint64(11)).astype(np.float64) + 1.0) * 2.0**-53
+
+
+def _normal(key, step, stream):
+    import numpy as np
+
+    u1 = _uniform(key, step, 2 * np.asarray(stream, dtype=np.uint64))
+    u2 = _uniform(key, step, 2 * np.asarray(stream, dtype=np.uint64) + np.uint64(1))
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * math.pi * u2)
+
+
+class MarketSimulator:
+    """Seeded synthetic midprices and order books for many markets at once.
+
+    Each market's price moves in logit space (so it stays inside ``(0, 1)``)
+    as ``x = x0 + phi * (x - x0) + sigma * (beta . f + idio * e)``: ``f`` are
+    ``factors`` shocks shared by all markets, ``beta`` spreads a
+    ``correlation`` share of the variance over them, and ``phi`` pulls the
+    price back towards where it started with a ``reversion_halflife`` in
+    steps. All markets advance together in one vectorized step.
+
+    Every random draw is a hash of (seed, market id, step, stream) rather than
+    the next value of a shared generator, and a market added after step 0 is
+    replayed from step 0 up to the current step, so its state only depends on
+    the seed, its external id and the step; not on when it was added, which
+    other markets exist or the order they were added in. The book is two
+    ``depth_levels``-deep ladders around the mid whose spread widens with the
+    size of the market's last shock.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        factors: int = 3,
+        correlation: float = 0.5,
+        volatility: float = 0.02,
+        reversion_halflife: float = 3600.0,
+        tick_size: float = 0.001,
+        depth_levels: int = 5,
+        step_seconds: float = 1.0,
+        capacity: int = 64,
+    ) -> None:
+        load_numpy()
+        self.seed_key = market_key(f"seed:{seed}")
+        self.factors = max(1, factors)
+        self.correlation = min(max(correlation, 0.0), 1.0)
+        self.volatility = volatility
+        self.phi = 0.5 ** (1.0 / reversion_halflife) if reversion_halflife > 0 else 1.0
+        self.tick_size = tick_size
+        self.depth_levels = max(1, depth_levels)
+        self.step_seconds = step_seconds
+        self.step = 0
+        self.origin: Optional[float] = None
+        self.index: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.count = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        import numpy as np
+
+        def grow(old, shape, dtype=float):
+            new = np.zeros(shape, dtype=dtype)
+            if old is not None:
+                new[: self.count] = old[: self.count]
+            return new
+
+        self.keys = grow(getattr(self, "keys", None), capacity, np.uint64)
+        self.x0 = grow(getattr(self, "x0", None), capacity)
+        self.x = grow(getattr(self, "x", None), capacity)
+        self.sigma = grow(getattr(self, "sigma", None), capacity)
+        self.beta = grow(getattr(self, "beta", None), (capacity, self.factors))
+        self.half_spread = grow(getattr(self, "half_spread", None), capacity)
+        self.depth = grow(getattr(self, "depth", None), capacity)
+        self.shock = grow(getattr(self, "shock", None), capacity)
+        self.capacity = capacity
+
+    def add_markets(self, external_ids: Iterable[str]) -> List[int]:
+        """Register markets (existing ones are kept as they are) and return
+        their slots."""
+        import numpy as np
+
+        external_ids = list(external_ids)
+        new = [mid for mid in dict.fromkeys(external_ids) if mid not in self.index]
+        if new:
+            start = self.count
+            if start + len(new) > self.capacity:
+                self._allocate(max(self.capacity * 2, start + len(new)))
+            end = start + len(new)
+            keys = np.fromiter((market_key(mid) ^ self.seed_key for mid in new), dtype=np.uint64, count=len(new))
+            self.keys[start:end] = keys
+            params = _uniform(keys[:, None], 0, _STREAM_PARAMS + np.arange(4))
+            # starting prices 0.1 .. 0.9, per-market volatility within 0.5x .. 2x
+            start_price = 0.1 + 0.8 * params[:, 0]
+            self.x0[start:end] = self.x[start:end] = np.log(start_price / (1 - start_price))
+            self.sigma[start:end] = self.volatility * np.exp((params[:, 1] - 0.5) * 2 * math.log(2))
+            self.half_spread[start:end] = self.tick_size * np.ceil(1 + 9 * params[:, 2])
+            self.depth[start:end] = 500.0 * np.exp(params[:, 3] * math.log(20))
+            weights = _normal(keys[:, None], 0, _STREAM_PARAMS + 4 + np.arange(self.factors))
+            self.beta[start:end] = (
+                math.sqrt(self.correlation) * weights / np.linalg.norm(weights, axis=1, keepdims=True)
+            )
+            self.shock[start:end] = 0.0
+            # catch the new markets up to where they would be had they been
+            # here from step 0
+            self._evolve(slice(start, end), 0, self.step)
+            for offset, mid in enumerate(new):
+                self.index[mid] = start + offset
+            self.ids.extend(new)
+            self.count = end
+        return [self.index[mid] for mid in external_ids]
+
+    def _evolve(self, rows: slice, step: int, steps: int) -> None:
+        """Move the markets in ``rows`` from ``step`` forward ``steps`` steps."""
+        import numpy as np
+
+        idio = math.sqrt(1.0 - self.correlation)
+        while steps > 0:
+            k = min(steps, _CHUNK_STEPS)
+            t = np.arange(step + 1, step + k + 1, dtype=np.uint64)[:, None]
+            f = _normal(self.seed_key, t, _STREAM_FACTOR + np.arange(self.factors))
+            e = _normal(self.keys[None, rows], t, _STREAM_IDIO)
+            shocks = self.sigma[rows] * (f @ self.beta[rows].T + idio * e)
+            # k steps of x = x0 + phi (x - x0) + shock in closed form
+            decay = self.phi ** np.arange(k - 1, -1, -1)
+            self.x[rows] = self.x0[rows] + self.phi**k * (self.x[rows] - self.x0[rows]) + decay @ shocks
+            self.shock[rows] = np.abs(e[-1])
+            step += k
+            steps -= k
+
+    def advance(self, steps: int = 1) -> None:
+        """Move every market forward ``steps`` steps."""
+        if self.count and steps > 0:
+            self._evolve(slice(0, self.count), self.step, steps)
+        self.step += max(steps, 0)
+
+    def advance_to(self, step: int) -> None:
+        if step > self.step:
+            self.advance(step - self.step)
+
+    def sync(self, now: Optional[float] = None) -> None:
+        """Advance to the step ``now`` (seconds, monotonic) falls in, counting
+        from the first call."""
+        now = time.monotonic() if now is None else now
+        if self.origin is None:
+            self.origin = now - self.step * self.step_seconds
+        self.advance_to(int((now - self.origin) / self.step_seconds))
+
+    def mids(self, slots: Optional[Sequence[int]] = None):
+        import numpy as np
+
+        x = self.x[: self.count] if slots is None else self.x[np.asarray(slots, dtype=np.intp)]
+        low = self.tick_size
+        return np.clip(1.0 / (1.0 + np.exp(-x)), low, 1.0 - low)
+
+    def midprice(self, external_id: str) -> float:
+        return float(self.mids(self.add_markets([external_id]))[0])
+
+    def books(self, slots: Sequence[int]):
+        """Bid and ask ladders ``(prices, sizes)``, each of shape
+        ``(len(slots), depth_levels)``, best level first."""
+        import numpy as np
+
+        slots = np.asarray(slots, dtype=np.intp)
+        tick = self.tick_size
+        mid = self.mids(slots)[:, None]
+        half = (self.half_spread[slots] * (1.0 + 0.5 * self.shock[slots]))[:, None]
+        levels = np.arange(self.depth_levels)
+        bid_px = np.clip(np.floor((mid - half) / tick + 1e-9) * tick - levels * tick, tick, 1 - tick)
+        ask_px = np.clip(np.ceil((mid + half) / tick - 1e-9) * tick + levels * tick, tick, 1 - tick)
+        noise = _uniform(self.keys[slots][:, None], self.step, _STREAM_LEVEL + np.arange(2 * self.depth_levels))
+        size = self.depth[slots][:, None] * 0.6**levels
+        bid_sz = np.round(size * (0.5 + noise[:, : self.depth_levels]), 2)
+        ask_sz = np.round(size * (0.5 + noise[:, self.depth_levels :]), 2)
+        return (np.round(bid_px, 6), bid_sz), (np.round(ask_px, 6), ask_sz)
+
+    def quotes(self, external_ids: Sequence[str]) -> List[dict]:
+        """Polymarket-shaped market payloads (mid, top of book, ladders and
+        liquidity) for ``external_ids`` at the current step."""
+        import numpy as np
+
+        slots = self.add_markets(external_ids)
+        if not slots:
+            return []
+        mids = self.mids(slots)
+        (bid_px, bid_sz), (ask_px, ask_sz) = self.books(slots)
+        liquidity = np.round(bid_sz.sum(axis=1) + ask_sz.sum(axis=1), 2)
+        out = []
+        for row, external_id in enumerate(external_ids):
+            bids = [{"price": p, "size": s} for p, s in zip(bid_px[row].tolist(), bid_sz[row].tolist())]
+            asks = [{"price": p, "size": s} for p, s in zip(ask_px[row].tolist(), ask_sz[row].tolist())]
+            out.append(
+                {
+                    "slug": external_id,
+                    "midPrice": round(float(mids[row]), 6),
+                    "bestBid": bids[0]["price"],
+                    "bestAsk": asks[0]["price"],
+                    "liquidity": float(liquidity[row]),
+                    "bids": bids,
+                    "asks": asks,
+                    "step": self.step,
+                }
+            )
+        return out
+
+    def quote(self, external_id: str) -> dict:
+        return self.quotes([external_id])[0]
+
+
+_simulator: Optional[MarketSimulator] = None
+
+
+def get_market_simulator() -> MarketSimulator:
+    """Process-wide simulator configured from ``MARKET_SIM_*``. With
+    ``MARKET_SIM_CLOCK=wall`` it follows the wall clock, one step per
+    ``MARKET_SIM_STEP_SECONDS``; with ``steps`` it only moves when
+    ``advance_simulation`` is called, so a run is reproducible step by step."""
+    global _simulator
+    if _simulator is None:
+        _simulator = MarketSimulator(
+            seed=settings.market_sim_seed,
+            factors=settings.market_sim_factors,
+            correlation=settings.market_sim_correlation,
+            volatility=settings.market_sim_volatility,
+            step_seconds=settings.market_sim_step_seconds,
+        )
+    return _simulator
+
+
+def _current_simulator() -> MarketSimulator:
+    simulator = get_market_simulator()
+    if settings.market_sim_clock == "wall":
+        simulator.sync()
+    return simulator
+
+
+def advance_simulation(steps: int = 1) -> int:
+    """Move the process-wide simulator ``steps`` steps forward and return the
+    step it is at; this is the only clock when ``MARKET_SIM_CLOCK=steps``."""
+    simulator = get_market_simulator()
+    simulator.advance(steps)
+    return simulator.step
+
+
+def simulated_quote(external_id: str) -> dict:
+    return _current_simulator().quote(external_id)
+
+
+def simulated_midprice(external_id: str) -> float:
+    return _current_simulator().midprice(external_id)
@@ -0,0 +1,136 @@
+import asyncio
+import heapq
+import time
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence, Tuple
+
+from prometheus_client import REGISTRY, generate_latest
+from prometheus_client.core import GaugeHistogramMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from settings import get_settings
+
+
+settings = get_settings()
+
+AGGREGATED_LABEL = "all"
+
+PNL_BUCKETS: Sequence[float] = (-1000, -100, -10, -1, 0, 1, 10, 100, 1000)
+TICK_AGE_BUCKETS: Sequence[float] = (1, 2, 5, 10, 30, 60, 300)
+
+
+def aggregated_mode() -> bool:
+    return settings.bot_metrics_mode == "aggregated"
+
+
+def market_label(market_id: int) -> str:
+    """Label value used for per-market loop metrics. In aggregated mode every
+    market shares one series so the histograms become fleet-wide summaries."""
+    return AGGREGATED_LABEL if aggregated_mode() else str(market_id)
+
+
+def _gauge_histogram(
+    name: str, documentation: str, values: Iterable[float], bounds: Sequence[float]
+) -> GaugeHistogramMetricFamily:
+    counts = [0] * (len(bounds) + 1)
+    total = 0.0
+    for value in values:
+        total += value
+        for idx, bound in enumerate(bounds):
+            if value <= bound:
+                counts[idx] += 1
+                break
+        else:
+            counts[-1] += 1
+    cumulative = 0
+    buckets = []
+    for bound, count in zip([*map(str, bounds), "+Inf"], counts):
+        cumulative += count
+        buckets.append((bound, cumulative))
+    return GaugeHistogramMetricFamily(name, documentation, buckets=buckets, gsum_value=total)
+
+
+class MarketSummaryCollector(Collector):
+    """Exports a bounded number of series in aggregated metrics mode: the top-K
+    markets by absolute PnL get their own gauges, the remaining markets are
+    folded into gauge histograms. Values are read from the bot's in-memory loop
+    stats at scrape time, so stopped markets disappear without cleanup."""
+
+    def __init__(self, stats_source: Callable[[], Mapping[int, Any]]) -> None:
+        self._stats_source = stats_source
+
+    def collect(self):
+        if not aggregated_mode():
+            return
+        now = time.time()
+        entries: list[Tuple[int, Any]] = list(self._stats_source().items())
+        top_k = max(0, settings.bot_metrics_top_k)
+        top = heapq.nlargest(top_k, entries, key=lambda item: abs(item[1].pnl or 0.0))
+        top_ids = {market_id for market_id, _ in top}
+
+        pnl = GaugeMetricFamily("bot_topk_market_pnl", "Virtual PnL for the top-K markets", labels=["market_id"])
+        mid = GaugeMetricFamily(
+            "bot_topk_market_mid_price", "Latest mid price for the top-K markets", labels=["market_id"]
+        )
+        errors = GaugeMetricFamily(
+            "bot_topk_market_loop_errors", "Loop failures since start for the top-K markets", labels=["market_id"]
+        )
+        age = GaugeMetricFamily(
+            "bot_topk_market_last_tick_age_seconds",
+            "Seconds since the last successful tick for the top-K markets",
+            labels=["market_id"],
+        )
+        for market_id, stats in top:
+            label = [str(market_id)]
+            if stats.pnl is not None:
+                pnl.add_metric(label, stats.pnl)
+            if stats.mid_price is not None:
+                mid.add_metric(label, stats.mid_price)
+            errors.add_metric(label, stats.errors)
+            if stats.last_tick_at is not None:
+                age.add_metric(label, now - stats.last_tick_at)
+        yield from (pnl, mid, errors, age)
+
+        rest = [stats for market_id, stats in entries if market_id not in top_ids]
+        yield GaugeMetricFamily("bot_markets_tracked", "Markets with an active bot loop", value=len(entries))
+        yield _gauge_histogram(
+            "bot_other_market_pnl",
+            "Distribution of virtual PnL across markets outside the top-K",
+            (stats.pnl for stats in rest if stats.pnl is not None),
+            PNL_BUCKETS,
+        )
+        yield _gauge_histogram(
+            "bot_other_market_last_tick_age_seconds",
+            "Distribution of last-tick age across markets outside the top-K",
+            (now - stats.last_tick_at for stats in rest if stats.last_tick_at is not None),
+            TICK_AGE_BUCKETS,
+        )
+
+
+class MetricsPayloadCache:
+    """Serves ``/metrics`` from a short-lived cache. Rendering happens in a worker
+    thread and concurrent scrapes share a single render."""
+
+    def __init__(self, ttl_seconds: float, registry=REGISTRY) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.registry = registry
+        self._payload: Optional[bytes] = None
+        self._rendered_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return self._payload is not None and time.monotonic() - self._rendered_at < self.ttl_seconds
+
+    async def get(self) -> bytes:
+        if self._fresh():
+            return self._payload  # type: ignore[return-value]
+        async with self._lock:
+            if not self._fresh():
+                self._payload = await asyncio.to_thread(generate_latest, self.registry)
+                self._rendered_at = time.monotonic()
+            return self._payload  # type: ignore[return-value]
+
+    def invalidate(self) -> None:
+        self._payload = None
+
+
+metrics_cache = MetricsPayloadCache(settings.metrics_cache_ttl_seconds)
@@ -0,0 +1,276 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from core.exchange import BUY, OrderRequest
+from settings import get_settings
+
+
+settings = get_settings()
+
+# Polymarket CTF Exchange on Polygon mainnet
+DEFAULT_EXCHANGE_ADDRESS = "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
+DOMAIN_NAME = "Polymarket CTF Exchange"
+DOMAIN_VERSION = "1"
+DOMAIN_TYPE = "EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)"
+ORDER_TYPE = (
+    "Order(uint256 salt,address maker,address signer,address taker,uint256 tokenId,"
+    "uint256 makerAmount,uint256 takerAmount,uint256 expiration,uint256 nonce,"
+    "uint256 feeRateBps,uint8 side,uint8 signatureType)"
+)
+ORDER_ABI_TYPES = [
+    "bytes32", "uint256", "address", "address", "address", "uint256",
+    "uint256", "uint256", "uint256", "uint256", "uint256", "uint8", "uint8",
+]
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+# USDC and outcome shares both have 6 decimals
+AMOUNT_SCALE = 10**6
+
+ORDERS_SIGNED = Counter(
+    "order_signer_orders_total",
+    "Orders signed by the order-signing pool",
+)
+SIGNING_DURATION = Histogram(
+    "order_signer_batch_seconds",
+    "Time from submitting a batch of orders to the pool until its signatures are back",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+SIGNING_QUEUE_DEPTH = Gauge(
+    "order_signer_queue_depth",
+    "Orders submitted to the signing pool and not signed yet",
+)
+
+
+class OrderPayload(NamedTuple):
+    """Fields of a CTF Exchange ``Order``, in EIP-712 type order."""
+
+    salt: int
+    maker: str
+    signer: str
+    taker: str
+    token_id: int
+    maker_amount: int
+    taker_amount: int
+    expiration: int
+    nonce: int
+    fee_rate_bps: int
+    side: int
+    signature_type: int
+
+
+class SignedOrder(NamedTuple):
+    order: OrderPayload
+    signature: str
+
+
+class SigningKey(NamedTuple):
+    private_key: str
+    chain_id: int
+    exchange_address: str
+
+    def __repr__(self) -> str:
+        # keep the key out of logs, tracebacks and debug output
+        return f"SigningKey(private_key='<redacted>', chain_id={self.chain_id}, exchange_address={self.exchange_address!r})"
+
+
+def order_from_request(
+    request: OrderRequest,
+    token_id: int,
+    maker: str,
+    salt: int,
+    signer: Optional[str] = None,
+    expiration: int = 0,
+    nonce: int = 0,
+    fee_rate_bps: int = 0,
+    signature_type: int = 0,
+) -> OrderPayload:
+    """CTF Exchange order for a limit order at ``request.price`` for
+    ``request.size`` shares. A buy gives USDC for shares, a sell the reverse."""
+    shares = round(request.size * AMOUNT_SCALE)
+    notional = round(request.price * request.size * AMOUNT_SCALE)
+    buy = request.side == BUY
+    return OrderPayload(
+        salt=salt,
+        maker=maker,
+        signer=signer or maker,
+        taker=ZERO_ADDRESS,
+        token_id=token_id,
+        maker_amount=notional if buy else shares,
+        taker_amount=shares if buy else notional,
+        expiration=expiration,
+        nonce=nonce,
+        fee_rate_bps=fee_rate_bps,
+        side=0 if buy else 1,
+        signature_type=signature_type,
+    )
+
+
+class _PreparedKey(NamedTuple):
+    domain_separator: bytes
+    type_hash: bytes
+    key: object
+    address: str
+
+
+@lru_cache(maxsize=8)
+def _prepare(signing_key: SigningKey) -> _PreparedKey:
+    # Imported here so the API process never pays for eth_* unless it signs;
+    # pool workers pay once, on their first batch or on warm-up.
+    from eth_abi import encode
+    from eth_keys import keys
+    from eth_utils import keccak
+
+    domain_separator = keccak(
+        encode(
+            ["bytes32", "bytes32", "bytes32", "uint256", "address"],
+            [
+                keccak(text=DOMAIN_TYPE),
+                keccak(text=DOMAIN_NAME),
+                keccak(text=DOMAIN_VERSION),
+                signing_key.chain_id,
+                signing_key.exchange_address,
+            ],
+        )
+    )
+    key = keys.PrivateKey(bytes.fromhex(signing_key.private_key.removeprefix("0x")))
+    return _PreparedKey(domain_separator, keccak(text=ORDER_TYPE), key, key.public_key.to_checksum_address())
+
+
+def signer_address(signing_key: SigningKey) -> str:
+    return _prepare(signing_key).address
+
+
+def sign_orders(signing_key: SigningKey, orders: Sequence[OrderPayload]) -> List[str]:
+    """EIP-712 signatures (``0x`` + r, s, v) for ``orders``. Runs in a pool
+    worker; the domain separator and parsed key are cached per process, so a
+    batch costs two keccaks and one ECDSA signature per order."""
+    from eth_abi import encode
+    from eth_utils import keccak
+
+    prepared = _prepare(signing_key)
+    signatures = []
+    for order in orders:
+        struct_hash = keccak(encode(ORDER_ABI_TYPES, [prepared.type_hash, *order]))
+        digest = keccak(b"\x19\x01" + prepared.domain_separator + struct_hash)
+        sig = prepared.key.sign_msg_hash(digest)
+        signatures.append("0x" + (sig.r.to_bytes(32, "big") + sig.s.to_bytes(32, "big") + bytes([sig.v + 27])).hex())
+    return signatures
+
+
+# the key a process-pool worker signs with, set once by ``_init_worker``
+_worker_key: Optional[SigningKey] = None
+
+
+def _init_worker(signing_key: SigningKey) -> None:
+    global _worker_key
+    _worker_key = signing_key
+    _prepare(signing_key)
+
+
+def _sign_in_worker(orders: Sequence[OrderPayload]) -> List[str]:
+    return sign_orders(_worker_key, orders)
+
+
+class OrderSigner:
+    """Signs orders off the event loop in a process pool.
+
+    ``sign_many`` splits its orders into ``batch_size`` chunks and hands the
+    chunks to the workers in parallel, so one IPC round trip carries many
+    signatures and bot loops never block on ECDSA. ``executor="thread"``
+    keeps everything in-process (for tests, or where subprocesses are not
+    allowed).
+
+    Workers are started by a forkserver rather than forked from the API
+    process, so they never inherit its event loop, sockets or held locks. The
+    key is handed to each worker once, by the pool initializer, instead of
+    being pickled into every chunk.
+    """
+
+    def __init__(
+        self,
+        private_key: str,
+        chain_id: int = 137,
+        exchange_address: str = DEFAULT_EXCHANGE_ADDRESS,
+        workers: int = 2,
+        batch_size: int = 64,
+        executor: str = "process",
+    ) -> None:
+        self.signing_key = SigningKey(private_key, chain_id, exchange_address)
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.executor_kind = executor
+        self._executor: Optional[Executor] = None
+
+    @property
+    def address(self) -> str:
+        return signer_address(self.signing_key)
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                    initializer=_init_worker,
+                    initargs=(self.signing_key,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="order-signer")
+        return self._executor
+
+    async def warm_up(self) -> None:
+        """Start every worker and prepare the key there, so the first real
+        batch does not pay for process start-up and imports."""
+        await asyncio.gather(*(self._run(()) for _ in range(self.workers)))
+
+    def _run(self, orders: Sequence[OrderPayload]) -> "asyncio.Future[List[str]]":
+        loop = asyncio.get_running_loop()
+        if self.executor_kind == "process":
+            # process workers already hold the key from the pool initializer
+            return loop.run_in_executor(self._pool(), _sign_in_worker, list(orders))
+        return loop.run_in_executor(self._pool(), sign_orders, self.signing_key, list(orders))
+
+    async def _sign_chunk(self, chunk: Sequence[OrderPayload]) -> List[str]:
+        started = time.perf_counter()
+        try:
+            signatures = await self._run(chunk)
+        finally:
+            SIGNING_QUEUE_DEPTH.dec(len(chunk))
+        SIGNING_DURATION.observe(time.perf_counter() - started)
+        ORDERS_SIGNED.inc(len(chunk))
+        return signatures
+
+    async def sign_many(self, orders: Sequence[OrderPayload]) -> List[SignedOrder]:
+        """Sign ``orders`` and return them with their signatures, in order."""
+        orders = list(orders)
+        SIGNING_QUEUE_DEPTH.inc(len(orders))
+        chunks = [orders[start:start + self.batch_size] for start in range(0, len(orders), self.batch_size)]
+        results = await asyncio.gather(*(self._sign_chunk(chunk) for chunk in chunks))
+        return [SignedOrder(order, signature) for order, signature in zip(orders, (s for r in results for s in r))]
+
+    async def sign(self, order: OrderPayload) -> SignedOrder:
+        return (await self.sign_many([order]))[0]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def build_order_signer() -> Optional[OrderSigner]:
+    """The configured signer, or ``None`` when no key is set."""
+    if not settings.order_signer_private_key:
+        return None
+    return OrderSigner(
+        settings.order_signer_private_key,
+        chain_id=settings.polymarket_chain_id,
+        exchange_address=settings.polymarket_exchange_address,
+        workers=settings.order_signer_workers,
+        batch_size=settings.order_signer_batch_size,
+        executor=settings.order_signer_executor,
+    )
@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import PnLTicks
+
+
+COLUMNS = ("market_id", "ts", "pnl", "inventory")
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# (market_id, ts, pnl, inventory)
+Row = Tuple[int, datetime, float, float]
+
+
+def load_pyarrow():
+    """Import pyarrow, an optional dependency only needed for ``format=arrow``.
+    Raises ``ImportError`` when it is not installed."""
+    import pyarrow
+    import pyarrow.ipc  # noqa: F401
+
+    return pyarrow
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive timestamps; they are written in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def export_query(market_ids: Sequence[int], start: Optional[datetime], end: Optional[datetime]):
+    query = select(PnLTicks.market_id, PnLTicks.ts, PnLTicks.pnl, PnLTicks.inventory)
+    if market_ids:
+        query = query.where(PnLTicks.market_id.in_(market_ids))
+    if start is not None:
+        query = query.where(PnLTicks.ts >= start)
+    if end is not None:
+        query = query.where(PnLTicks.ts < end)
+    return query.order_by(PnLTicks.ts, PnLTicks.id)
+
+
+async def stream_rows(session: AsyncSession, query, chunk_size: int) -> AsyncIterator[List[Row]]:
+    """Chunks of at most ``chunk_size`` rows read through a server-side
+    cursor, so memory stays flat however many rows the range holds."""
+    result = await session.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions(chunk_size):
+        yield [
+            (market_id, as_utc(ts), float(pnl), float(inventory))
+            for market_id, ts, pnl, inventory in partition
+        ]
+
+
+class CsvEncoder:
+    def header(self) -> bytes:
+        return (",".join(COLUMNS) + "\r\n").encode()
+
+    def encode(self, rows: Iterable[Row]) -> bytes:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerows((mid, ts.isoformat(), pnl, inventory) for mid, ts, pnl, inventory in rows)
+        return buf.getvalue().encode()
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class NdjsonEncoder:
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: Iterable[Row]) -> bytes:
+        return "".join(
+            json.dumps(
+                {"market_id": mid, "ts": ts.isoformat(), "pnl": pnl, "inventory": inventory},
+                separators=(",", ":"),
+            )
+            + "\n"
+            for mid, ts, pnl, inventory in rows
+        ).encode()
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class ArrowEncoder:
+    """Arrow IPC stream: the schema, one record batch per chunk, then the
+    end-of-stream marker. Readable with ``pyarrow.ipc.open_stream``."""
+
+    def __init__(self) -> None:
+        self.pa = load_pyarrow()
+        self.schema = self.pa.schema(
+            [
+                ("market_id", self.pa.int64()),
+                ("ts", self.pa.timestamp("us", tz="UTC")),
+                ("pnl", self.pa.float64()),
+                ("inventory", self.pa.float64()),
+            ]
+        )
+        self._sink = io.BytesIO()
+        self._writer = self.pa.ipc.new_stream(self._sink, self.schema)
+
+    def _drain(self) -> bytes:
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def header(self) -> bytes:
+        return self._drain()
+
+    def encode(self, rows: Iterable[Row]) -> bytes:
+        columns = list(zip(*rows)) or [()] * len(COLUMNS)
+        arrays = [self.pa.array(column, type=field.type) for column, field in zip(columns, self.schema)]
+        self._writer.write_batch(self.pa.record_batch(arrays, schema=self.schema))
+        return self._drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._drain()
+
+
+ENCODERS: Dict[str, Callable[[], object]] = {
+    "csv": CsvEncoder,
+    "ndjson": NdjsonEncoder,
+    "arrow": ArrowEncoder,
+}
@@ -0,0 +1,195 @@
+import asyncio
+import itertools
+import logging
+import secrets
+import time
+from collections import deque
+from typing import Callable, Collection, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from models import PnLTicks
+from settings import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class PnLUpdate(NamedTuple):
+    seq: int
+    market_id: int
+    pnl: float
+    inventory: float
+    ts: float
+
+    def as_dict(self) -> Dict[str, object]:
+        return self._asdict()
+
+
+class PnLFeed:
+    """Latest PnL per market, published in-process by the bot loops.
+
+    Streaming endpoints read from here instead of querying ``pnl_ticks`` once
+    per viewer per interval. Markets whose loops run in another worker are
+    seeded from the database on first use and then kept current by
+    ``start_polling``, which reads only ticks newer than the last one seen, so
+    one query per interval serves every viewer in this process.
+
+    Every publish also gets a sequence number and is kept in a ring buffer of
+    the last ``buffer_size`` updates, so SSE and long-poll clients can resume
+    from the last ``seq`` they saw. All waiters share one wake-up event per
+    publish rather than polling.
+
+    Sequence numbers only mean something within one process, so clients get
+    them as ``<epoch>-<seq>`` cursors; a cursor from a previous process or
+    another worker has a different epoch and starts the client over from a
+    snapshot instead of resuming at an unrelated position.
+    """
+
+    def __init__(self, buffer_size: int = 4096) -> None:
+        self.latest: Dict[int, Tuple[float, float]] = {}
+        self.version = 0
+        self.seq = 0
+        self.epoch = secrets.token_hex(4)
+        self._ring: Deque[PnLUpdate] = deque(maxlen=max(1, buffer_size))
+        self._changed: Optional[asyncio.Event] = None
+        self._seeded = False
+        self._seed_lock: Optional[asyncio.Lock] = None
+        self._last_tick_id = 0
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def publish(self, market_id: int, pnl: float, inventory: float) -> None:
+        self.latest[market_id] = (pnl, inventory)
+        self.version += 1
+        self.seq += 1
+        self._ring.append(PnLUpdate(self.seq, market_id, pnl, inventory, time.time()))
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    def cursor(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def parse_cursor(self, cursor: Optional[str]) -> Optional[int]:
+        """The seq in ``cursor``, or ``None`` when it is missing, malformed or
+        from another epoch."""
+        epoch, _, seq = (cursor or "").partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def updates_since(self, since: int) -> Optional[List[PnLUpdate]]:
+        """Updates after ``since``, or ``None`` if some of them were already
+        dropped from the buffer (or ``since`` is ahead of this feed) and the
+        client has to start again from a snapshot."""
+        if since == self.seq:
+            return []
+        if since > self.seq or not self._ring or since < self._ring[0].seq - 1:
+            return None
+        return list(itertools.islice(self._ring, since - self._ring[0].seq + 1, None))
+
+    async def wait_for_updates(self, since: int, timeout: float) -> None:
+        """Return once something newer than ``since`` is published or ``timeout`` elapses."""
+        if self.seq != since:
+            return
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def snapshot(self, market_ids: Optional[List[int]] = None) -> List[Dict[str, object]]:
+        wanted = sorted(self.latest) if not market_ids else sorted(set(market_ids) & set(self.latest))
+        return [
+            {"market_id": market_id, "pnl": self.latest[market_id][0], "inventory": self.latest[market_id][1]}
+            for market_id in wanted
+        ]
+
+    async def ensure_seeded(self, session_factory: Callable) -> None:
+        if self._seeded:
+            return
+        if self._seed_lock is None:
+            self._seed_lock = asyncio.Lock()
+        async with self._seed_lock:
+            if self._seeded:
+                return
+            try:
+                rows = await self._read_ticks(session_factory)
+            except Exception as exc:  # pragma: no cover - stream still serves live ticks
+                logger.warning("Could not seed PnL feed from database: %r", exc)
+                return
+            for _, market_id, pnl, inventory in rows:
+                # ticks published since startup are newer than the table
+                self.latest.setdefault(market_id, (pnl, inventory))
+            self.version += 1
+            self._seeded = True
+
+    async def _read_ticks(self, session_factory: Callable) -> List[Tuple[int, int, float, float]]:
+        """``(id, market_id, pnl, inventory)`` of each market's latest tick
+        newer than the last one read."""
+        last_ids = (
+            select(func.max(PnLTicks.id).label("id"))
+            .where(PnLTicks.id > self._last_tick_id)
+            .group_by(PnLTicks.market_id)
+            .subquery()
+        )
+        async with session_factory() as session:
+            res = await session.execute(
+                select(PnLTicks.id, PnLTicks.market_id, PnLTicks.pnl, PnLTicks.inventory).join(
+                    last_ids, PnLTicks.id == last_ids.c.id
+                )
+            )
+            rows = [(tick_id, market_id, float(pnl), float(inventory)) for tick_id, market_id, pnl, inventory in res]
+        if rows:
+            self._last_tick_id = max(self._last_tick_id, max(row[0] for row in rows))
+        return rows
+
+    async def poll(self, session_factory: Callable, owned: Collection[int] = ()) -> int:
+        """Publish ticks written to the database since the last read for
+        markets not in ``owned`` (whose loops publish here directly); returns
+        the number published."""
+        await self.ensure_seeded(session_factory)
+        published = 0
+        for _, market_id, pnl, inventory in await self._read_ticks(session_factory):
+            if market_id in owned or self.latest.get(market_id) == (pnl, inventory):
+                continue
+            self.publish(market_id, pnl, inventory)
+            published += 1
+        return published
+
+    async def _poller(self, session_factory: Callable, owned: Callable[[], Collection[int]], interval: float) -> None:
+        while True:
+            try:
+                await self.poll(session_factory, owned())
+            except Exception as exc:  # pragma: no cover - keep polling
+                logger.warning("PnL feed poll failed: %r", exc)
+            await asyncio.sleep(interval)
+
+    def start_polling(self, session_factory: Callable, owned: Callable[[], Collection[int]], interval: float) -> None:
+        if interval <= 0 or (self._poll_task and not self._poll_task.done()):
+            return
+        self._poll_task = asyncio.create_task(self._poller(session_factory, owned, interval), name="pnl-feed-poller")
+
+    async def stop_polling(self) -> None:
+        if not self._poll_task:
+            return
+        self._poll_task.cancel()
+        try:
+            await self._poll_task
+        except asyncio.CancelledError:
+            pass
+        self._poll_task = None
+
+    def reset(self) -> None:
+        self.latest.clear()
+        self.version = 0
+        self.seq = 0
+        self.epoch = secrets.token_hex(4)
+        self._ring.clear()
+        self._changed = None
+        self._seeded = False
+        self._last_tick_id = 0
+
+
+pnl_feed = PnLFeed(get_settings().pnl_feed_buffer_size)
@@ -0,0 +1,267 @@
+"""Version 2 of the ``/ws/pnl`` protocol: subscriptions, batched quantized deltas.
+
+Connect with ``/ws/pnl?v=2`` and optionally ``encoding=json|binary``,
+``quantum`` (price resolution, default ``1e-6``), ``interval`` (seconds between
+frames), ``full_every`` (frames between full snapshots) and ``markets`` (comma
+separated ids to subscribe to up front). Subscriptions can be changed with text
+messages ``{"type": "subscribe"|"unsubscribe", "market_ids": [...]}`` and a
+client that lost track can send ``{"type": "resync"}``. Messages that are not
+valid JSON or carry non-integer ids are ignored. A connection whose parameters
+are not finite, or whose ``quantum`` or ``full_every`` is out of range, is
+closed with code 1008.
+
+Every frame covers all changed markets for one interval. Values are integers in
+units of ``quantum``: absolute in snapshot frames, differences from the previous
+frame's values in delta frames. Unchanged markets are omitted and an interval
+with no changes sends nothing. ``seq`` increases by one per frame, so a gap
+means a frame was lost and the client should resync.
+
+JSON frames look like ``{"type": "pnl_delta"|"pnl_snapshot", "seq": 7,
+"m": [[market_id, pnl, inventory], ...]}``. Binary frames are
+``version, kind, varint seq, varint count`` followed by, per market in id
+order, ``varint id_gap, zigzag pnl, zigzag inventory``. permessage-deflate is
+negotiated by the websocket server when the client offers it.
+"""
+import asyncio
+import json
+import logging
+import math
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 2
+FRAME_DELTA = 1
+FRAME_SNAPSHOT = 2
+FRAME_TYPES = {FRAME_DELTA: "pnl_delta", FRAME_SNAPSHOT: "pnl_snapshot"}
+MIN_INTERVAL = 0.05
+MAX_INTERVAL = 60.0
+MAX_FULL_EVERY = 3600
+
+Entry = Tuple[int, int, int]
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def _write_varint(buf: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    shift = 0
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_binary(kind: int, seq: int, entries: Iterable[Entry]) -> bytes:
+    entries = list(entries)
+    buf = bytearray((PROTOCOL_VERSION, kind))
+    _write_varint(buf, seq)
+    _write_varint(buf, len(entries))
+    prev_id = 0
+    for market_id, pnl, inventory in entries:
+        _write_varint(buf, market_id - prev_id)
+        _write_varint(buf, _zigzag(pnl))
+        _write_varint(buf, _zigzag(inventory))
+        prev_id = market_id
+    return bytes(buf)
+
+
+def decode_binary(data: bytes) -> Dict[str, object]:
+    version, kind = data[0], data[1]
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"unsupported frame version {version}")
+    seq, pos = _read_varint(data, 2)
+    count, pos = _read_varint(data, pos)
+    entries: List[List[int]] = []
+    market_id = 0
+    for _ in range(count):
+        gap, pos = _read_varint(data, pos)
+        pnl, pos = _read_varint(data, pos)
+        inventory, pos = _read_varint(data, pos)
+        market_id += gap
+        entries.append([market_id, _unzigzag(pnl), _unzigzag(inventory)])
+    return {"type": FRAME_TYPES[kind], "seq": seq, "m": entries}
+
+
+def encode_json(kind: int, seq: int, entries: Iterable[Entry]) -> str:
+    return json.dumps(
+        {"type": FRAME_TYPES[kind], "seq": seq, "m": [list(entry) for entry in entries]},
+        separators=(",", ":"),
+    )
+
+
+class DeltaEncoder:
+    """Per-connection state: subscriptions and the last values each client holds."""
+
+    def __init__(self, quantum: float, full_every: int, market_ids: Iterable[int] = ()) -> None:
+        self.quantum = quantum
+        self.full_every = max(1, full_every)
+        self.subscribed: Set[int] = set(market_ids)
+        self.sent: Dict[int, Tuple[int, int]] = {}
+        self.seq = 0
+        self._frames_since_full = 0
+        self._force_full = True
+
+    def subscribe(self, market_ids: Iterable[int]) -> None:
+        added = set(market_ids) - self.subscribed
+        if added:
+            self.subscribed |= added
+            self._force_full = True
+
+    def unsubscribe(self, market_ids: Iterable[int]) -> None:
+        for market_id in market_ids:
+            self.subscribed.discard(market_id)
+            self.sent.pop(market_id, None)
+
+    def resync(self) -> None:
+        self._force_full = True
+
+    def _quantize(self, value: float) -> int:
+        return int(round(value / self.quantum))
+
+    def next_frame(self, latest: Mapping[int, Tuple[float, float]]) -> Optional[Tuple[int, int, List[Entry]]]:
+        current = {
+            market_id: (self._quantize(latest[market_id][0]), self._quantize(latest[market_id][1]))
+            for market_id in sorted(self.subscribed)
+            if market_id in latest
+        }
+        if self._force_full or self._frames_since_full >= self.full_every:
+            kind = FRAME_SNAPSHOT
+            entries = [(market_id, pnl, inventory) for market_id, (pnl, inventory) in current.items()]
+            self.sent = dict(current)
+            self._force_full = False
+            self._frames_since_full = 0
+        else:
+            kind = FRAME_DELTA
+            entries = []
+            for market_id, (pnl, inventory) in current.items():
+                prev_pnl, prev_inventory = self.sent.get(market_id, (0, 0))
+                if pnl != prev_pnl or inventory != prev_inventory:
+                    entries.append((market_id, pnl - prev_pnl, inventory - prev_inventory))
+                    self.sent[market_id] = (pnl, inventory)
+            self._frames_since_full += 1
+            if not entries:
+                return None
+        self.seq += 1
+        return kind, self.seq, entries
+
+
+class StreamParams(NamedTuple):
+    encoding: str
+    interval: float
+    quantum: float
+    full_every: int
+    market_ids: List[int]
+
+
+def parse_stream_params(params: Mapping[str, str]) -> StreamParams:
+    """Connection parameters from the query string; raises ``ValueError``
+    when they are malformed or out of range."""
+    encoding = params.get("encoding", "json")
+    interval = float(params.get("interval", "1.0"))
+    quantum = float(params.get("quantum", "0.000001"))
+    full_every = int(params.get("full_every", "30"))
+    market_ids = [int(mid) for mid in params.get("markets", "").split(",") if mid.strip()]
+    if encoding not in ("json", "binary"):
+        raise ValueError("unsupported encoding")
+    # nan and inf slip through min/max clamps and comparisons
+    if not math.isfinite(interval):
+        raise ValueError("interval must be finite")
+    if not (math.isfinite(quantum) and quantum > 0):
+        raise ValueError("quantum must be a positive number")
+    if not 1 <= full_every <= MAX_FULL_EVERY:
+        raise ValueError(f"full_every must be between 1 and {MAX_FULL_EVERY}")
+    interval = min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+    return StreamParams(encoding, interval, quantum, full_every, market_ids)
+
+
+def parse_command(raw: str) -> Tuple[Optional[str], List[int]]:
+    """``(type, market_ids)`` of a client message; raises ``ValueError`` or
+    ``TypeError`` when it is malformed."""
+    message = json.loads(raw)
+    if not isinstance(message, dict):
+        raise ValueError("command must be a JSON object")
+    kind = message.get("type")
+    if kind not in ("subscribe", "unsubscribe"):
+        return kind, []
+    ids = message.get("market_ids", [])
+    if not isinstance(ids, list) or not all(isinstance(mid, int) and not isinstance(mid, bool) for mid in ids):
+        raise TypeError("market_ids must be a list of integers")
+    return kind, ids
+
+
+async def _read_commands(ws: WebSocket, encoder: DeltaEncoder) -> None:
+    while True:
+        message = await ws.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        try:
+            kind, ids = parse_command(message.get("text") or message.get("bytes") or "")
+        except (ValueError, TypeError) as exc:
+            # JSONDecodeError is a ValueError; a bad command must not end the stream
+            logger.debug("Ignoring malformed /ws/pnl command: %r", exc)
+            continue
+        if kind == "subscribe":
+            encoder.subscribe(ids)
+        elif kind == "unsubscribe":
+            encoder.unsubscribe(ids)
+        elif kind == "resync":
+            encoder.resync()
+
+
+async def serve_pnl_stream(
+    ws: WebSocket,
+    latest: Mapping[int, Tuple[float, float]],
+    encoding: str,
+    interval: float,
+    quantum: float,
+    full_every: int,
+    market_ids: Iterable[int],
+) -> None:
+    encoder = DeltaEncoder(quantum, full_every, market_ids)
+    await ws.send_json(
+        {
+            "type": "welcome",
+            "version": PROTOCOL_VERSION,
+            "encoding": encoding,
+            "quantum": quantum,
+            "interval": interval,
+            "full_every": encoder.full_every,
+            "market_ids": sorted(encoder.subscribed),
+        }
+    )
+    reader = asyncio.create_task(_read_commands(ws, encoder))
+    try:
+        while not reader.done():
+            frame = encoder.next_frame(latest)
+            if frame is not None:
+                if encoding == "binary":
+                    await ws.send_bytes(encode_binary(*frame))
+                else:
+                    await ws.send_text(encode_json(*frame))
+            # returns early when the reader ends, i.e. the client went away
+            await asyncio.wait({reader}, timeout=interval)
+        reader.result()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
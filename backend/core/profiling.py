@@ -0,0 +1,117 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Dict, List, Mapping, Optional
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({code.co_filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _fold(frame: Optional[FrameType]) -> List[str]:
+    stack: List[str] = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler for the running process.
+
+    A background thread snapshots every thread's stack with
+    ``sys._current_frames()`` and aggregates them in the collapsed-stack format
+    used by ``flamegraph.pl``, speedscope and friends (``a;b;c <count>``).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stacks: Counter = Counter()
+        self.interval_seconds = 0.005
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.samples = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration_seconds: float, interval_seconds: float = 0.005) -> bool:
+        with self._lock:
+            if self.running:
+                return False
+            self._stacks = Counter()
+            self.samples = 0
+            self.interval_seconds = interval_seconds
+            self.started_at = time.time()
+            self.stopped_at = None
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(duration_seconds,),
+                name="sampling-profiler",
+                daemon=True,
+            )
+            self._thread.start()
+            return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self, duration_seconds: float) -> None:
+        own_ident = threading.get_ident()
+        thread_names = {}
+        deadline = time.monotonic() + duration_seconds
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                if ident not in thread_names:
+                    thread_names = {t.ident: t.name for t in threading.enumerate()}
+                stack = [f"thread:{thread_names.get(ident, ident)}", *_fold(frame)]
+                self._stacks[";".join(stack)] += 1
+            self.samples += 1
+            self._stop.wait(self.interval_seconds)
+        self.stopped_at = time.time()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self._stacks.items()))
+
+
+def dump_task_stacks(labels: Optional[Mapping[asyncio.Task, str]] = None, limit: int = 50) -> List[Dict[str, object]]:
+    """Describe every asyncio task on the running loop with its suspended stack."""
+    labels = labels or {}
+    tasks = []
+    for task in asyncio.all_tasks():
+        coro = task.get_coro()
+        frames = [
+            f"{frame.f_code.co_filename}:{frame.f_lineno} in {getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)}"
+            for frame in task.get_stack(limit=limit)
+        ]
+        tasks.append(
+            {
+                "name": task.get_name(),
+                "label": labels.get(task),
+                "coro": getattr(coro, "__qualname__", repr(coro)),
+                "done": task.done(),
+                "cancelled": task.cancelled(),
+                "stack": frames,
+            }
+        )
+    tasks.sort(key=lambda item: (item["label"] is None, str(item["label"] or item["name"])))
+    return tasks
+
+
+profiler = SamplingProfiler()
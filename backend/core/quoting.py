@@ -0,0 +1,352 @@
+import asyncio
+import logging
+import math
+import secrets
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from core.exchange import BUY, SELL, ExchangeAdapter, Fill, OrderRequest, build_exchange_adapter
+from core.order_signing import OrderSigner, build_order_signer, order_from_request
+from settings import get_settings
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# a resting order is kept while at least this share of the wanted size is left
+SIZE_TOLERANCE = 0.25
+
+ORDER_ACTIONS = Counter(
+    "bot_orders_total",
+    "Order placements and cancels sent to the exchange adapter",
+    ["action"],
+)
+ORDER_BATCH_SIZE = Histogram(
+    "bot_order_batch_size",
+    "Orders per exchange adapter call",
+    ["action"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+ORDER_FILLS = Counter(
+    "bot_order_fills_total",
+    "Fills of our resting orders reported by the exchange adapter",
+)
+QUOTE_UPDATE_DURATION = Histogram(
+    "bot_quote_update_seconds",
+    "Time from computing a market's quotes until its order changes were acknowledged",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+QUOTES_UNCHANGED = Counter(
+    "bot_quotes_unchanged_total",
+    "Quote updates that needed no order changes",
+)
+
+
+class Quote(NamedTuple):
+    side: str
+    price: float
+    size: float
+
+
+class RestingQuote(NamedTuple):
+    order_id: str
+    price: float
+    size: float
+
+
+def compute_quotes(
+    mid: float,
+    inventory: float,
+    spread_bps: float,
+    size: float,
+    inventory_cap: float,
+    skew: float = 1.0,
+    tick_size: float = 0.001,
+) -> Dict[str, Quote]:
+    """Bid and ask around ``mid`` for a market quoted at ``spread_bps``.
+
+    Inventory moves both quotes against the position: at the cap the centre
+    sits ``skew`` half-spreads below (long) or above (short) the mid, and the
+    side that would grow the position shrinks to nothing. Prices are rounded
+    outwards to ``tick_size`` and kept inside the ``(0, 1)`` price range.
+    """
+    half = max(mid * spread_bps / 20000.0, tick_size)
+    ratio = max(-1.0, min(1.0, inventory / inventory_cap)) if inventory_cap > 0 else 0.0
+    centre = mid - ratio * skew * half
+    bid = math.floor((centre - half) / tick_size + 1e-9) * tick_size
+    ask = math.ceil((centre + half) / tick_size - 1e-9) * tick_size
+    bid_size = size * (1.0 - max(ratio, 0.0))
+    ask_size = size * (1.0 - max(-ratio, 0.0))
+    if inventory_cap > 0:
+        bid_size = min(bid_size, max(0.0, inventory_cap - inventory))
+        ask_size = min(ask_size, max(0.0, inventory_cap + inventory))
+
+    quotes: Dict[str, Quote] = {}
+    if bid_size > 0 and bid >= tick_size:
+        quotes[BUY] = Quote(BUY, round(bid, 6), round(bid_size, 6))
+    if ask_size > 0 and ask <= 1.0 - tick_size:
+        quotes[SELL] = Quote(SELL, round(ask, 6), round(ask_size, 6))
+    return quotes
+
+
+def diff_quotes(
+    market_id: int,
+    resting: Dict[str, RestingQuote],
+    desired: Dict[str, Quote],
+) -> Tuple[List[OrderRequest], List[str]]:
+    """Orders to place and order ids to cancel so ``resting`` becomes
+    ``desired``. A side whose price is unchanged and that still has most of
+    its size is left alone."""
+    places: List[OrderRequest] = []
+    cancels: List[str] = []
+    for side in (BUY, SELL):
+        current, wanted = resting.get(side), desired.get(side)
+        if current is not None and wanted is not None:
+            if current.price == wanted.price and current.size >= wanted.size * (1 - SIZE_TOLERANCE):
+                continue
+        if current is not None:
+            cancels.append(current.order_id)
+        if wanted is not None:
+            places.append(OrderRequest(market_id, side, wanted.price, wanted.size))
+    return places, cancels
+
+
+class OrderBatcher:
+    """Coalesces order changes from many market loops into batched adapter
+    calls.
+
+    Each ``submit`` waits up to ``max_delay`` seconds for other loops to
+    join its batch; the batch then sends all cancels, then all placements,
+    ``batch_size`` orders per call. Cancels go first so a replaced quote
+    never rests next to its successor. With a ``signer`` every placement is
+    signed in the signer's pool, one ``sign_many`` per batch, and sent with
+    its signature.
+    """
+
+    def __init__(
+        self,
+        adapter: ExchangeAdapter,
+        batch_size: int = 100,
+        max_delay: float = 0.002,
+        signer: Optional[OrderSigner] = None,
+    ) -> None:
+        self.adapter = adapter
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        self.signer = signer
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: list = []
+
+    async def submit(self, places: Sequence[OrderRequest], cancels: Sequence[str]) -> List[str]:
+        """Send the changes and return the new order ids, one per placement."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="order-batcher")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((list(places), list(cancels), future))
+        return await future
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            self._batch = batch = [await self._queue.get()]
+            await asyncio.sleep(self.max_delay)
+            pending = len(batch[0][0]) + len(batch[0][1])
+            while pending < self.batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                batch.append(item)
+                pending += len(item[0]) + len(item[1])
+            await self._send(batch)
+            self._batch = []
+
+    def _chunks(self, items: list) -> List[list]:
+        return [items[start:start + self.batch_size] for start in range(0, len(items), self.batch_size)]
+
+    async def _sign(self, places: List[OrderRequest]) -> Optional[List[str]]:
+        if self.signer is None or not places:
+            return None
+        maker = self.signer.address
+        # the market id stands in for the CTF token id: the simulated venue
+        # books by market, and a live adapter maps markets to token ids
+        payloads = [
+            order_from_request(order, token_id=order.market_id, maker=maker, salt=secrets.randbits(64))
+            for order in places
+        ]
+        return [signed.signature for signed in await self.signer.sign_many(payloads)]
+
+    async def _send(self, batch: List[Tuple[List[OrderRequest], List[str], asyncio.Future]]) -> None:
+        cancels = [order_id for _, item_cancels, _ in batch for order_id in item_cancels]
+        places = [order for item_places, _, _ in batch for order in item_places]
+        try:
+            signatures = await self._sign(places)
+            for chunk in self._chunks(cancels):
+                await self.adapter.cancel_orders(chunk)
+                ORDER_ACTIONS.labels(action="cancel").inc(len(chunk))
+                ORDER_BATCH_SIZE.labels(action="cancel").observe(len(chunk))
+            order_ids: List[str] = []
+            for chunk in self._chunks(places):
+                chunk_signatures = None
+                if signatures is not None:
+                    chunk_signatures = signatures[len(order_ids):len(order_ids) + len(chunk)]
+                order_ids.extend(await self.adapter.place_orders(chunk, chunk_signatures))
+                ORDER_ACTIONS.labels(action="place").inc(len(chunk))
+                ORDER_BATCH_SIZE.labels(action="place").observe(len(chunk))
+        except Exception as exc:
+            logger.warning("Order batch of %s cancels and %s placements failed: %r", len(cancels), len(places), exc)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        offset = 0
+        for item_places, _, future in batch:
+            if not future.done():
+                future.set_result(order_ids[offset:offset + len(item_places)])
+            offset += len(item_places)
+
+    async def warm_up(self) -> None:
+        if self.signer is not None:
+            await self.signer.warm_up()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        # nobody would ever resolve these; wake their submitters up
+        pending = list(self._batch)
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, _, future in pending:
+            future.cancel()
+        self._batch = []
+        self._task = None
+        self._queue = None
+        if self.signer is not None:
+            self.signer.close()
+
+
+class QuotingEngine:
+    """Keeps two-sided quotes resting for each market and sends only the
+    orders that changed since the last tick, through an ``OrderBatcher``."""
+
+    def __init__(
+        self,
+        adapter: ExchangeAdapter,
+        quote_size: float,
+        inventory_cap: float,
+        skew: float = 1.0,
+        tick_size: float = 0.001,
+        batch_size: int = 100,
+        max_delay: float = 0.002,
+        signer: Optional[OrderSigner] = None,
+    ) -> None:
+        self.adapter = adapter
+        self.batcher = OrderBatcher(adapter, batch_size, max_delay, signer)
+        self.quote_size = quote_size
+        self.inventory_cap = inventory_cap
+        self.skew = skew
+        self.tick_size = tick_size
+        self.resting: Dict[int, Dict[str, RestingQuote]] = {}
+        # order changes sent to the batcher and not acknowledged yet
+        self.inflight: Dict[int, Set[asyncio.Task]] = {}
+        self.closed = False
+
+    async def sync_fills(self, market_id: int, mid: float) -> List[Fill]:
+        """Report the latest mid to the adapter and collect fills of our
+        orders since the last call, shrinking the resting quotes they hit."""
+        await self.adapter.observe_mid(market_id, mid)
+        fills = await self.adapter.fetch_fills(market_id)
+        resting = self.resting.get(market_id, {})
+        for fill in fills:
+            current = resting.get(fill.side)
+            if current is None or current.order_id != fill.order_id:
+                continue
+            remaining = current.size - fill.size
+            if remaining <= 1e-9:
+                del resting[fill.side]
+            else:
+                resting[fill.side] = current._replace(size=remaining)
+        ORDER_FILLS.inc(len(fills))
+        return fills
+
+    async def requote(self, market_id: int, mid: float, inventory: float, spread_bps: float) -> Tuple[int, int]:
+        """Move the market's quotes to where they should be now and return
+        the number of orders placed and cancelled."""
+        if self.closed:
+            return 0, 0
+        started = time.perf_counter()
+        desired = compute_quotes(
+            mid, inventory, spread_bps, self.quote_size, self.inventory_cap, self.skew, self.tick_size
+        )
+        resting = self.resting.setdefault(market_id, {})
+        places, cancels = diff_quotes(market_id, resting, desired)
+        if not places and not cancels:
+            QUOTES_UNCHANGED.inc()
+            return 0, 0
+        # Shielded: a loop cancelled mid-submit must not lose the ids of orders
+        # the batch still places, or cancel_market could not take them down.
+        task = asyncio.ensure_future(self._submit(market_id, places, cancels))
+        inflight = self.inflight.setdefault(market_id, set())
+        inflight.add(task)
+        task.add_done_callback(self._settled)
+        await asyncio.shield(task)
+        QUOTE_UPDATE_DURATION.observe(time.perf_counter() - started)
+        return len(places), len(cancels)
+
+    def _settled(self, task: asyncio.Task) -> None:
+        for inflight in self.inflight.values():
+            inflight.discard(task)
+        # mark the exception retrieved; a requote still waiting re-raises it
+        if not task.cancelled():
+            task.exception()
+
+    async def _submit(self, market_id: int, places: List[OrderRequest], cancels: List[str]) -> None:
+        # resting is only updated once the batch went through; after a failure
+        # the next tick cancels (unknown ids are ignored) and places again
+        order_ids = await self.batcher.submit(places, cancels)
+        resting = self.resting.setdefault(market_id, {})
+        for side in [side for side, quote in resting.items() if quote.order_id in cancels]:
+            del resting[side]
+        for request, order_id in zip(places, order_ids):
+            resting[request.side] = RestingQuote(order_id, request.price, request.size)
+
+    async def cancel_market(self, market_id: int) -> None:
+        inflight = self.inflight.pop(market_id, set())
+        if inflight:
+            # let pending changes land so the orders they place are cancelled too
+            await asyncio.wait(inflight)
+        resting = self.resting.pop(market_id, {})
+        if resting:
+            await self.batcher.submit([], [quote.order_id for quote in resting.values()])
+
+    async def close(self) -> None:
+        """Cancel every resting quote and stop the batcher; later requotes
+        are ignored so loops still running during shutdown place nothing."""
+        self.closed = True
+        try:
+            markets = set(self.resting) | set(self.inflight)
+            await asyncio.gather(*(self.cancel_market(market_id) for market_id in markets))
+        finally:
+            await self.batcher.stop()
+            await self.adapter.close()
+
+
+def build_quoting_engine() -> Optional[QuotingEngine]:
+    if not settings.bot_quoting:
+        return None
+    return QuotingEngine(
+        build_exchange_adapter(settings.bot_exchange),
+        quote_size=settings.bot_quote_size,
+        inventory_cap=settings.bot_inventory_cap,
+        skew=settings.bot_quote_skew,
+        tick_size=settings.bot_quote_tick_size,
+        batch_size=settings.bot_order_batch_size,
+        max_delay=settings.bot_order_batch_delay_ms / 1000.0,
+        signer=build_order_signer(),
+    )
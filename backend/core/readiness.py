@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Startup checks that gate ``/ready``.
+
+    ``/health`` only says the process is alive; ``/ready`` stays 503 until
+    every expected check has passed, so load balancers and rolling deploys
+    keep traffic away from a pod that is still warming up.
+    """
+
+    def __init__(self) -> None:
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self.started_at = time.monotonic()
+        self.ready_after: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def expect(self, *names: str) -> None:
+        for name in names:
+            self.checks[name] = {"status": "pending"}
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.checks) and all(check["status"] == "ok" for check in self.checks.values())
+
+    async def check_until_ok(
+        self,
+        name: str,
+        attempt: Callable[[], Awaitable[Any]],
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+    ) -> None:
+        """Run ``check`` on a fresh ``attempt()`` until it passes, backing off
+        exponentially, so a dependency that comes up late (or recovers) still
+        makes the pod ready instead of leaving ``/ready`` at 503 for good."""
+        delay = initial_delay
+        attempts = 1
+        while not await self.check(name, attempt()):
+            self.checks[name].update(attempts=attempts, retry_in_seconds=delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
+            attempts += 1
+
+    async def check(self, name: str, awaitable: Awaitable[Any]) -> bool:
+        self.checks[name] = {"status": "running"}
+        started = time.perf_counter()
+        try:
+            await awaitable
+        except Exception as exc:
+            logger.exception("Startup check %s failed", name)
+            self.checks[name] = {"status": "failed", "error": repr(exc), "seconds": round(time.perf_counter() - started, 4)}
+            return False
+        self.checks[name] = {"status": "ok", "seconds": round(time.perf_counter() - started, 4)}
+        if self.ready and self.ready_after is None:
+            self.ready_after = time.monotonic() - self.started_at
+            logger.info("Ready %.3fs after startup", self.ready_after)
+        return True
+
+    def start(self, warm_up: Callable[[], Awaitable[None]]) -> None:
+        self.started_at = time.monotonic()
+        self._task = asyncio.create_task(warm_up(), name="startup-warm-up")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "ready_after_seconds": self.ready_after, "checks": self.checks}
+
+
+readiness = Readiness()
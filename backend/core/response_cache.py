@@ -0,0 +1,129 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+
+from settings import get_settings
+
+
+settings = get_settings()
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+    expires_at: float
+
+
+class ResponseCache:
+    """Rendered JSON bodies for read endpoints, keyed by namespace and query.
+
+    Writes in this process call ``invalidate`` for the namespaces they touch;
+    the per-namespace TTL bounds staleness for writes made elsewhere (other
+    workers, bot loops inserting ticks). A per-namespace generation counter
+    stops a render that raced an invalidation from being stored.
+    """
+
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 1024) -> None:
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], CachedResponse]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def get(self, namespace: str, key: Hashable, now: Optional[float] = None) -> Optional[CachedResponse]:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return None
+        if entry.expires_at <= (time.monotonic() if now is None else now):
+            del self._entries[(namespace, key)]
+            return None
+        self._entries.move_to_end((namespace, key))
+        return entry
+
+    def put(
+        self,
+        namespace: str,
+        key: Hashable,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None,
+        generation: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> CachedResponse:
+        now = time.monotonic() if now is None else now
+        entry = CachedResponse(
+            body,
+            f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            headers or {},
+            now + self.ttls.get(namespace, 0.0),
+        )
+        if generation is not None and generation != self.generation(namespace):
+            return entry
+        if self.max_entries <= 0 or self.ttls.get(namespace, 0.0) <= 0:
+            return entry
+        self._entries[(namespace, key)] = entry
+        self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, namespace: str, key: Optional[Hashable] = None) -> None:
+        self._generations[namespace] = self.generation(namespace) + 1
+        if key is not None:
+            self._entries.pop((namespace, key), None)
+            return
+        for cache_key in [k for k in self._entries if k[0] == namespace]:
+            del self._entries[cache_key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generations.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def cached_json_response(
+    request: Request,
+    namespace: str,
+    key: Hashable,
+    render: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]],
+    cache: Optional["ResponseCache"] = None,
+) -> Response:
+    """Serve ``render()``'s payload through the cache, answering 304 when the
+    client already holds the current body. ``render`` returns the payload and
+    any extra headers to cache with it."""
+    cache = cache or response_cache
+    entry = cache.get(namespace, key)
+    if entry is None:
+        generation = cache.generation(namespace)
+        payload, headers = await render()
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        entry = cache.put(namespace, key, body, headers, generation=generation)
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCache(
+    {
+        "markets": settings.response_cache_markets_ttl_seconds,
+        "pnl": settings.response_cache_pnl_ttl_seconds,
+    },
+    max_entries=settings.response_cache_max_entries,
+)
@@ -0,0 +1,256 @@
+import asyncio
+import importlib
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from prometheus_client import Gauge, Histogram
+
+from settings import get_settings
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PORTFOLIO_VAR = Gauge(
+    "risk_portfolio_var",
+    "One-interval portfolio value at risk in USDC at the configured confidence",
+    ["method"],
+)
+PORTFOLIO_EXPOSURE = Gauge(
+    "risk_portfolio_exposure",
+    "Position notional across markets in USDC (gross: sum of absolute values)",
+    ["kind"],
+)
+RISK_MARKETS = Gauge(
+    "risk_markets",
+    "Markets included in the last portfolio risk update",
+)
+RISK_UPDATE_DURATION = Histogram(
+    "risk_update_seconds",
+    "Time taken by one portfolio risk update",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+# Positions, in shares, keyed by market id, together with the latest prices.
+RiskInputs = Tuple[Mapping[int, float], Mapping[int, float]]
+
+
+def load_numpy() -> None:
+    """Import numpy (~100ms) from the startup warm-up or on first use rather
+    than when this module is imported; the functions below import it locally,
+    which only costs a ``sys.modules`` lookup once it is loaded."""
+    importlib.import_module("numpy")
+
+
+@dataclass
+class RiskSnapshot:
+    ts: float
+    markets: int
+    observations: int
+    gross_exposure: float
+    net_exposure: float
+    volatility: float
+    var_parametric: float
+    var_historical: Optional[float]
+    compute_seconds: float
+    # (market_id, position, exposure, component VaR), largest contribution first
+    contributions: List[Tuple[int, float, float, float]] = field(default_factory=list)
+
+    def as_dict(self, top: int) -> dict:
+        return {
+            "ts": self.ts,
+            "markets": self.markets,
+            "observations": self.observations,
+            "gross_exposure": self.gross_exposure,
+            "net_exposure": self.net_exposure,
+            "volatility": self.volatility,
+            "var_parametric": self.var_parametric,
+            "var_historical": self.var_historical,
+            "compute_seconds": self.compute_seconds,
+            "top_contributors": [
+                {"market_id": mid, "position": position, "exposure": exposure, "component_var": component}
+                for mid, position, exposure, component in self.contributions[:top]
+            ],
+        }
+
+
+class RiskEngine:
+    """Portfolio risk across all quoted markets, updated incrementally.
+
+    Every update takes the latest price and position (shares) of each market.
+    Price changes since the previous update go into a ring buffer of the last
+    ``window`` updates and into an exponentially weighted covariance matrix
+    (zero mean, RiskMetrics style), updated in place as
+    ``cov = lam * cov + (1 - lam) * dp dp'`` with ``lam`` set from
+    ``halflife`` updates. Since PnL is linear in price, the portfolio PnL
+    standard deviation is ``sqrt(x' cov x)`` for positions ``x``. Parametric
+    VaR scales it by the normal quantile; historical VaR is the loss quantile
+    of ``returns @ x`` over the ring buffer.
+
+    Markets keep a slot in the arrays for as long as they are reported; a
+    market that drops out frees its slot and its covariance row and column are
+    cleared for the next market to use it.
+    """
+
+    def __init__(self, window: int = 512, halflife: float = 60.0, confidence: float = 0.99, capacity: int = 64) -> None:
+        load_numpy()
+        self.window = window
+        self.lam = 0.5 ** (1.0 / halflife)
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf(confidence)
+        self.slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self.updates = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        import numpy as np
+
+        old = getattr(self, "capacity", 0)
+        last_price = np.full(capacity, np.nan)
+        returns = np.zeros((self.window, capacity))
+        cov = np.zeros((capacity, capacity))
+        if old:
+            last_price[:old] = self.last_price
+            returns[:, :old] = self.returns
+            cov[:old, :old] = self.cov
+        self._free.extend(range(capacity - 1, old - 1, -1))
+        self.capacity = capacity
+        self.last_price, self.returns, self.cov = last_price, returns, cov
+
+    def _release(self, market_id: int) -> None:
+        import numpy as np
+
+        slot = self.slots.pop(market_id)
+        self.last_price[slot] = np.nan
+        self.returns[:, slot] = 0.0
+        self.cov[slot, :] = 0.0
+        self.cov[:, slot] = 0.0
+        self._free.append(slot)
+
+    def _slot(self, market_id: int) -> int:
+        slot = self.slots.get(market_id)
+        if slot is None:
+            if not self._free:
+                self._allocate(self.capacity * 2)
+            slot = self.slots[market_id] = self._free.pop()
+        return slot
+
+    def update(self, prices: Mapping[int, float], positions: Mapping[int, float]) -> RiskSnapshot:
+        import numpy as np
+
+        started = time.perf_counter()
+        for market_id in [mid for mid in self.slots if mid not in prices]:
+            self._release(market_id)
+        ids = list(prices)
+        idx = np.fromiter((self._slot(mid) for mid in ids), dtype=np.intp, count=len(ids))
+        current = np.full(self.capacity, np.nan)
+        current[idx] = np.fromiter((prices[mid] for mid in ids), dtype=float, count=len(ids))
+        x = np.zeros(self.capacity)
+        x[idx] = np.fromiter((positions.get(mid, 0.0) for mid in ids), dtype=float, count=len(ids))
+
+        # markets seen for the first time contribute no move this update
+        dp = np.nan_to_num(current - self.last_price, nan=0.0)
+        self.last_price = current
+        self.returns[self.updates % self.window] = dp
+        self.updates += 1
+
+        self.cov *= self.lam
+        moved = np.flatnonzero(dp)
+        if len(moved) * 2 < self.capacity:
+            # a quiet tick only touches the rows and columns of markets that moved
+            self.cov[np.ix_(moved, moved)] += (1 - self.lam) * np.outer(dp[moved], dp[moved])
+        else:
+            self.cov += (1 - self.lam) * np.outer(dp, dp)
+
+        sigma_x = self.cov @ x
+        volatility = math.sqrt(max(float(x @ sigma_x), 0.0))
+        filled = min(self.updates, self.window)
+        var_historical = None
+        if filled >= 20:
+            pnl = self.returns[:filled] @ x
+            var_historical = max(0.0, -float(np.quantile(pnl, 1 - self.confidence)))
+
+        exposure = np.nan_to_num(x * current, nan=0.0)
+        # Euler allocation: components sum to the parametric VaR
+        component = self.z * x * sigma_x / volatility if volatility > 0 else np.zeros(self.capacity)
+        order = idx[np.argsort(-np.abs(component[idx]))]
+        market_of = {slot: mid for mid, slot in self.slots.items()}
+        return RiskSnapshot(
+            ts=time.time(),
+            markets=len(ids),
+            observations=self.updates,
+            gross_exposure=float(np.abs(exposure).sum()),
+            net_exposure=float(exposure.sum()),
+            volatility=volatility,
+            var_parametric=self.z * volatility,
+            var_historical=var_historical,
+            compute_seconds=time.perf_counter() - started,
+            contributions=[
+                (market_of[slot], float(x[slot]), float(exposure[slot]), float(component[slot])) for slot in order
+            ],
+        )
+
+
+class RiskMonitor:
+    """Runs ``RiskEngine.update`` on a fixed interval from the bot's current
+    prices and positions and publishes the result as gauges and ``/risk``."""
+
+    def __init__(self) -> None:
+        self.engine: Optional[RiskEngine] = None
+        self.latest: Optional[RiskSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def refresh(self, source: Callable[[], RiskInputs]) -> RiskSnapshot:
+        return self._apply(*source())
+
+    def _apply(self, prices: Mapping[int, float], positions: Mapping[int, float]) -> RiskSnapshot:
+        if self.engine is None:
+            self.engine = RiskEngine(settings.risk_window, settings.risk_halflife_updates, settings.risk_confidence)
+        snapshot = self.engine.update(prices, positions)
+        RISK_UPDATE_DURATION.observe(snapshot.compute_seconds)
+        RISK_MARKETS.set(snapshot.markets)
+        PORTFOLIO_VAR.labels(method="parametric").set(snapshot.var_parametric)
+        if snapshot.var_historical is not None:
+            PORTFOLIO_VAR.labels(method="historical").set(snapshot.var_historical)
+        PORTFOLIO_EXPOSURE.labels(kind="gross").set(snapshot.gross_exposure)
+        PORTFOLIO_EXPOSURE.labels(kind="net").set(snapshot.net_exposure)
+        self.latest = snapshot
+        return snapshot
+
+    async def _run(self, source: Callable[[], RiskInputs]) -> None:
+        await asyncio.to_thread(load_numpy)
+        while True:
+            try:
+                # inputs are read on the loop; the matrix work (tens of ms at
+                # thousands of markets) runs in a thread
+                await asyncio.to_thread(self._apply, *source())
+            except Exception as exc:  # pragma: no cover - keep the monitor alive
+                logger.warning("Portfolio risk update failed: %r", exc)
+            await asyncio.sleep(settings.risk_interval_seconds)
+
+    def start(self, source: Callable[[], RiskInputs]) -> None:
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(source), name="portfolio-risk")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def reset(self) -> None:
+        self.engine = None
+        self.latest = None
+
+
+risk_monitor = RiskMonitor()
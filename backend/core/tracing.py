@@ -0,0 +1,247 @@
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Protocol
+
+from settings import get_settings
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: List[Span]) -> None: ...
+
+
+class FileSpanExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            for span in spans:
+                fh.write(json.dumps(span.to_dict()) + "\n")
+
+
+class OtlpHttpSpanExporter:
+    """Posts spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str = "polymarket-bot-backend") -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+
+    def _encode(self, spans: List[Span]) -> Dict[str, Any]:
+        def _attr(key: str, value: Any) -> Dict[str, Any]:
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        otlp_spans = []
+        for span in spans:
+            item: Dict[str, Any] = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [_attr(k, v) for k, v in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_span_id:
+                item["parentSpanId"] = span.parent_span_id
+            otlp_spans.append(item)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_attr("service.name", self.service_name)]},
+                    "scopeSpans": [{"scope": {"name": "core.bot_manager"}, "spans": otlp_spans}],
+                }
+            ]
+        }
+
+    def export(self, spans: List[Span]) -> None:
+        import httpx
+
+        resp = httpx.post(self.endpoint, json=self._encode(spans), timeout=5.0)
+        resp.raise_for_status()
+
+
+class _BatchSpanProcessor:
+    """Buffers finished spans and hands them to the exporter on a worker thread,
+    so file and network I/O never runs on the event loop.
+
+    A batch goes out once ``batch_size`` spans have finished or the oldest has
+    waited ``flush_interval`` seconds, whichever comes first, so a quiet bot
+    still exports its spans. ``shutdown`` exports whatever is left."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        batch_size: int = 256,
+        max_queue: int = 64,
+        flush_interval: float = 5.0,
+    ) -> None:
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._buffer: List[Span] = []
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=max_queue)
+        self._worker = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._worker.start()
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(span)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def _take(self) -> List[Span]:
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        return batch
+
+    def flush(self) -> None:
+        batch = self._take()
+        if not batch:
+            return
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            logger.warning("Dropping %d spans: exporter queue is full", len(batch))
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Queue the buffered spans and wait up to ``timeout`` seconds for the
+        worker to export everything queued."""
+        if not self._worker.is_alive():
+            return
+        self.flush()
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Span exporter did not drain its queue before shutdown")
+            return
+        self._worker.join(timeout)
+
+    def _export(self, batch: List[Span]) -> None:
+        try:
+            self.exporter.export(batch)
+        except Exception as exc:  # pragma: no cover - best-effort export
+            logger.warning("Span export failed: %r", exc)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # nothing filled a batch for a whole interval: export what there is
+                batch = self._take()
+            if batch is None:
+                return
+            if batch:
+                self._export(batch)
+
+
+class Tracer:
+    """Minimal OpenTelemetry-style tracer. With no exporter configured spans are
+    not allocated at all, so instrumentation costs nothing when tracing is off."""
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter] = None,
+        batch_size: int = 256,
+        flush_interval: float = 5.0,
+    ) -> None:
+        self._processor = (
+            _BatchSpanProcessor(exporter, batch_size, flush_interval=flush_interval) if exporter else None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._processor is not None
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+        if self._processor is None:
+            yield None
+            return
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent.span_id if parent else None,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = repr(exc)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            self._processor.on_end(span)
+
+    def flush(self) -> None:
+        if self._processor is not None:
+            self._processor.flush()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Export every finished span; the exporter thread is a daemon, so
+        spans still buffered when the process exits are otherwise lost."""
+        if self._processor is not None:
+            self._processor.shutdown(timeout)
+
+
+def build_tracer() -> Tracer:
+    exporter_name = settings.bot_trace_exporter
+    flush_interval = settings.bot_trace_flush_seconds
+    if exporter_name == "file":
+        return Tracer(FileSpanExporter(settings.bot_trace_file), flush_interval=flush_interval)
+    if exporter_name == "otlp":
+        return Tracer(OtlpHttpSpanExporter(settings.bot_trace_otlp_endpoint), flush_interval=flush_interval)
+    if exporter_name not in ("", "none"):
+        logger.warning("Unknown BOT_TRACE_EXPORTER %r; tracing disabled", exporter_name)
+    return Tracer()
+
+
+tracer = build_tracer()
@@ -5,16 +5,35 @@ from fastapi.responses import JSONResponse, Response
 from starlette.websockets import WebSocketState
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
-from db import get_session, init_db
+from prometheus_client import CONTENT_TYPE_LATEST
+from core.bot_manager import bot_manager
+from core.loop_monitor import loop_lag_monitor
+from core.market_sim import get_market_simulator
+from core.metrics import metrics_cache
+from core.pnl_feed import pnl_feed
+from core.pnl_protocol import PROTOCOL_VERSION, parse_stream_params, serve_pnl_stream
+from core.readiness import readiness
+from core.response_cache import cached_json_response
+from core.risk import risk_monitor
+from core.tracing import tracer
+from db import ReadSessionLocal, dispose_engines, get_read_session, init_db, warm_pool
 from models import Market, PnLTicks
+from polymarket_client import close_http_client, warm_up_http_client
 from routes.markets import router as markets_router
-from routes.auth import router as auth_router
+from routes.auth import get_nonce_store, nonce_audit, router as auth_router
+from routes.debug import router as debug_router
+from routes.pnl import router as pnl_router
+from routes.risk import router as risk_router
 import asyncio
+import logging
 import random
+import time
+
+import auth_utils
 
 from settings import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 app = FastAPI(title="Polymarket Bot Backend", version="0.1.0")
@@ -38,52 +57,141 @@ async def enforce_https_middleware(request: Request, call_next):
 
 app.include_router(markets_router, prefix="")
 app.include_router(auth_router, prefix="")
+app.include_router(debug_router, prefix="")
+app.include_router(risk_router, prefix="")
+# before /pnl/{market_id} below so /pnl/stream and /pnl/updates match first
+app.include_router(pnl_router, prefix="")
 
-@app.on_event("startup")
-async def startup():
-    for attempt in range(15):
+async def _init_database():
+    delay = 0.1
+    deadline = time.monotonic() + settings.db_startup_timeout_seconds
+    while True:
         try:
-            await init_db()
+            created = await init_db()
             break
-        except Exception:
-            await asyncio.sleep(1)
-    else:
-        await init_db()
+        except Exception as exc:
+            if time.monotonic() + delay > deadline:
+                raise
+            logger.warning("Database not ready (%r); retrying in %.1fs", exc, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2.0)
+    if created:
+        logger.info("Created missing tables: %s", ", ".join(created))
+    await warm_pool(settings.db_pool_warm_connections)
+
+
+def _order_signing() -> bool:
+    return bot_manager.quoting is not None and bot_manager.quoting.batcher.signer is not None
+
+
+async def _warm_up():
+    # Independent start-up work runs concurrently; /ready turns 200 once all of it succeeded.
+    # Failed checks are retried in the background rather than given up on.
+    await asyncio.gather(
+        readiness.check_until_ok("database", _init_database),
+        readiness.check_until_ok("http_client", warm_up_http_client),
+        readiness.check_until_ok("crypto", lambda: asyncio.to_thread(auth_utils.load_crypto)),
+    )
+    if settings.market_data_source == "simulated":
+        await readiness.check_until_ok("market_sim", lambda: asyncio.to_thread(get_market_simulator))
+    if _order_signing():
+        # start the signing pool before loops restart and place orders
+        await readiness.check_until_ok("order_signer", bot_manager.quoting.batcher.warm_up)
+    if settings.bot_warm_restart:
+        await readiness.check_until_ok("bot_warm_restart", bot_manager.warm_restart)
+    bot_manager.start_checkpointer()
+    risk_monitor.start(bot_manager.risk_inputs)
+    # markets whose loops run in other workers only reach this feed via the table
+    pnl_feed.start_polling(ReadSessionLocal, lambda: bot_manager.tasks, settings.pnl_feed_poll_seconds)
+
+
+@app.on_event("startup")
+async def startup():
+    # fails start-up on a store that cannot serve this deployment
+    get_nonce_store()
+    loop_lag_monitor.start()
+    bot_manager.start_watchdog(loop_lag_monitor)
+    readiness.expect(
+        "database",
+        "http_client",
+        "crypto",
+        *(["market_sim"] if settings.market_data_source == "simulated" else []),
+        *(["order_signer"] if _order_signing() else []),
+        *(["bot_warm_restart"] if settings.bot_warm_restart else []),
+    )
+    readiness.start(_warm_up)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await readiness.stop()
+    await pnl_feed.stop_polling()
+    await risk_monitor.stop()
+    await bot_manager.stop_watchdog()
+    await bot_manager.stop_checkpointer()
+    if bot_manager.quoting is not None:
+        # also shuts the order-signing pool down
+        await bot_manager.quoting.close()
+    # the loops have stopped, so no more spans; export what is still buffered
+    await asyncio.to_thread(tracer.shutdown)
+    await nonce_audit.stop()
+    await close_http_client()
+    await loop_lag_monitor.stop()
+    await dispose_engines()
 
 @app.get("/health")
 async def health():
     return {"ok": True}
 
 
+@app.get("/ready")
+async def ready():
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.snapshot())
+
+
 @app.get("/metrics")
 async def metrics():
-    payload = generate_latest()
+    payload = await metrics_cache.get()
     return Response(content=payload, media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/pnl/{market_id}")
 async def get_pnl(
+    request: Request,
     market_id: int,
-    session: AsyncSession = Depends(get_session),   # <-- add Depends here
+    session: AsyncSession = Depends(get_read_session),
 ):
-    async with session as s:
-        q = await s.execute(
-            select(PnLTicks)
-            .where(PnLTicks.market_id == market_id)
-            .order_by(PnLTicks.ts.desc())
-            .limit(1)
-        )
-        tick = q.scalar_one_or_none()
-        if not tick:
-            raise HTTPException(status_code=404, detail="No PnL yet")
-        return {"market_id": market_id, "pnl": float(tick.pnl), "inventory": float(tick.inventory)}
+    async def render():
+        async with session as s:
+            q = await s.execute(
+                select(PnLTicks)
+                .where(PnLTicks.market_id == market_id)
+                .order_by(PnLTicks.ts.desc())
+                .limit(1)
+            )
+            tick = q.scalar_one_or_none()
+            if not tick:
+                raise HTTPException(status_code=404, detail="No PnL yet")
+            return {"market_id": market_id, "pnl": float(tick.pnl), "inventory": float(tick.inventory)}, {}
+
+    return await cached_json_response(request, "pnl", market_id, render)
 
 @app.websocket("/ws/pnl")
 async def ws_pnl(ws: WebSocket):
     await ws.accept()
+    params = ws.query_params
+    if params.get("v") == str(PROTOCOL_VERSION):
+        try:
+            stream = parse_stream_params(params)
+        except ValueError as exc:
+            await ws.close(code=1008, reason=f"invalid stream parameters: {exc}")
+            return
+        await pnl_feed.ensure_seeded(ReadSessionLocal)
+        await serve_pnl_stream(ws, pnl_feed.latest, *stream)
+        return
     try:
         # Poll DB and stream latest PnL per market
         while True:
-            async for session in get_session():
+            async for session in get_read_session():
                 async with session as s:
                     markets_res = await s.execute(select(Market))
                     markets = markets_res.scalars().all()
@@ -19,6 +19,18 @@ class PnLTicks(Base):
     pnl: Mapped[Numeric] = mapped_column(Numeric(18, 6), default=0)
     inventory: Mapped[Numeric] = mapped_column(Numeric(18, 6), default=0)
 
+class BotState(Base):
+    """Latest checkpoint of a market loop, used to resume it after a restart."""
+    __tablename__ = "bot_state"
+    market_id: Mapped[int] = mapped_column(ForeignKey("markets.id", ondelete="CASCADE"), primary_key=True)
+    prev_price: Mapped[Numeric] = mapped_column(Numeric(18, 6), nullable=True)
+    pnl: Mapped[Numeric] = mapped_column(Numeric(18, 6), default=0)
+    inventory: Mapped[Numeric] = mapped_column(Numeric(18, 6), default=0)
+    ticks: Mapped[int] = mapped_column(Integer, default=0)
+    priority: Mapped[int] = mapped_column(Integer, default=0)
+    running: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class WalletAuth(Base):
     __tablename__ = "wallet_auth"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Protocol, Set, Tuple
+
+from sqlalchemy import select
+
+
+logger = logging.getLogger(__name__)
+
+
+class NonceRecord(NamedTuple):
+    nonce: str
+    issued_at: float
+
+
+class NonceStore(Protocol):
+    """Holds the outstanding login nonce per address.
+
+    Records are kept for ``retention_seconds`` (longer than the nonce TTL) so a
+    late verify can still be told its nonce expired rather than never existed.
+    ``consume`` must be an atomic compare-and-delete: it is what stops replays.
+    Stores backed by a file or the network must not block the event loop
+    while they wait for it.
+    """
+
+    async def issue(self, address: str, nonce: str, now: Optional[float] = None) -> None: ...
+
+    async def get(self, address: str, now: Optional[float] = None) -> Optional[NonceRecord]: ...
+
+    async def consume(self, address: str, nonce: str, now: Optional[float] = None) -> bool: ...
+
+    async def discard(self, address: str) -> None: ...
+
+    def reset(self) -> None: ...
+
+
+class MemoryNonceStore:
+    """In-process store that expires records with a hashed timer wheel.
+
+    Each record is filed in the wheel slot of its expiry second; advancing the
+    clock pops only the slots whose second has fully elapsed, so expiry costs
+    O(1) per record and no full scans ever run on the request path. The
+    current second's slot is left alone until it is over: popping it early
+    would pass over records that expire later in that second.
+
+    Only safe with a single worker process: each process would hold its own
+    nonces, and a verify that lands on another worker than its nonce request
+    fails.
+    """
+
+    def __init__(self, retention_seconds: float, tick_seconds: float = 1.0) -> None:
+        self.retention_seconds = retention_seconds
+        self.tick_seconds = tick_seconds
+        self._slots: List[Set[str]] = [set() for _ in range(int(math.ceil(retention_seconds / tick_seconds)) + 1)]
+        self._records: Dict[str, Tuple[NonceRecord, float]] = {}
+        self._cursor: Optional[int] = None
+
+    def _tick(self, ts: float) -> int:
+        return int(ts // self.tick_seconds)
+
+    def _advance(self, now: float) -> None:
+        # the last tick that has fully elapsed
+        target = self._tick(now) - 1
+        if self._cursor is None:
+            self._cursor = target
+            return
+        if target <= self._cursor:
+            return
+        # After a long idle gap every slot has elapsed at least once.
+        start = max(self._cursor + 1, target - len(self._slots) + 1)
+        for tick in range(start, target + 1):
+            slot = self._slots[tick % len(self._slots)]
+            if not slot:
+                continue
+            for address in list(slot):
+                entry = self._records.get(address)
+                if entry is None or entry[1] <= now:
+                    slot.discard(address)
+                    self._records.pop(address, None)
+        self._cursor = target
+
+    async def issue(self, address: str, nonce: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self._advance(now)
+        self._discard(address)
+        expires_at = now + self.retention_seconds
+        self._records[address] = (NonceRecord(nonce, now), expires_at)
+        self._slots[self._tick(expires_at) % len(self._slots)].add(address)
+
+    async def get(self, address: str, now: Optional[float] = None) -> Optional[NonceRecord]:
+        return self._get(address, time.time() if now is None else now)
+
+    def _get(self, address: str, now: float) -> Optional[NonceRecord]:
+        self._advance(now)
+        entry = self._records.get(address)
+        if entry is None or entry[1] <= now:
+            return None
+        return entry[0]
+
+    async def consume(self, address: str, nonce: str, now: Optional[float] = None) -> bool:
+        # no await between the check and the delete, so this is atomic
+        record = self._get(address, time.time() if now is None else now)
+        if record is None or record.nonce != nonce:
+            return False
+        self._discard(address)
+        return True
+
+    async def discard(self, address: str) -> None:
+        self._discard(address)
+
+    def _discard(self, address: str) -> None:
+        entry = self._records.pop(address, None)
+        if entry is not None:
+            self._slots[self._tick(entry[1]) % len(self._slots)].discard(address)
+
+    def reset(self) -> None:
+        self._records.clear()
+        for slot in self._slots:
+            slot.clear()
+        self._cursor = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class SQLiteNonceStore:
+    """Store shared by every worker process that opens the same file.
+
+    Statements run in a worker thread, as in ``SQLiteRateLimitBackend``: a
+    write can wait up to ``busy_timeout_ms`` for another worker's lock.
+    """
+
+    def __init__(self, path: str, retention_seconds: float, busy_timeout_ms: int = 200) -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS nonces (address TEXT PRIMARY KEY, nonce TEXT NOT NULL, issued_at REAL NOT NULL)"
+        )
+
+    def _purge(self, now: float) -> None:
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.retention_seconds / 4
+        self._conn.execute("DELETE FROM nonces WHERE issued_at <= ?", (now - self.retention_seconds,))
+
+    async def issue(self, address: str, nonce: str, now: Optional[float] = None) -> None:
+        await asyncio.to_thread(self._issue, address, nonce, now)
+
+    def _issue(self, address: str, nonce: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            self._purge(now)
+            self._conn.execute(
+                "INSERT INTO nonces (address, nonce, issued_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(address) DO UPDATE SET nonce = excluded.nonce, issued_at = excluded.issued_at",
+                (address, nonce, now),
+            )
+
+    async def get(self, address: str, now: Optional[float] = None) -> Optional[NonceRecord]:
+        return await asyncio.to_thread(self._get, address, now)
+
+    def _get(self, address: str, now: Optional[float] = None) -> Optional[NonceRecord]:
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT nonce, issued_at FROM nonces WHERE address = ? AND issued_at > ?",
+                (address, now - self.retention_seconds),
+            ).fetchone()
+        return NonceRecord(row[0], row[1]) if row else None
+
+    async def consume(self, address: str, nonce: str, now: Optional[float] = None) -> bool:
+        return await asyncio.to_thread(self._consume, address, nonce, now)
+
+    def _consume(self, address: str, nonce: str, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM nonces WHERE address = ? AND nonce = ? AND issued_at > ?",
+                (address, nonce, now - self.retention_seconds),
+            ).rowcount
+        return deleted == 1
+
+    async def discard(self, address: str) -> None:
+        await asyncio.to_thread(self._discard, address)
+
+    def _discard(self, address: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM nonces WHERE address = ?", (address,))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM nonces")
+
+
+def build_nonce_store(name: str, sqlite_path: str, retention_seconds: float, workers: int = 1) -> NonceStore:
+    """The configured store. Refuses the per-process ``memory`` store when the
+    server runs several workers, since logins would then fail whenever the
+    verify request reaches another worker than the nonce request."""
+    if name == "sqlite":
+        return SQLiteNonceStore(sqlite_path, retention_seconds)
+    if name != "memory":
+        logger.warning("Unknown nonce store %r; using in-memory store", name)
+    if workers > 1:
+        raise RuntimeError(
+            f"AUTH_NONCE_STORE=memory cannot be shared by {workers} workers; use AUTH_NONCE_STORE=sqlite"
+        )
+    return MemoryNonceStore(retention_seconds)
+
+
+class NonceAuditWriter:
+    """Records issued nonces in ``wallet_auth`` from a background task.
+
+    Requests only enqueue; the writer drains the queue in batches so a login
+    burst becomes a handful of transactions instead of one per request.
+    """
+
+    def __init__(self, session_factory: Callable, batch_size: int = 200, max_queue: int = 10000) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self.enabled = True
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, address: str, nonce: str) -> None:
+        if not self.enabled:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="nonce-audit-writer")
+        try:
+            self._queue.put_nowait((address, nonce, datetime.now(timezone.utc)))
+        except asyncio.QueueFull:
+            logger.warning("Nonce audit queue full; dropping audit record for %s", address)
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write(batch)
+            except Exception as exc:  # pragma: no cover - audit is best effort
+                logger.warning("Nonce audit write failed: %r", exc)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[Tuple[str, str, datetime]]) -> None:
+        from models import WalletAuth
+
+        latest: Dict[str, Tuple[str, datetime]] = {}
+        for address, nonce, issued_at in batch:
+            latest[address] = (nonce, issued_at)
+        async with self.session_factory() as session:
+            res = await session.execute(select(WalletAuth).where(WalletAuth.address.in_(list(latest))))
+            existing = {wa.address: wa for wa in res.scalars()}
+            for address, (nonce, issued_at) in latest.items():
+                wa = existing.get(address)
+                if wa is None:
+                    session.add(WalletAuth(address=address, nonce=nonce, updated_at=issued_at))
+                else:
+                    wa.nonce = nonce
+                    wa.updated_at = issued_at
+            await session.commit()
+
+    async def flush(self) -> None:
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._queue = None
@@ -1,12 +1,13 @@
 # backend/polymarket_client.py
+import asyncio
+import importlib
 import logging
-import math
-import random
 import time
-from typing import Optional, Tuple, TypedDict
+from typing import TYPE_CHECKING, Optional, Tuple, TypedDict
 
-import httpx
+from prometheus_client import Histogram
 
+from core.market_sim import simulated_midprice, simulated_quote
 from settings import get_settings
 
 
@@ -14,6 +15,52 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+REQUEST_DURATION = Histogram(
+    "polymarket_request_duration_seconds",
+    "Latency of Polymarket HTTP requests by source",
+    ["source", "outcome"],
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    import httpx
+
+_client: Optional["httpx.AsyncClient"] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Shared client for Polymarket calls, so connections and the TLS context
+    are reused across ticks instead of being rebuilt per request. httpx is
+    imported here rather than at module import to keep startup fast."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        import httpx
+
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.polymarket_timeout_seconds, connect=3.0),
+            limits=httpx.Limits(
+                max_connections=settings.polymarket_max_connections,
+                max_keepalive_connections=settings.polymarket_max_connections,
+            ),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def warm_up_http_client() -> None:
+    await asyncio.to_thread(importlib.import_module, "httpx")
+    get_http_client()
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
 class MarketSnapshot(TypedDict, total=False):
     mid_price: float
     best_bid: Optional[float]
@@ -35,58 +82,58 @@ async def get_midprice_from_polymarket(external_id: str) -> Optional[float]:
     This uses a broad endpoint and tries to match by fields like 'slug' or 'question'.
     If it can't find/parse, return None to trigger fallback.
     """
-    timeout = httpx.Timeout(settings.polymarket_timeout_seconds, connect=3.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    client = get_http_client()
+    started = time.perf_counter()
+    outcome = "error"
+    try:
         r = await client.get(_public_markets_url())
         r.raise_for_status()
-        data = r.json()
-
-        # Try some common fields — adjust once you standardize your mapping.
-        candidates = data if isinstance(data, list) else data.get("data") or []
-
-        def norm(s: str) -> str:
-            return (s or "").strip().lower()
-
-        ext = norm(external_id)
-
-        for m in candidates:
-            slug = norm(m.get("slug", ""))
-            question = norm(m.get("question", ""))
-            ticker = norm(m.get("ticker", ""))
-
-            if ext and (ext in slug or ext in question or ext == ticker):
-                # Heuristics: try to compute a mid
-                # Common shapes: yesPrice/noPrice OR bestBid/bestAsk OR bids/asks
-                yes_price = m.get("yesPrice")
-                no_price = m.get("noPrice")
-                best_bid = m.get("bestBid")
-                best_ask = m.get("bestAsk")
-
-                vals = []
-                for v in (yes_price, 1 - no_price if isinstance(no_price, (int, float)) else None,
-                          best_bid, best_ask):
-                    if isinstance(v, (int, float)):
-                        vals.append(float(v))
-                if vals:
-                    # Use average of whatever we could parse
-                    return sum(vals) / len(vals)
-
-        return None
-
-# ---- Fallback "demo" feed so the loop never blocks ----
-def fallback_demo_midprice(external_id: str) -> float:
-    # deterministic-ish price stream so charts look alive
-    t = time.time()
-    base = (hash(external_id) % 70) / 100.0 + 0.15  # 0.15 .. 0.85
-    wiggle = 0.03 * math.sin(t / 7.0) + 0.01 * math.sin(t / 1.3)
-    noise = random.uniform(-0.003, 0.003)
-    p = max(0.01, min(0.99, base + wiggle + noise))
-    return p
+        outcome = "ok"
+    finally:
+        REQUEST_DURATION.labels(source="gamma_list", outcome=outcome).observe(
+            time.perf_counter() - started
+        )
+    data = r.json()
+
+    # Try some common fields — adjust once you standardize your mapping.
+    candidates = data if isinstance(data, list) else data.get("data") or []
+
+    def norm(s: str) -> str:
+        return (s or "").strip().lower()
+
+    ext = norm(external_id)
+
+    for m in candidates:
+        slug = norm(m.get("slug", ""))
+        question = norm(m.get("question", ""))
+        ticker = norm(m.get("ticker", ""))
+
+        if ext and (ext in slug or ext in question or ext == ticker):
+            # Heuristics: try to compute a mid
+            # Common shapes: yesPrice/noPrice OR bestBid/bestAsk OR bids/asks
+            yes_price = m.get("yesPrice")
+            no_price = m.get("noPrice")
+            best_bid = m.get("bestBid")
+            best_ask = m.get("bestAsk")
+
+            vals = []
+            for v in (yes_price, 1 - no_price if isinstance(no_price, (int, float)) else None,
+                      best_bid, best_ask):
+                if isinstance(v, (int, float)):
+                    vals.append(float(v))
+            if vals:
+                # Use average of whatever we could parse
+                return sum(vals) / len(vals)
+
+    return None
 
 async def get_midprice(external_id: str) -> float:
     """
-    Unified accessor: tries Polymarket first, then safe fallback.
+    Unified accessor: tries Polymarket first, then falls back to the seeded
+    market simulator (``core/market_sim.py``) so the loop never blocks.
     """
+    if settings.market_data_source == "simulated":
+        return simulated_midprice(external_id)
     try:
         mp = await get_midprice_from_polymarket(external_id)
         if mp is not None and 0.0 < mp < 1.0:
@@ -94,7 +141,7 @@ async def get_midprice(external_id: str) -> float:
     except Exception:
         # swallow; we'll fallback below
         pass
-    return fallback_demo_midprice(external_id)
+    return simulated_midprice(external_id)
 
 
 def _extract_best_prices(payload: dict) -> Tuple[Optional[float], Optional[float]]:
@@ -120,7 +167,6 @@ async def fetch_market_snapshot(external_id: str) -> MarketSnapshot:
     Fetch richer market information (best bid/ask, liquidity) from Polymarket.
     Falls back to the broadcast midprice if the CLOB endpoint is unavailable.
     """
-    timeout = httpx.Timeout(settings.polymarket_timeout_seconds, connect=3.0)
     headers = {}
     if settings.polymarket_api_key:
         headers["Authorization"] = f"Bearer {settings.polymarket_api_key}"
@@ -130,25 +176,36 @@ async def fetch_market_snapshot(external_id: str) -> MarketSnapshot:
 
     api_base = settings.polymarket_api_base.rstrip("/")
     candidates = [
-        f"{api_base}/markets/{external_id}",
-        f"{api_base}/markets-data/{external_id}",
-        f"{settings.polymarket_public_api_base.rstrip('/')}/markets/{external_id}",
+        ("clob_markets", f"{api_base}/markets/{external_id}"),
+        ("clob_markets_data", f"{api_base}/markets-data/{external_id}"),
+        ("gamma_markets", f"{settings.polymarket_public_api_base.rstrip('/')}/markets/{external_id}"),
     ]
-
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        for url in candidates:
-            try:
-                resp = await client.get(url, headers=headers)
-                if resp.status_code == 404:
-                    errors.append(f"{url} -> 404")
-                    continue
-                resp.raise_for_status()
-                payload = resp.json()
-                payload["__source"] = url
-                break
-            except Exception as exc:  # pragma: no cover - best-effort logging
-                errors.append(f"{url} -> {exc!r}")
+    if settings.market_data_source == "simulated":
+        payload = simulated_quote(external_id)
+        payload["__source"] = "simulated"
+        candidates = []
+
+    for source, url in candidates:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            resp = await get_http_client().get(url, headers=headers)
+            if resp.status_code == 404:
+                outcome = "not_found"
+                errors.append(f"{url} -> 404")
                 continue
+            resp.raise_for_status()
+            payload = resp.json()
+            payload["__source"] = url
+            outcome = "ok"
+            break
+        except Exception as exc:  # pragma: no cover - best-effort logging
+            errors.append(f"{url} -> {exc!r}")
+            continue
+        finally:
+            REQUEST_DURATION.labels(source=source, outcome=outcome).observe(
+                time.perf_counter() - started
+            )
 
     if errors:
         logger.debug("polymarket_client.fetch_market_snapshot errors: %s", errors)
@@ -163,7 +220,7 @@ async def fetch_market_snapshot(external_id: str) -> MarketSnapshot:
         try:
             mid = await get_midprice(external_id)
         except Exception:  # pragma: no cover
-            mid = fallback_demo_midprice(external_id)
+            mid = simulated_midprice(external_id)
 
     liquidity = payload.get("liquidity") or payload.get("totalYesVolume")
 
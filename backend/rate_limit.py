@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Protocol
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend(Protocol):
+    """Storage for GCRA state: one theoretical arrival time (TAT) per key.
+
+    ``acquire`` must check and update the key atomically so that several
+    workers sharing a backend enforce a single limit, and must not block the
+    event loop while it waits for the store.
+    """
+
+    async def acquire(self, key: str, now: float, emission_interval: float, tolerance: float) -> bool: ...
+
+    def evict_idle(self, now: float) -> int: ...
+
+    def reset(self) -> None: ...
+
+
+def _gcra(tat: Optional[float], now: float, emission_interval: float, tolerance: float) -> Optional[float]:
+    """Return the new TAT if a request at ``now`` conforms, else ``None``."""
+    tat = now if tat is None or tat < now else tat
+    if tat - now > tolerance:
+        return None
+    return tat + emission_interval
+
+
+class MemoryRateLimitBackend:
+    """Per-process backend. A key whose TAT is in the past carries no state, so
+    it is dropped by a sweep that runs every ``sweep_interval_seconds``."""
+
+    def __init__(self, sweep_interval_seconds: float = 60.0) -> None:
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._tat: Dict[str, float] = {}
+        self._next_sweep = 0.0
+
+    async def acquire(self, key: str, now: float, emission_interval: float, tolerance: float) -> bool:
+        if now >= self._next_sweep:
+            self.evict_idle(now)
+            self._next_sweep = now + self.sweep_interval_seconds
+        new_tat = _gcra(self._tat.get(key), now, emission_interval, tolerance)
+        if new_tat is None:
+            return False
+        self._tat[key] = new_tat
+        return True
+
+    def evict_idle(self, now: float) -> int:
+        idle = [key for key, tat in self._tat.items() if tat <= now]
+        for key in idle:
+            del self._tat[key]
+        return len(idle)
+
+    def reset(self) -> None:
+        self._tat.clear()
+        self._next_sweep = 0.0
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class SQLiteRateLimitBackend:
+    """Backend shared by every worker process that opens the same file.
+
+    Also a stand-in for a networked store in tests: anything that can run the
+    read-check-write of ``acquire`` atomically can implement the protocol.
+    The transaction runs in a worker thread, since waiting on another
+    worker's write lock (up to ``busy_timeout_ms``) or a slow disk would
+    otherwise stall the event loop.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 50, sweep_interval_seconds: float = 60.0) -> None:
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+
+    async def acquire(self, key: str, now: float, emission_interval: float, tolerance: float) -> bool:
+        return await asyncio.to_thread(self._acquire, key, now, emission_interval, tolerance)
+
+    def _acquire(self, key: str, now: float, emission_interval: float, tolerance: float) -> bool:
+        if now >= self._next_sweep:
+            self.evict_idle(now)
+            self._next_sweep = now + self.sweep_interval_seconds
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                row = self._conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+                new_tat = _gcra(row[0] if row else None, now, emission_interval, tolerance)
+                if new_tat is not None:
+                    self._conn.execute(
+                        "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                        (key, new_tat),
+                    )
+                self._conn.execute("COMMIT")
+                return new_tat is not None
+            except sqlite3.OperationalError as exc:
+                # Never hold the request up behind a contended lock: fail open.
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.warning("Rate limit backend unavailable, allowing request: %s", exc)
+                return True
+
+    def evict_idle(self, now: float) -> int:
+        with self._lock:
+            try:
+                return self._conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,)).rowcount
+            except sqlite3.OperationalError:
+                return 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limits")
+        self._next_sweep = 0.0
+
+
+class GcraRateLimiter:
+    """Generic cell rate algorithm: allows bursts of ``max_requests`` and then
+    one request every ``window_seconds / max_requests``. State per key is a
+    single float regardless of the limit."""
+
+    def __init__(self, max_requests: int, window_seconds: float, backend: Optional[RateLimitBackend] = None):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.backend: RateLimitBackend = backend if backend is not None else MemoryRateLimitBackend()
+
+    async def allow(self, key: str, now: Optional[float] = None) -> bool:
+        if self.max_requests <= 0:
+            return True
+        emission_interval = self.window_seconds / self.max_requests
+        tolerance = self.window_seconds - emission_interval
+        return await self.backend.acquire(key, time.time() if now is None else now, emission_interval, tolerance)
+
+    def reset(self) -> None:
+        self.backend.reset()
+
+
+def build_rate_limit_backend(name: str, sqlite_path: str) -> RateLimitBackend:
+    if name == "sqlite":
+        return SQLiteRateLimitBackend(sqlite_path)
+    if name != "memory":
+        logger.warning("Unknown rate limit backend %r; using in-memory backend", name)
+    return MemoryRateLimitBackend()
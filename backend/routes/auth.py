@@ -1,19 +1,16 @@
+import asyncio
 import secrets
 import time
-from collections import defaultdict, deque
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Optional
 
-from eth_account import Account
-from eth_account.messages import encode_defunct
 from fastapi import APIRouter, Depends, HTTPException, Header, Request
 from pydantic import BaseModel
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from db import get_session
-from models import WalletAuth
-from auth_utils import create_jwt, verify_jwt
+from db import AuthSessionLocal
+from auth_utils import create_jwt, recover_message_signer, verify_jwt
+from nonce_store import NonceAuditWriter, NonceRecord, NonceStore, build_nonce_store
+from rate_limit import GcraRateLimiter, build_rate_limit_backend
 from settings import get_settings
 
 
@@ -32,61 +29,85 @@ class VerifyRequest(BaseModel):
     signature: str
 
 
-class SlidingWindowRateLimiter:
-    def __init__(self, max_requests: int, window_seconds: int):
-        self.max_requests = max_requests
-        self.window_seconds = window_seconds
-        self._hits: dict[str, deque[float]] = defaultdict(deque)
+rate_limiter = GcraRateLimiter(
+    max_requests=settings.auth_rate_limit_max_requests,
+    window_seconds=settings.auth_rate_limit_window_seconds,
+    backend=build_rate_limit_backend(
+        settings.auth_rate_limit_backend,
+        settings.auth_rate_limit_sqlite_path,
+    ),
+)
 
-    def allow(self, key: str) -> bool:
-        if self.max_requests <= 0:
-            return True
-        now = time.monotonic()
-        window = self._hits[key]
-        while window and now - window[0] > self.window_seconds:
-            window.popleft()
-        if len(window) >= self.max_requests:
-            return False
-        window.append(now)
-        return True
 
-    def reset(self) -> None:
-        self._hits.clear()
+_nonce_store: Optional[NonceStore] = None
 
 
-rate_limiter = SlidingWindowRateLimiter(
-    max_requests=settings.auth_rate_limit_max_requests,
-    window_seconds=settings.auth_rate_limit_window_seconds,
-)
+def get_nonce_store() -> NonceStore:
+    """The configured nonce store, built at startup (or on first use) rather
+    than on import, so importing the app opens no database files."""
+    global _nonce_store
+    if _nonce_store is None:
+        # Records outlive the TTL so late verifies get "nonce expired" instead of "no nonce".
+        _nonce_store = build_nonce_store(
+            settings.auth_nonce_store,
+            settings.auth_nonce_sqlite_path,
+            retention_seconds=settings.nonce_ttl_seconds * 2,
+            workers=settings.web_concurrency,
+        )
+    return _nonce_store
 
+nonce_audit = NonceAuditWriter(AuthSessionLocal)
+nonce_audit.enabled = settings.auth_nonce_audit
 
-def _normalize_address(addr: str) -> str:
-    if not isinstance(addr, str) or not addr.startswith("0x"):
-        raise HTTPException(400, "invalid address")
-    return addr.lower()
+
+def _build_recover_executor() -> Executor:
+    workers = max(1, settings.auth_recover_max_concurrency)
+    if settings.auth_recover_executor == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sig-recover")
 
 
-def _utcnow() -> datetime:
-    return datetime.now(timezone.utc)
+_recover_executor = _build_recover_executor()
+_recover_slots: Optional[asyncio.Semaphore] = None
 
 
-def _with_timezone(dt: datetime | None) -> datetime | None:
-    if dt is None:
-        return None
-    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+def _get_recover_slots() -> asyncio.Semaphore:
+    # created on first use so it belongs to the running loop, not the importer's
+    global _recover_slots
+    if _recover_slots is None:
+        _recover_slots = asyncio.Semaphore(max(1, settings.auth_recover_max_concurrency))
+    return _recover_slots
+
+
+def reset_recover_slots() -> None:
+    """Drop the recovery semaphore; the next login builds one from the
+    current settings."""
+    global _recover_slots
+    _recover_slots = None
+
+
+async def _recover_signer(message: str, signature: str) -> str:
+    # ECDSA recovery is ~10ms of CPU; keep it off the event loop and cap how
+    # many run at once so a login burst cannot monopolise the executor.
+    async with _get_recover_slots():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_recover_executor, recover_message_signer, message, signature)
+
+
+def _normalize_address(addr: str) -> str:
+    if not isinstance(addr, str) or not addr.startswith("0x"):
+        raise HTTPException(400, "invalid address")
+    return addr.lower()
 
 
-def _is_nonce_expired(wa: WalletAuth) -> bool:
-    ts = _with_timezone(wa.updated_at)
-    if not ts:
-        return False
-    return _utcnow() - ts > timedelta(seconds=settings.nonce_ttl_seconds)
+def _is_nonce_expired(record: NonceRecord) -> bool:
+    return time.time() - record.issued_at > settings.nonce_ttl_seconds
 
 
 async def enforce_rate_limit(request: Request):
     client_host = request.client.host if request.client else "anonymous"
     key = f"{client_host}:{request.url.path}"
-    if not rate_limiter.allow(key):
+    if not await rate_limiter.allow(key):
         raise HTTPException(429, "too many requests")
 
 
@@ -95,20 +116,11 @@ async def get_nonce(
     body: NonceRequest,
     request: Request,
     _: None = Depends(enforce_rate_limit),
-    session: AsyncSession = Depends(get_session),
 ):
     address = _normalize_address(body.address)
     nonce = secrets.token_hex(16)
-    async with session as s:
-        existing = await s.execute(select(WalletAuth).where(WalletAuth.address == address))
-        wa = existing.scalar_one_or_none()
-        if wa:
-            wa.nonce = nonce
-        else:
-            wa = WalletAuth(address=address, nonce=nonce)
-            s.add(wa)
-        wa.updated_at = _utcnow()
-        await s.commit()
+    await get_nonce_store().issue(address, nonce)
+    nonce_audit.record(address, nonce)
     message = f"Sign this message to authenticate: {nonce}"
     return {"address": address, "nonce": nonce, "message": message}
 
@@ -118,37 +130,32 @@ async def verify_signature(
     body: VerifyRequest,
     request: Request,
     _: None = Depends(enforce_rate_limit),
-    session: AsyncSession = Depends(get_session),
 ):
     address = _normalize_address(body.address)
-    async with session as s:
-        res = await s.execute(select(WalletAuth).where(WalletAuth.address == address))
-        wa = res.scalar_one_or_none()
-        if not wa:
-            raise HTTPException(400, "no nonce for address")
-
-        if _is_nonce_expired(wa):
-            wa.nonce = secrets.token_hex(16)
-            wa.updated_at = _utcnow()
-            await s.commit()
-            raise HTTPException(400, "nonce expired; request a new one")
-
-        message = f"Sign this message to authenticate: {wa.nonce}"
-        msg = encode_defunct(text=message)
-        try:
-            recovered = Account.recover_message(msg, signature=body.signature)
-        except Exception:
-            raise HTTPException(400, "invalid signature")
-
-        if recovered.lower() != address:
-            raise HTTPException(400, "signature mismatch")
-
-        # success -> rotate nonce to prevent replay
-        wa.nonce = secrets.token_hex(16)
-        wa.updated_at = _utcnow()
-        await s.commit()
-
-        token = create_jwt(address)
+    nonce_store = get_nonce_store()
+    record = await nonce_store.get(address)
+    if not record:
+        raise HTTPException(400, "no nonce for address")
+
+    if _is_nonce_expired(record):
+        await nonce_store.discard(address)
+        raise HTTPException(400, "nonce expired; request a new one")
+
+    message = f"Sign this message to authenticate: {record.nonce}"
+    try:
+        recovered = await _recover_signer(message, body.signature)
+    except Exception:
+        raise HTTPException(400, "invalid signature")
+
+    if recovered.lower() != address:
+        raise HTTPException(400, "signature mismatch")
+
+    # success -> burn the nonce to prevent replay; a concurrent verify of the
+    # same nonce loses the compare-and-delete
+    if not await nonce_store.consume(address, record.nonce):
+        raise HTTPException(400, "nonce already used; request a new one")
+
+    token = create_jwt(address)
     return {"token": token, "address": address}
 
 
@@ -162,3 +169,8 @@ def get_current_address(authorization: Optional[str] = Header(None)) -> str:
     return addr
 
 
+def require_admin(address: str = Depends(get_current_address)) -> str:
+    # no configured admins means nobody is one
+    if address not in settings.admin_addresses:
+        raise HTTPException(403, "admin only")
+    return address
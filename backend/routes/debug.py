@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from core.bot_manager import bot_manager
+from core.loop_monitor import loop_lag_monitor
+from core.profiling import dump_task_stacks, profiler
+from routes.auth import require_admin
+
+router = APIRouter()
+
+
+@router.get("/debug/loops")
+async def debug_loops(_addr: str = Depends(require_admin)):
+    now = time.time()
+    markets = []
+    for market_id, stats in sorted(bot_manager.loop_stats.items()):
+        task = bot_manager.tasks.get(market_id)
+        markets.append(
+            {
+                "market_id": market_id,
+                "running": bool(task and not task.done()),
+                "last_tick_age_seconds": (
+                    now - stats.last_tick_at if stats.last_tick_at is not None else None
+                ),
+                "uptime_seconds": now - stats.started_at,
+                "ticks": stats.ticks,
+                "errors": stats.errors,
+                "ticks_deduplicated": stats.ticks_deduplicated,
+                "last_duration_seconds": stats.last_duration,
+                "last_sleep_lateness_seconds": stats.last_sleep_lateness,
+                "interval_seconds": stats.interval,
+                "phases": stats.phases,
+                "last_source": stats.last_source,
+                "last_error": stats.last_error,
+            }
+        )
+    return {"markets": markets}
+
+
+@router.post("/debug/profile/start")
+async def start_profile(
+    seconds: float = Query(10.0, gt=0, le=300),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    _addr: str = Depends(require_admin),
+):
+    if not profiler.start(seconds, interval_ms / 1000.0):
+        raise HTTPException(409, "profiler already running")
+    return {"ok": True, "seconds": seconds, "interval_ms": interval_ms}
+
+
+@router.post("/debug/profile/stop", response_class=PlainTextResponse)
+async def stop_profile(_addr: str = Depends(require_admin)):
+    if profiler.started_at is None:
+        raise HTTPException(404, "no profile recorded")
+    await asyncio.to_thread(profiler.stop)
+    return PlainTextResponse(profiler.collapsed())
+
+
+@router.get("/debug/profile", response_class=PlainTextResponse)
+async def get_profile(_addr: str = Depends(require_admin)):
+    if profiler.started_at is None:
+        raise HTTPException(404, "no profile recorded")
+    if profiler.running:
+        raise HTTPException(409, "profiler still running")
+    return PlainTextResponse(profiler.collapsed())
+
+
+@router.get("/debug/tasks")
+async def debug_tasks(_addr: str = Depends(require_admin)):
+    labels = {task: f"market:{market_id}" for market_id, task in bot_manager.tasks.items()}
+    return {"tasks": dump_task_stacks(labels)}
+
+
+@router.get("/debug/loop-lag")
+async def debug_loop_lag(_addr: str = Depends(require_admin)):
+    return loop_lag_monitor.snapshot()
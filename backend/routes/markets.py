@@ -1,22 +1,75 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
-from db import get_session
+from sqlalchemy import literal_column, select
+from typing import Dict, List, Optional
+from db import dialect_insert, get_read_session, get_session
 from models import Market
-from schemas import MarketCreate, MarketOut
+from schemas import MarketBulkCreate, MarketBulkIds, MarketBulkStart, MarketCreate, MarketFieldsOut, MarketOut
 from core.bot_manager import bot_manager
+from core.response_cache import cached_json_response, response_cache
 from routes.auth import get_current_address
 
 router = APIRouter()
 
-@router.get("/markets", response_model=List[MarketOut])
-async def list_markets(session: AsyncSession = Depends(get_session)):
-    async with session as s:
-        res = await s.execute(select(Market))
-        rows = res.scalars().all()
-        return rows
+MARKET_FIELDS = tuple(MarketOut.model_fields)
+UPSERT_CHUNK_SIZE = 500
+UPSERT_UPDATED_FIELDS = ("name", "base_spread_bps", "enabled")
+# Postgres: a row the upsert inserted has no deleting transaction yet
+INSERTED_BY_UPSERT = literal_column("(xmax = 0)").label("inserted")
+
+
+def _parse_fields(fields: Optional[str]) -> tuple:
+    if not fields:
+        return MARKET_FIELDS
+    selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in selected if f not in MARKET_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(400, f"unknown fields: {', '.join(unknown)}; choose from {', '.join(MARKET_FIELDS)}")
+    return selected
+
+
+def _invalidate_market_reads() -> None:
+    # PnL responses depend on neither market rows nor running loops
+    response_cache.invalidate("markets")
+
+
+# the handler returns a rendered, cached body, so the schema is documented
+# here rather than enforced through response_model
+@router.get(
+    "/markets",
+    responses={
+        200: {
+            "model": List[MarketFieldsOut],
+            "description": "Markets in id order, each with the fields selected by `fields`",
+            "headers": {"X-Next-After-Id": {"description": "after_id of the next page, when there may be one"}},
+        }
+    },
+)
+async def list_markets(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="page size; all markets when omitted"),
+    after_id: Optional[int] = Query(None, description="return markets with a larger id (value of X-Next-After-Id)"),
+    fields: Optional[str] = Query(None, description="comma-separated subset of market fields"),
+    session: AsyncSession = Depends(get_read_session),
+):
+    selected = _parse_fields(fields)
+
+    async def render():
+        query = select(Market.id, *(getattr(Market, f) for f in selected)).order_by(Market.id)
+        if after_id is not None:
+            query = query.where(Market.id > after_id)
+        if limit is not None:
+            query = query.limit(limit)
+        async with session as s:
+            rows = (await s.execute(query)).all()
+        headers = {}
+        if limit is not None and len(rows) == limit:
+            headers["X-Next-After-Id"] = str(rows[-1][0])
+        return [dict(zip(selected, row[1:])) for row in rows], headers
+
+    return await cached_json_response(request, "markets", (limit, after_id, selected), render)
 
 @router.post("/markets", response_model=MarketOut)
 async def create_market(body: MarketCreate, session: AsyncSession = Depends(get_session)):
@@ -33,11 +86,110 @@ async def create_market(body: MarketCreate, session: AsyncSession = Depends(get_
         s.add(m)
         await s.commit()
         await s.refresh(m)
+        _invalidate_market_reads()
         return m
 
+@router.post("/markets/bulk")
+async def bulk_create_markets(body: MarketBulkCreate, session: AsyncSession = Depends(get_session)):
+    """Create or update many markets by ``external_id``. Repeating a request
+    leaves the table unchanged; when an ``external_id`` appears more than
+    once the last item wins and earlier ones are reported as duplicates."""
+    last_index: Dict[str, int] = {}
+    for idx, item in enumerate(body.markets):
+        last_index[item.external_id] = idx
+    unique = [body.markets[idx] for idx in sorted(last_index.values())]
+
+    ids: Dict[str, int] = {}
+    existing = set()
+    async with session as s:
+        insert = dialect_insert(s)
+        # Postgres reports inserted vs updated from the upsert itself; SQLite
+        # has no equivalent, but its writers are serialized, so a lookup in the
+        # same transaction cannot race another insert.
+        sqlite = s.get_bind().dialect.name == "sqlite"
+        for start in range(0, len(unique), UPSERT_CHUNK_SIZE):
+            chunk = unique[start:start + UPSERT_CHUNK_SIZE]
+            if sqlite:
+                res = await s.execute(
+                    select(Market.external_id).where(Market.external_id.in_([item.external_id for item in chunk]))
+                )
+                existing.update(res.scalars())
+            stmt = insert(Market).values([item.model_dump() for item in chunk])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Market.external_id],
+                set_={field: getattr(stmt.excluded, field) for field in UPSERT_UPDATED_FIELDS},
+            )
+            returning = (Market.id, Market.external_id) + (() if sqlite else (INSERTED_BY_UPSERT,))
+            for market_id, external_id, *inserted in await s.execute(stmt.returning(*returning)):
+                ids[external_id] = market_id
+                if inserted and not inserted[0]:
+                    existing.add(external_id)
+        await s.commit()
+    _invalidate_market_reads()
+
+    results = []
+    for idx, item in enumerate(body.markets):
+        if last_index[item.external_id] != idx:
+            status = "duplicate"
+        else:
+            status = "updated" if item.external_id in existing else "created"
+        results.append({"index": idx, "external_id": item.external_id, "id": ids[item.external_id], "status": status})
+    return {"results": results}
+
+@router.post("/markets/bulk/start")
+async def bulk_start_markets(
+    body: MarketBulkStart,
+    session: AsyncSession = Depends(get_session),
+    _addr: str = Depends(get_current_address),
+):
+    requested = list(dict.fromkeys(body.market_ids))
+    async with session as s:
+        res = await s.execute(select(Market.id).where(Market.id.in_(requested)))
+        found = set(res.scalars())
+        bot_manager.restore_states(await bot_manager.load_states(s, found))
+    statuses = {mid: "not_found" for mid in requested if mid not in found}
+    to_start = [mid for mid in requested if mid in found]
+    was_running = {mid: bot_manager.is_running(mid) for mid in to_start}
+    outcomes = await asyncio.gather(
+        *(bot_manager.start_market_loop(mid, priority=body.priority) for mid in to_start),
+        return_exceptions=True,
+    )
+    for mid, outcome in zip(to_start, outcomes):
+        if isinstance(outcome, Exception):
+            statuses[mid] = "error"
+        else:
+            statuses[mid] = "already_running" if was_running[mid] else "started"
+    _invalidate_market_reads()
+    return {
+        "priority": body.priority,
+        "results": [{"market_id": mid, "status": statuses[mid]} for mid in requested],
+    }
+
+@router.post("/markets/bulk/stop")
+async def bulk_stop_markets(
+    body: MarketBulkIds,
+    _addr: str = Depends(get_current_address),
+):
+    requested = list(dict.fromkeys(body.market_ids))
+    was_running = {mid: bot_manager.is_running(mid) for mid in requested}
+    outcomes = await asyncio.gather(
+        *(bot_manager.stop_market_loop(mid) for mid in requested),
+        return_exceptions=True,
+    )
+    results = []
+    for mid, outcome in zip(requested, outcomes):
+        if isinstance(outcome, Exception):
+            status = "error"
+        else:
+            status = "stopped" if was_running[mid] else "not_running"
+        results.append({"market_id": mid, "status": status})
+    _invalidate_market_reads()
+    return {"results": results}
+
 @router.post("/markets/{market_id}/start")
 async def start_market(
     market_id: int,
+    priority: int = Query(0, description="Markets above BOT_SHED_MAX_PRIORITY are never shed"),
     session: AsyncSession = Depends(get_session),
     _addr: str = Depends(get_current_address),
 ):
@@ -46,8 +198,10 @@ async def start_market(
         m = res.scalar_one_or_none()
         if not m:
             raise HTTPException(404, "market not found")
-        await bot_manager.start_market_loop(market_id)
-        return {"ok": True, "started": market_id}
+        bot_manager.restore_states(await bot_manager.load_states(s, [market_id]))
+        await bot_manager.start_market_loop(market_id, priority=priority)
+        _invalidate_market_reads()
+        return {"ok": True, "started": market_id, "priority": priority}
 
 @router.post("/markets/{market_id}/stop")
 async def stop_market(
@@ -55,4 +209,5 @@ async def stop_market(
     _addr: str = Depends(get_current_address),
 ):
     await bot_manager.stop_market_loop(market_id)
+    _invalidate_market_reads()
     return {"ok": True, "stopped": market_id}
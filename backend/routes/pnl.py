@@ -0,0 +1,242 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.pnl_export import ENCODERS, MEDIA_TYPES, as_utc, export_query, stream_rows
+from core.pnl_feed import PnLFeed, PnLUpdate, pnl_feed
+from db import ReadSessionLocal, get_read_session
+from models import PnLTicks
+from settings import get_settings
+
+settings = get_settings()
+
+router = APIRouter()
+
+# bounds how many full-range scans analysts can run against the read pool at once
+export_slots = asyncio.Semaphore(settings.pnl_export_max_concurrent)
+
+
+def _parse_market_ids(markets: Optional[str], param: str = "markets") -> List[int]:
+    # an unparseable filter must not fall back to "all markets"
+    try:
+        return [int(mid) for mid in (markets or "").split(",") if mid.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{param} must be comma-separated integers")
+
+
+def _filter(updates: List[PnLUpdate], market_ids: List[int]) -> List[PnLUpdate]:
+    if not market_ids:
+        return updates
+    wanted = set(market_ids)
+    return [update for update in updates if update.market_id in wanted]
+
+
+def _sse(event: str, data: dict, event_id: Optional[str] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def pnl_event_stream(
+    feed: PnLFeed,
+    last_event_id: Optional[str],
+    market_ids: List[int],
+    keepalive_seconds: float,
+    is_disconnected: Callable[[], Awaitable[bool]],
+) -> AsyncIterator[str]:
+    """SSE events for one client, resuming after ``last_event_id`` when it is
+    from this feed's epoch and the buffer still covers it, and starting from
+    a snapshot otherwise."""
+    yield f"retry: {int(keepalive_seconds * 1000)}\n\n"
+    cursor = feed.parse_cursor(last_event_id)
+    while not await is_disconnected():
+        updates = feed.updates_since(cursor) if cursor is not None else None
+        if updates is None:
+            cursor = feed.seq
+            snapshot = {"seq": cursor, "markets": feed.snapshot(market_ids)}
+            yield _sse("pnl_snapshot", snapshot, feed.cursor(cursor))
+            continue
+        if not updates:
+            await feed.wait_for_updates(cursor, keepalive_seconds)
+            if feed.seq == cursor:
+                yield ": keepalive\n\n"
+            continue
+        cursor = updates[-1].seq
+        for update in _filter(updates, market_ids):
+            yield _sse("pnl_tick", update.as_dict(), feed.cursor(update.seq))
+
+
+@router.get("/pnl/stream")
+async def stream_pnl(
+    request: Request,
+    markets: Optional[str] = Query(None, description="comma-separated market ids; all markets when omitted"),
+    last_event_id: Optional[str] = Header(None),
+):
+    market_ids = _parse_market_ids(markets)
+    await pnl_feed.ensure_seeded(ReadSessionLocal)
+    events = pnl_event_stream(
+        pnl_feed,
+        last_event_id,
+        market_ids,
+        settings.pnl_stream_keepalive_seconds,
+        request.is_disconnected,
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class _ExportResponse(StreamingResponse):
+    """Gives the export slot taken by the handler back once the response is
+    over, however it ended; the body generator alone would never release it
+    if the client left before the first chunk."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            export_slots.release()
+
+
+async def _export_body(encoder, market_ids: List[int], start, end) -> AsyncIterator[bytes]:
+    async with ReadSessionLocal() as session:
+        yield encoder.header()
+        query = export_query(market_ids, start, end)
+        async for rows in stream_rows(session, query, settings.pnl_export_chunk_size):
+            yield encoder.encode(rows)
+        yield encoder.footer()
+
+
+@router.get("/pnl/export")
+async def export_pnl(
+    market_ids: Optional[str] = Query(None, description="comma-separated market ids; all markets when omitted"),
+    start: Optional[datetime] = Query(None, alias="from", description="inclusive ISO timestamp; naive values are UTC"),
+    end: Optional[datetime] = Query(None, alias="to", description="exclusive ISO timestamp"),
+    format: str = Query("csv", pattern="^(csv|ndjson|arrow)$"),
+):
+    ids = _parse_market_ids(market_ids, "market_ids")
+    start = as_utc(start) if start is not None else None
+    end = as_utc(end) if end is not None else None
+    try:
+        encoder = ENCODERS[format]()
+    except ImportError:
+        raise HTTPException(status_code=501, detail="format=arrow needs pyarrow installed on the server")
+    # take the slot here, without waiting: checking now and acquiring in the
+    # body would let a burst of requests through and queue them on the slot
+    if export_slots.locked():
+        raise HTTPException(status_code=429, detail="too many exports running; retry later")
+    await export_slots.acquire()
+    # rows are read through a server-side cursor inside the response body, so
+    # the session lives as long as the stream rather than the request handler
+    return _ExportResponse(
+        _export_body(encoder, ids, start, end),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="pnl_ticks.{format}"'},
+    )
+
+
+@router.get("/pnl/updates")
+async def poll_pnl_updates(
+    since: Optional[str] = Query(None, description="last cursor seen; omit to get a snapshot"),
+    timeout: float = Query(25.0, ge=0),
+    markets: Optional[str] = Query(None, description="comma-separated market ids; all markets when omitted"),
+):
+    market_ids = _parse_market_ids(markets)
+    await pnl_feed.ensure_seeded(ReadSessionLocal)
+    seq = pnl_feed.parse_cursor(since)
+    updates = pnl_feed.updates_since(seq) if seq is not None else None
+    if updates == []:
+        await pnl_feed.wait_for_updates(seq, min(timeout, settings.pnl_long_poll_max_seconds))
+        updates = pnl_feed.updates_since(seq)
+    if updates is None:
+        snapshot = pnl_feed.snapshot(market_ids)
+        return {"seq": pnl_feed.cursor(pnl_feed.seq), "reset": True, "snapshot": snapshot, "ticks": []}
+    return {
+        "seq": pnl_feed.cursor(updates[-1].seq if updates else seq),
+        "reset": False,
+        "ticks": [update.as_dict() for update in _filter(updates, market_ids)],
+    }
+
+
+# (ts, pnl, inventory)
+Point = Tuple[datetime, float, float]
+
+
+def step_series(points: Sequence[Point], start: datetime, end: datetime, step: float) -> List[Point]:
+    """Sample a step function at ``start, start + step, ... <= end``.
+
+    ``points`` are change points in ts order (the first may precede
+    ``start``); each holds until the next one, which is how ``pnl_ticks``
+    reads once unchanged ticks are no longer written. Grid times before the
+    first point are left out.
+    """
+    samples: List[Point] = []
+    idx = -1
+    at = start
+    while at <= end:
+        while idx + 1 < len(points) and points[idx + 1][0] <= at:
+            idx += 1
+        if idx >= 0:
+            samples.append((at, points[idx][1], points[idx][2]))
+        at += timedelta(seconds=step)
+    return samples
+
+
+@router.get("/pnl/{market_id}/history")
+async def pnl_history(
+    market_id: int,
+    start: datetime = Query(..., description="ISO timestamp; naive values are UTC"),
+    end: Optional[datetime] = Query(None, description="defaults to now"),
+    step: Optional[float] = Query(None, gt=0, description="seconds; resample on a fixed grid instead of returning change points"),
+    session: AsyncSession = Depends(get_read_session),
+):
+    start = as_utc(start)
+    end = as_utc(end) if end is not None else datetime.now(timezone.utc)
+    if end < start:
+        raise HTTPException(status_code=422, detail="end is before start")
+    max_points = settings.pnl_history_max_points
+    if step is not None and (end - start).total_seconds() / step >= max_points:
+        raise HTTPException(status_code=422, detail=f"more than {max_points} points; use a larger step")
+
+    async with session as s:
+        # the row in force at ``start`` is the last one written before it
+        carried = (
+            await s.execute(
+                select(PnLTicks.ts, PnLTicks.pnl, PnLTicks.inventory)
+                .where(PnLTicks.market_id == market_id, PnLTicks.ts <= start)
+                .order_by(PnLTicks.ts.desc(), PnLTicks.id.desc())
+                .limit(1)
+            )
+        ).all()
+        rows = (
+            await s.execute(
+                select(PnLTicks.ts, PnLTicks.pnl, PnLTicks.inventory)
+                .where(PnLTicks.market_id == market_id, PnLTicks.ts > start, PnLTicks.ts <= end)
+                .order_by(PnLTicks.ts, PnLTicks.id)
+                .limit(max_points + 1)
+            )
+        ).all()
+    truncated = len(rows) > max_points
+    points = [(as_utc(ts), float(pnl), float(inventory)) for ts, pnl, inventory in [*carried, *rows[:max_points]]]
+    if step is not None:
+        # past the last row we read the series is unknown, so stop the grid there
+        points = step_series(points, start, points[-1][0] if truncated else end, step)
+    elif points and points[0][0] < start:
+        points[0] = (start, points[0][1], points[0][2])
+    return {
+        "market_id": market_id,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "step": step,
+        "truncated": truncated,
+        "points": [{"ts": ts.isoformat(), "pnl": pnl, "inventory": inventory} for ts, pnl, inventory in points],
+    }
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from core.risk import risk_monitor
+
+router = APIRouter()
+
+
+@router.get("/risk")
+async def get_risk(top: int = Query(10, ge=0, le=1000, description="markets with the largest VaR contribution to list")):
+    snapshot = risk_monitor.latest
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="portfolio risk not computed yet")
+    return snapshot.as_dict(top)
@@ -1,6 +1,10 @@
 
+from typing import List, Optional
+
 from pydantic import BaseModel, Field
 
+BULK_MAX_ITEMS = 5000
+
 class MarketCreate(BaseModel):
     name: str
     external_id: str
@@ -15,3 +19,21 @@ class MarketOut(BaseModel):
     enabled: bool
     class Config:
         from_attributes = True
+
+class MarketFieldsOut(BaseModel):
+    """A market as listed by ``GET /markets``: only the fields asked for with
+    ``fields=`` are present, all of them when it is omitted."""
+    id: Optional[int] = None
+    name: Optional[str] = None
+    external_id: Optional[str] = None
+    base_spread_bps: Optional[int] = None
+    enabled: Optional[bool] = None
+
+class MarketBulkCreate(BaseModel):
+    markets: List[MarketCreate] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class MarketBulkIds(BaseModel):
+    market_ids: List[int] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class MarketBulkStart(MarketBulkIds):
+    priority: int = 0
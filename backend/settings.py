@@ -1,6 +1,6 @@
 import os
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Tuple
 
 
 def _parse_bool(value: str | None, default: bool = False) -> bool:
@@ -22,6 +22,8 @@ class Settings:
             ["http://localhost:3000"],
         )
         self.enforce_https: bool = _parse_bool(os.getenv("ENFORCE_HTTPS"), default=False)
+        # worker processes the server runs (uvicorn and gunicorn read it too)
+        self.web_concurrency: int = int(os.getenv("WEB_CONCURRENCY", "1"))
         self.nonce_ttl_seconds: int = int(os.getenv("NONCE_TTL_SECONDS", "300"))
         self.auth_rate_limit_window_seconds: int = int(
             os.getenv("AUTH_RATE_LIMIT_WINDOW_SECONDS", "60")
@@ -29,6 +31,17 @@ class Settings:
         self.auth_rate_limit_max_requests: int = int(
             os.getenv("AUTH_RATE_LIMIT_MAX_REQUESTS", "10")
         )
+        self.auth_nonce_store: str = os.getenv("AUTH_NONCE_STORE", "memory").strip().lower()
+        self.auth_nonce_sqlite_path: str = os.getenv("AUTH_NONCE_SQLITE_PATH", "data/nonces.sqlite")
+        self.auth_nonce_audit: bool = _parse_bool(os.getenv("AUTH_NONCE_AUDIT"), default=True)
+        self.auth_rate_limit_backend: str = os.getenv("AUTH_RATE_LIMIT_BACKEND", "memory").strip().lower()
+        self.auth_rate_limit_sqlite_path: str = os.getenv(
+            "AUTH_RATE_LIMIT_SQLITE_PATH", "data/rate_limits.sqlite"
+        )
+        self.auth_recover_executor: str = os.getenv("AUTH_RECOVER_EXECUTOR", "thread").strip().lower()
+        self.auth_recover_max_concurrency: int = int(
+            os.getenv("AUTH_RECOVER_MAX_CONCURRENCY", "4")
+        )
         self.polymarket_public_api_base: str = os.getenv(
             "POLYMARKET_PUBLIC_API_BASE", "https://gamma-api.polymarket.com"
         )
@@ -39,9 +52,72 @@ class Settings:
         self.polymarket_timeout_seconds: float = float(
             os.getenv("POLYMARKET_TIMEOUT_SECONDS", "5.0")
         )
+        self.polymarket_chain_id: int = int(os.getenv("POLYMARKET_CHAIN_ID", "137"))
+        self.polymarket_exchange_address: str = os.getenv(
+            "POLYMARKET_EXCHANGE_ADDRESS", "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
+        )
+        self.order_signer_private_key: str | None = os.getenv("ORDER_SIGNER_PRIVATE_KEY")
+        self.order_signer_executor: str = os.getenv("ORDER_SIGNER_EXECUTOR", "process").strip().lower()
+        self.order_signer_workers: int = int(os.getenv("ORDER_SIGNER_WORKERS", "2"))
+        self.order_signer_batch_size: int = int(os.getenv("ORDER_SIGNER_BATCH_SIZE", "64"))
+        self.polymarket_max_connections: int = int(
+            os.getenv("POLYMARKET_MAX_CONNECTIONS", "100")
+        )
+        # "polymarket" (live APIs, simulator only as fallback) or "simulated"
+        self.market_data_source: str = os.getenv("MARKET_DATA_SOURCE", "polymarket").strip().lower()
+        self.market_sim_seed: int = int(os.getenv("MARKET_SIM_SEED", "0"))
+        self.market_sim_step_seconds: float = float(os.getenv("MARKET_SIM_STEP_SECONDS", "1.0"))
+        self.market_sim_clock: str = os.getenv("MARKET_SIM_CLOCK", "wall").strip().lower()
+        self.market_sim_factors: int = int(os.getenv("MARKET_SIM_FACTORS", "3"))
+        self.market_sim_correlation: float = float(os.getenv("MARKET_SIM_CORRELATION", "0.5"))
+        self.market_sim_volatility: float = float(os.getenv("MARKET_SIM_VOLATILITY", "0.02"))
+        self.database_read_url: str | None = os.getenv("DATABASE_READ_URL") or None
+        self.db_separate_pools: bool = _parse_bool(os.getenv("DB_SEPARATE_POOLS"), default=True)
+        # (pool_size, max_overflow) per workload engine
+        self.db_pools: Dict[str, Tuple[int, int]] = {
+            workload: (
+                int(os.getenv(f"DB_{workload.upper()}_POOL_SIZE", size)),
+                int(os.getenv(f"DB_{workload.upper()}_MAX_OVERFLOW", overflow)),
+            )
+            for workload, (size, overflow) in {
+                "api": ("5", "5"),
+                "ingest": ("10", "10"),
+                "read": ("5", "10"),
+                "auth": ("2", "2"),
+            }.items()
+        }
+        self.db_pool_timeout_seconds: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+        self.db_pool_recycle_seconds: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+        self.db_pool_pre_ping: bool = _parse_bool(os.getenv("DB_POOL_PRE_PING"), default=True)
+        self.db_prepared_statement_cache_size: int = int(
+            os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "500")
+        )
+        self.db_startup_timeout_seconds: float = float(
+            os.getenv("DB_STARTUP_TIMEOUT_SECONDS", "30")
+        )
+        self.db_pool_warm_connections: int = int(os.getenv("DB_POOL_WARM_CONNECTIONS", "2"))
         self.bot_loop_interval_seconds: float = float(
             os.getenv("BOT_LOOP_INTERVAL_SECONDS", "1.0")
         )
+        self.bot_tick_dedup: bool = _parse_bool(os.getenv("BOT_TICK_DEDUP"), default=True)
+        self.bot_tick_dedup_epsilon: float = float(os.getenv("BOT_TICK_DEDUP_EPSILON", "0.000001"))
+        self.bot_tick_heartbeat_seconds: float = float(
+            os.getenv("BOT_TICK_HEARTBEAT_SECONDS", "60")
+        )
+        self.bot_cadence_mode: str = os.getenv("BOT_CADENCE_MODE", "fixed").strip().lower()
+        self.bot_min_interval_seconds: float = float(os.getenv("BOT_MIN_INTERVAL_SECONDS", "0.5"))
+        self.bot_max_interval_seconds: float = float(os.getenv("BOT_MAX_INTERVAL_SECONDS", "30"))
+        self.bot_cadence_max_ticks_per_second: float = float(
+            os.getenv("BOT_CADENCE_MAX_TICKS_PER_SECOND", "0")
+        )
+        self.bot_cadence_target_move: float = float(os.getenv("BOT_CADENCE_TARGET_MOVE", "0.002"))
+        self.bot_cadence_spread_fraction: float = float(
+            os.getenv("BOT_CADENCE_SPREAD_FRACTION", "0.25")
+        )
+        self.bot_cadence_reference_liquidity: float = float(
+            os.getenv("BOT_CADENCE_REFERENCE_LIQUIDITY", "1000")
+        )
+        self.bot_cadence_ewma_alpha: float = float(os.getenv("BOT_CADENCE_EWMA_ALPHA", "0.2"))
         self.bot_retry_backoff_seconds: float = float(
             os.getenv("BOT_RETRY_BACKOFF_SECONDS", "2.0")
         )
@@ -50,6 +126,66 @@ class Settings:
         )
         self.bot_quote_size: float = float(os.getenv("BOT_QUOTE_SIZE", "25"))
         self.bot_inventory_cap: float = float(os.getenv("BOT_INVENTORY_CAP", "1000"))
+        self.bot_quoting: bool = _parse_bool(os.getenv("BOT_QUOTING"), default=False)
+        self.bot_exchange: str = os.getenv("BOT_EXCHANGE", "simulated").lower()
+        self.bot_quote_skew: float = float(os.getenv("BOT_QUOTE_SKEW", "1.0"))
+        self.bot_quote_tick_size: float = float(os.getenv("BOT_QUOTE_TICK_SIZE", "0.001"))
+        self.bot_order_batch_size: int = int(os.getenv("BOT_ORDER_BATCH_SIZE", "100"))
+        self.bot_order_batch_delay_ms: float = float(os.getenv("BOT_ORDER_BATCH_DELAY_MS", "2"))
+        self.bot_checkpoint_interval_seconds: float = float(
+            os.getenv("BOT_CHECKPOINT_INTERVAL_SECONDS", "5.0")
+        )
+        self.bot_warm_restart: bool = _parse_bool(os.getenv("BOT_WARM_RESTART"), default=True)
+        self.risk_interval_seconds: float = float(os.getenv("RISK_INTERVAL_SECONDS", "1.0"))
+        self.risk_window: int = int(os.getenv("RISK_WINDOW", "512"))
+        self.risk_halflife_updates: float = float(os.getenv("RISK_HALFLIFE_UPDATES", "60"))
+        self.risk_confidence: float = float(os.getenv("RISK_CONFIDENCE", "0.99"))
+        self.bot_lag_shed_threshold_seconds: float = float(
+            os.getenv("BOT_LAG_SHED_THRESHOLD_SECONDS", "0.1")
+        )
+        self.bot_watchdog_interval_seconds: float = float(
+            os.getenv("BOT_WATCHDOG_INTERVAL_SECONDS", "1.0")
+        )
+        self.bot_shed_max_priority: int = int(os.getenv("BOT_SHED_MAX_PRIORITY", "0"))
+        self.bot_shed_interval_multiplier: float = float(
+            os.getenv("BOT_SHED_INTERVAL_MULTIPLIER", "2.0")
+        )
+        self.bot_shed_pause_level: int = int(os.getenv("BOT_SHED_PAUSE_LEVEL", "3"))
+        self.pnl_feed_buffer_size: int = int(os.getenv("PNL_FEED_BUFFER_SIZE", "4096"))
+        self.pnl_feed_poll_seconds: float = float(os.getenv("PNL_FEED_POLL_SECONDS", "1.0"))
+        self.pnl_stream_keepalive_seconds: float = float(
+            os.getenv("PNL_STREAM_KEEPALIVE_SECONDS", "15")
+        )
+        self.pnl_export_chunk_size: int = int(os.getenv("PNL_EXPORT_CHUNK_SIZE", "5000"))
+        self.pnl_export_max_concurrent: int = int(os.getenv("PNL_EXPORT_MAX_CONCURRENT", "2"))
+        self.pnl_history_max_points: int = int(os.getenv("PNL_HISTORY_MAX_POINTS", "5000"))
+        self.pnl_long_poll_max_seconds: float = float(
+            os.getenv("PNL_LONG_POLL_MAX_SECONDS", "30")
+        )
+        self.response_cache_markets_ttl_seconds: float = float(
+            os.getenv("RESPONSE_CACHE_MARKETS_TTL_SECONDS", "30")
+        )
+        self.response_cache_pnl_ttl_seconds: float = float(
+            os.getenv("RESPONSE_CACHE_PNL_TTL_SECONDS", "1.0")
+        )
+        self.response_cache_max_entries: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+        self.bot_metrics_mode: str = os.getenv("BOT_METRICS_MODE", "per_market").strip().lower()
+        self.bot_metrics_top_k: int = int(os.getenv("BOT_METRICS_TOP_K", "20"))
+        self.metrics_cache_ttl_seconds: float = float(
+            os.getenv("METRICS_CACHE_TTL_SECONDS", "1.0")
+        )
+        self.event_loop_monitor_interval_seconds: float = float(
+            os.getenv("EVENT_LOOP_MONITOR_INTERVAL_SECONDS", "0.25")
+        )
+        self.admin_addresses: List[str] = [
+            addr.lower() for addr in _parse_list(os.getenv("ADMIN_ADDRESSES"), [])
+        ]
+        self.bot_trace_exporter: str = os.getenv("BOT_TRACE_EXPORTER", "none").strip().lower()
+        self.bot_trace_file: str = os.getenv("BOT_TRACE_FILE", "bot_spans.jsonl")
+        self.bot_trace_otlp_endpoint: str = os.getenv(
+            "BOT_TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+        )
+        self.bot_trace_flush_seconds: float = float(os.getenv("BOT_TRACE_FLUSH_SECONDS", "5.0"))
 
 
 @lru_cache()
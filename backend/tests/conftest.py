@@ -9,10 +9,11 @@ import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from db import Base, get_session
+from db import Base, get_read_session, get_session
 from main import app
 import models  # noqa: F401
-from routes.auth import rate_limiter
+from core.response_cache import response_cache
+from routes.auth import get_nonce_store, nonce_audit, rate_limiter, reset_recover_slots
 
 
 TEST_DB_PATH = Path(os.path.dirname(__file__)) / "test_db.sqlite"
@@ -56,8 +57,10 @@ async def override_dependencies(session_factory):
             yield s
 
     app.dependency_overrides[get_session] = _get_session_override
+    app.dependency_overrides[get_read_session] = _get_session_override
     yield
     app.dependency_overrides.pop(get_session, None)
+    app.dependency_overrides.pop(get_read_session, None)
 
 
 @pytest_asyncio.fixture(autouse=True)
@@ -68,11 +71,29 @@ async def reset_database(test_engine):
     yield
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def reset_nonce_store(session_factory):
+    get_nonce_store().reset()
+    nonce_audit.session_factory = session_factory
+    yield
+    await nonce_audit.stop()
+    get_nonce_store().reset()
+
+
 @pytest_asyncio.fixture(autouse=True)
 async def reset_rate_limiter():
     rate_limiter.reset()
+    reset_recover_slots()
     yield
     rate_limiter.reset()
+    reset_recover_slots()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def reset_response_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
 
 
 @pytest_asyncio.fixture
@@ -1,12 +1,15 @@
 import secrets
-from datetime import datetime, timedelta, timezone
+import threading
+import time
 
 import pytest
 from eth_account import Account
 from eth_account.messages import encode_defunct
-from sqlalchemy import select
 
+import auth_utils
+from auth_utils import VerifiedTokenCache, create_jwt, token_cache, verify_jwt
 from models import WalletAuth
+from routes.auth import _get_recover_slots, get_nonce_store, nonce_audit, reset_recover_slots
 from settings import get_settings
 
 settings = get_settings()
@@ -22,30 +25,31 @@ async def test_nonce_creation(client, session):
     data = res.json()
     assert data["nonce"]
     assert data["address"] == payload["address"].lower()
+    assert (await get_nonce_store().get(data["address"])).nonce == data["nonce"]
 
+    await nonce_audit.flush()
     stored = await session.execute(
         WalletAuth.__table__.select().where(WalletAuth.address == payload["address"].lower())
     )
     record = stored.fetchone()
     assert record is not None
+    assert record.nonce == data["nonce"]
 
 
 @pytest.mark.asyncio
-async def test_verify_signature_success(client, session, monkeypatch):
+async def test_verify_signature_success(client, monkeypatch):
     addr = "0x1234567890abcdef1234567890abcdef12345678"
-    wallet = WalletAuth(address=addr.lower(), nonce=secrets.token_hex(16))
-    session.add(wallet)
-    await session.commit()
-    original_nonce = wallet.nonce
+    nonce = secrets.token_hex(16)
+    await get_nonce_store().issue(addr.lower(), nonce)
 
-    message = f"Sign this message to authenticate: {wallet.nonce}"
+    message = f"Sign this message to authenticate: {nonce}"
     msg = encode_defunct(text=message)
     signature = Account.sign_message(msg, Account.create().key).signature.hex()
 
     def fake_recover_message(message, signature):
         return addr
 
-    monkeypatch.setattr("routes.auth.Account.recover_message", fake_recover_message)
+    monkeypatch.setattr("eth_account.Account.recover_message", fake_recover_message)
 
     res = await client.post("/auth/verify", json={"address": addr, "signature": signature})
 
@@ -54,19 +58,19 @@ async def test_verify_signature_success(client, session, monkeypatch):
     assert data["token"]
     assert data["address"] == addr.lower()
 
-    await session.refresh(wallet)
-    assert wallet.nonce != original_nonce
+    # the nonce is single use
+    assert await get_nonce_store().get(addr.lower()) is None
+    replay = await client.post("/auth/verify", json={"address": addr, "signature": signature})
+    assert replay.status_code == 400
 
 
 @pytest.mark.asyncio
-async def test_verify_signature_invalid(client, session, monkeypatch):
+async def test_verify_signature_invalid(client, monkeypatch):
     addr = "0x1234567890abcdef1234567890abcdef12345678"
-    wallet = WalletAuth(address=addr.lower(), nonce=secrets.token_hex(16))
-    session.add(wallet)
-    await session.commit()
+    await get_nonce_store().issue(addr.lower(), secrets.token_hex(16))
 
     monkeypatch.setattr(
-        "routes.auth.Account.recover_message",
+        "eth_account.Account.recover_message",
         lambda *_args, **_kwargs: "0xdeadbeefdeadbeefdeadbeefdeadbeefdeadbeef",
     )
 
@@ -76,20 +80,18 @@ async def test_verify_signature_invalid(client, session, monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_verify_signature_expired_nonce(client, session):
+async def test_verify_signature_expired_nonce(client):
     addr = "0x1234567890abcdef1234567890abcdef12345678"
     payload = {"address": addr}
 
     first = await client.post("/auth/nonce", json=payload)
     assert first.status_code == 200
 
-    res = await session.execute(select(WalletAuth).where(WalletAuth.address == addr.lower()))
-    wallet = res.scalar_one()
-    old_timestamp = (wallet.updated_at or datetime.now(timezone.utc)) - timedelta(
-        seconds=settings.nonce_ttl_seconds + 10
+    await get_nonce_store().issue(
+        addr.lower(),
+        first.json()["nonce"],
+        now=time.time() - settings.nonce_ttl_seconds - 10,
     )
-    wallet.updated_at = old_timestamp
-    await session.commit()
 
     expired = await client.post("/auth/verify", json={"address": addr, "signature": "0xdead"})
     assert expired.status_code == 400
@@ -108,3 +110,72 @@ async def test_nonce_rate_limit(client):
     blocked = await client.post("/auth/nonce", json=payload)
     assert blocked.status_code == 429
 
+
+
+@pytest.mark.asyncio
+async def test_verify_signature_real_recovery_off_loop(client, monkeypatch):
+    account = Account.create()
+    threads = []
+    original = Account.recover_message
+
+    def tracking_recover(message, signature):
+        threads.append(threading.current_thread())
+        return original(message, signature=signature)
+
+    monkeypatch.setattr("eth_account.Account.recover_message", tracking_recover)
+
+    nonce_res = await client.post("/auth/nonce", json={"address": account.address})
+    signed = Account.sign_message(encode_defunct(text=nonce_res.json()["message"]), account.key)
+    res = await client.post(
+        "/auth/verify",
+        json={"address": account.address, "signature": signed.signature.hex()},
+    )
+
+    assert res.status_code == 200
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_verify_jwt_caches_decoded_tokens(monkeypatch):
+    token_cache.clear()
+    decode_calls = []
+    original_decode = auth_utils.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decode_calls.append(args[0])
+        return original_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth_utils.jwt, "decode", counting_decode)
+    token = create_jwt("0xABC")
+
+    assert verify_jwt(token) == "0xabc"
+    assert verify_jwt(token) == "0xabc"
+    assert len(decode_calls) == 1
+    assert verify_jwt("not-a-token") is None
+
+
+def test_token_cache_expires_entries_and_bounds_size():
+    cache = VerifiedTokenCache(max_entries=2)
+    cache.put("a", "0xa", exp=100)
+    cache.put("b", "0xb", exp=200)
+
+    assert cache.get("a", now=150) is None
+    assert len(cache) == 1
+
+    cache.put("c", "0xc", exp=300)
+    cache.get("b", now=0)
+    cache.put("d", "0xd", exp=300)
+
+    assert cache.get("b", now=0) == "0xb"
+    assert cache.get("c", now=0) is None
+    assert cache.get("d", now=0) == "0xd"
+
+
+@pytest.mark.asyncio
+async def test_recover_slots_are_built_on_first_use_from_current_settings(monkeypatch):
+    monkeypatch.setattr(settings, "auth_recover_max_concurrency", 3)
+    reset_recover_slots()
+
+    slots = _get_recover_slots()
+
+    assert slots is _get_recover_slots()
+    assert slots._value == 3
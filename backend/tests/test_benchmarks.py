@@ -0,0 +1,45 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.common import percentiles
+from benchmarks.fake_polymarket import FakeMarketBook, FakePolymarketServer, FaultConfig, create_fake_polymarket_app
+from polymarket_client import fetch_market_snapshot, settings as client_settings
+
+
+def test_percentiles_nearest_rank():
+    stats = percentiles([0.001 * i for i in range(1, 101)], scale=1000)
+
+    assert stats["p50"] == 50
+    assert stats["p99"] == 99
+    assert stats["max"] == 100
+    assert stats["count"] == 100
+    assert percentiles([])["p50"] is None
+
+
+def test_fake_book_is_deterministic_per_seed():
+    first, second = FakeMarketBook(seed=3), FakeMarketBook(seed=3)
+
+    assert [first.quote("m")["midPrice"] for _ in range(5)] == [second.quote("m")["midPrice"] for _ in range(5)]
+    assert FakeMarketBook(seed=4).quote("m") != FakeMarketBook(seed=3).quote("m")
+
+
+@pytest.mark.asyncio
+async def test_fake_server_injects_errors():
+    fake_app = create_fake_polymarket_app(FaultConfig(error_rate=1.0, error_status=502))
+    async with AsyncClient(transport=ASGITransport(app=fake_app), base_url="http://fake") as ac:
+        res = await ac.get("/markets/abc")
+
+    assert res.status_code == 502
+    assert fake_app.state.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_snapshot_fetch_against_fake_server(monkeypatch):
+    with FakePolymarketServer(FaultConfig(latency_ms=1, seed=1)) as fake:
+        monkeypatch.setattr(client_settings, "polymarket_api_base", fake.url)
+        monkeypatch.setattr(client_settings, "polymarket_public_api_base", fake.url)
+        snapshot = await fetch_market_snapshot("bench-1")
+
+    assert snapshot["source"] == f"{fake.url}/markets/bench-1"
+    assert 0 < snapshot["mid_price"] < 1
+    assert snapshot["best_bid"] < snapshot["best_ask"]
@@ -1,27 +1,33 @@
 import asyncio
+import time
+from decimal import Decimal
 
 import pytest
 
+from auth_utils import create_jwt
 from core.bot_manager import (
     LOOP_ERRORS,
     LOOP_SUCCESS,
+    PHASE_DURATION,
+    EFFECTIVE_INTERVAL,
     BotManager,
+    MarketState,
+    MISSED_TICKS,
+    TICKS_DEDUPLICATED,
     settings as bot_settings,
+    should_persist_tick,
 )
-from models import Market, PnLTicks
+from models import BotState, Market, PnLTicks
+from routes.auth import settings as auth_settings
 
 
-@pytest.mark.asyncio
-async def test_bot_manager_persists_ticks(monkeypatch):
-    market = Market(name="Loop", external_id="loop")
-    market.id = 1
-
-    snapshots = [
-        {"mid_price": 0.5, "best_bid": 0.49, "best_ask": 0.51, "liquidity": 1000.0, "source": "test"},
-        {"mid_price": 0.53, "best_bid": 0.52, "best_ask": 0.54, "liquidity": 1001.0, "source": "test"},
-    ]
-    recorded_ticks: list[PnLTicks] = []
-
+def _install_fake_loop_env(
+    monkeypatch,
+    market: Market,
+    recorded_ticks: list,
+    snapshots: list,
+    fast_sleep: bool = True,
+) -> None:
     class DummyResult:
         def __init__(self, market_obj: Market):
             self._market = market_obj
@@ -52,28 +58,397 @@ async def test_bot_manager_persists_ticks(monkeypatch):
 
     original_sleep = asyncio.sleep
 
-    async def fast_sleep(_delay: float):
+    async def _fast_sleep(_delay: float):
         await original_sleep(0)
 
-    labels = {"market_id": str(market.id)}
-    success_before = LOOP_SUCCESS.labels(**labels)._value.get()
-    errors_before = LOOP_ERRORS.labels(**labels)._value.get()
-
-    monkeypatch.setattr("core.bot_manager.SessionLocal", lambda: DummySession(), raising=True)
+    monkeypatch.setattr("core.bot_manager.IngestSessionLocal", lambda: DummySession(), raising=True)
     monkeypatch.setattr("core.bot_manager.fetch_market_snapshot", fake_snapshot, raising=True)
     monkeypatch.setattr("core.bot_manager.random.uniform", lambda _a, _b: 0, raising=True)
-    monkeypatch.setattr("core.bot_manager.asyncio.sleep", fast_sleep, raising=True)
+    if fast_sleep:
+        monkeypatch.setattr("core.bot_manager.asyncio.sleep", _fast_sleep, raising=True)
     monkeypatch.setattr(bot_settings, "bot_loop_interval_seconds", 0.01, raising=False)
     monkeypatch.setattr(bot_settings, "bot_retry_backoff_seconds", 1.0, raising=False)
     monkeypatch.setattr(bot_settings, "bot_max_backoff_seconds", 0.1, raising=False)
+    # the default snapshot is flat, so with dedup only the first tick would commit
+    monkeypatch.setattr(bot_settings, "bot_tick_dedup", False, raising=False)
+
+
+async def _spin(iterations: int = 10) -> None:
+    # asyncio.sleep is patched module-wide to yield immediately, so give the
+    # loop a handful of scheduler turns instead of relying on wall time.
+    for _ in range(iterations):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_bot_manager_persists_ticks(monkeypatch):
+    market = Market(name="Loop", external_id="loop")
+    market.id = 1
+
+    snapshots = [
+        {"mid_price": 0.5, "best_bid": 0.49, "best_ask": 0.51, "liquidity": 1000.0, "source": "test"},
+        {"mid_price": 0.53, "best_bid": 0.52, "best_ask": 0.54, "liquidity": 1001.0, "source": "test"},
+    ]
+    recorded_ticks: list[PnLTicks] = []
+
+    labels = {"market_id": str(market.id)}
+    success_before = LOOP_SUCCESS.labels(**labels)._value.get()
+    errors_before = LOOP_ERRORS.labels(**labels)._value.get()
+
+    _install_fake_loop_env(monkeypatch, market, recorded_ticks, snapshots)
 
     manager = BotManager()
     await manager.start_market_loop(market.id)
     await asyncio.sleep(0.05)
+
+    assert LOOP_SUCCESS.labels(**labels)._value.get() > success_before
+    assert LOOP_ERRORS.labels(**labels)._value.get() == errors_before
+
     await manager.stop_market_loop(market.id)
 
     assert recorded_ticks
     assert all(isinstance(t, PnLTicks) for t in recorded_ticks)
 
-    assert LOOP_SUCCESS.labels(**labels)._value.get() > success_before
-    assert LOOP_ERRORS.labels(**labels)._value.get() == errors_before
+
+@pytest.mark.asyncio
+async def test_bot_manager_records_phase_timings(monkeypatch):
+    market = Market(name="Phases", external_id="phases")
+    market.id = 2
+    recorded_ticks: list[PnLTicks] = []
+    _install_fake_loop_env(monkeypatch, market, recorded_ticks, [])
+
+    commit_labels = {"market_id": str(market.id), "phase": "db_commit"}
+    commits_before = PHASE_DURATION.labels(**commit_labels)._sum.get()
+
+    manager = BotManager()
+    await manager.start_market_loop(market.id)
+    await _spin()
+
+    stats = manager.loop_stats[market.id]
+    assert stats.ticks > 0
+    assert stats.last_tick_at is not None
+    assert stats.last_source == "test"
+    assert set(stats.phases) == {"market_lookup", "snapshot_fetch", "pnl_compute", "db_commit"}
+    assert stats.last_sleep_lateness is not None
+    assert PHASE_DURATION.labels(**commit_labels)._sum.get() > commits_before
+
+    await manager.stop_market_loop(market.id)
+    assert market.id not in manager.loop_stats
+    assert ("2", "db_commit") not in {
+        tuple(sample.labels.values())
+        for metric in PHASE_DURATION.collect()
+        for sample in metric.samples
+        if sample.name.endswith("_count")
+    }
+
+
+@pytest.mark.asyncio
+async def test_debug_loops_reports_tick_age(client, monkeypatch):
+    market = Market(name="Debug", external_id="debug")
+    market.id = 3
+    _install_fake_loop_env(monkeypatch, market, [], [])
+
+    manager = BotManager()
+    monkeypatch.setattr("routes.debug.bot_manager", manager)
+    monkeypatch.setattr(auth_settings, "admin_addresses", ["0xadmin"])
+    await manager.start_market_loop(market.id)
+    await _spin()
+    try:
+        res = await client.get("/debug/loops", headers={"Authorization": f"Bearer {create_jwt('0xadmin')}"})
+    finally:
+        await manager.stop_market_loop(market.id)
+
+    assert res.status_code == 200
+    (entry,) = res.json()["markets"]
+    assert entry["market_id"] == market.id
+    assert entry["running"] is True
+    assert entry["last_tick_age_seconds"] >= 0
+    assert "db_commit" in entry["phases"]
+
+
+def _slow_snapshots(monkeypatch, work_seconds: float, calls: list) -> None:
+    async def slow_snapshot(_external_id: str):
+        calls.append(time.monotonic())
+        await asyncio.sleep(work_seconds)
+        return {"mid_price": 0.5, "liquidity": 10.0, "source": "test"}
+
+    monkeypatch.setattr("core.bot_manager.fetch_market_snapshot", slow_snapshot, raising=True)
+
+
+@pytest.mark.asyncio
+async def test_fixed_rate_schedule_absorbs_work_time(monkeypatch):
+    market = Market(name="Cadence", external_id="cadence")
+    market.id = 4
+    _install_fake_loop_env(monkeypatch, market, [], [], fast_sleep=False)
+    calls: list[float] = []
+    _slow_snapshots(monkeypatch, 0.05, calls)
+    monkeypatch.setattr(bot_settings, "bot_loop_interval_seconds", 0.1, raising=False)
+
+    manager = BotManager()
+    await manager.start_market_loop(market.id)
+    await asyncio.sleep(0.65)
+    await manager.stop_market_loop(market.id)
+
+    periods = [b - a for a, b in zip(calls, calls[1:])]
+    assert len(periods) >= 4
+    # interval + work would be 0.15s per tick without deadline-based sleeps
+    assert sum(periods) / len(periods) < 0.125
+
+
+@pytest.mark.asyncio
+async def test_overrunning_ticks_are_counted_as_missed(monkeypatch):
+    market = Market(name="Overrun", external_id="overrun")
+    market.id = 5
+    _install_fake_loop_env(monkeypatch, market, [], [], fast_sleep=False)
+    _slow_snapshots(monkeypatch, 0.12, [])
+    monkeypatch.setattr(bot_settings, "bot_loop_interval_seconds", 0.05, raising=False)
+    labels = {"market_id": str(market.id)}
+
+    manager = BotManager()
+    await manager.start_market_loop(market.id)
+    await asyncio.sleep(0.4)
+
+    assert manager.loop_stats[market.id].missed_ticks > 0
+    assert MISSED_TICKS.labels(**labels)._value.get() == manager.loop_stats[market.id].missed_ticks
+    await manager.stop_market_loop(market.id)
+
+
+@pytest.mark.asyncio
+async def test_load_shedding_pauses_low_priority_markets(monkeypatch):
+    low = Market(name="Low", external_id="low")
+    low.id = 6
+    recorded_ticks: list[PnLTicks] = []
+    _install_fake_loop_env(monkeypatch, low, recorded_ticks, [])
+    monkeypatch.setattr(bot_settings, "bot_shed_pause_level", 2, raising=False)
+
+    manager = BotManager()
+    manager.priorities = {6: 0, 7: 1}
+    manager.set_shed_level(1)
+    assert manager._interval_for(6) == pytest.approx(0.02)
+    assert manager._interval_for(7) == pytest.approx(0.01)
+
+    manager.set_shed_level(5)
+    assert manager.shed_level == 2
+    await manager.start_market_loop(6, priority=0)
+    await manager.start_market_loop(7, priority=1)
+    await _spin()
+
+    assert manager.loop_stats[6].ticks == 1
+    assert manager.loop_stats[7].ticks > 1
+
+    manager.set_shed_level(0)
+    await _spin()
+    assert manager.loop_stats[6].ticks > 1
+    await manager.stop_all()
+
+
+@pytest.mark.asyncio
+async def test_watchdog_raises_and_relaxes_shed_level(monkeypatch):
+    class FakeMonitor:
+        ewma_lag = 1.0
+
+    monkeypatch.setattr(bot_settings, "bot_watchdog_interval_seconds", 0.01, raising=False)
+    monkeypatch.setattr(bot_settings, "bot_lag_shed_threshold_seconds", 0.1, raising=False)
+    monitor = FakeMonitor()
+    manager = BotManager()
+
+    manager.start_watchdog(monitor)
+    await asyncio.sleep(0.05)
+    assert manager.shed_level == bot_settings.bot_shed_pause_level
+
+    monitor.ewma_lag = 0.0
+    await asyncio.sleep(0.06)
+    assert manager.shed_level == 0
+    await manager.stop_watchdog()
+
+
+@pytest.mark.asyncio
+async def test_loop_resumes_from_restored_state(monkeypatch):
+    market = Market(name="Resume", external_id="resume")
+    market.id = 40
+    recorded_ticks: list[PnLTicks] = []
+    snapshots = [{"mid_price": 0.55, "best_bid": 0.54, "best_ask": 0.56, "liquidity": 1.0, "source": "test"}]
+    _install_fake_loop_env(monkeypatch, market, recorded_ticks, snapshots)
+    monkeypatch.setattr(bot_settings, "bot_quote_size", 25.0, raising=False)
+
+    manager = BotManager()
+    manager.states[market.id] = MarketState(pnl=Decimal("2"), prev_price=Decimal("0.50"), ticks=7)
+    await manager.start_market_loop(market.id)
+    await _spin()
+    await manager.stop_market_loop(market.id)
+
+    assert recorded_ticks[0].pnl == Decimal("3.25")
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_and_warm_restart_round_trip(monkeypatch, session, session_factory):
+    market = Market(name="Warm", external_id="warm")
+    idle = Market(name="Idle", external_id="idle")
+    session.add_all([market, idle])
+    await session.commit()
+    monkeypatch.setattr("core.bot_manager.IngestSessionLocal", session_factory)
+
+    async def parked_loop(_market_id: int) -> None:
+        await asyncio.Event().wait()
+
+    before = BotManager()
+    monkeypatch.setattr(before, "_run_market_loop", parked_loop)
+    await before.start_market_loop(market.id, priority=2)
+    await before.start_market_loop(idle.id)
+    before.states[market.id] = MarketState(pnl=Decimal("1.5"), prev_price=Decimal("0.42"), ticks=3)
+    await before.stop_market_loop(idle.id)
+    await before.stop_checkpointer()
+    for task in before.tasks.values():
+        task.cancel()
+
+    rows = {row.market_id: row for row in (await session.execute(BotState.__table__.select())).all()}
+    assert rows[market.id].running and not rows[idle.id].running
+
+    after = BotManager()
+    monkeypatch.setattr(after, "_run_market_loop", parked_loop)
+    assert await after.warm_restart() == 1
+    assert after.states[market.id] == MarketState(pnl=Decimal("1.5"), prev_price=Decimal("0.42"), ticks=3)
+    assert after.priorities[market.id] == 2
+    assert after.is_running(market.id) and not after.is_running(idle.id)
+
+    await after.stop_all()
+    assert await BotManager().warm_restart() == 0
+
+
+@pytest.mark.asyncio
+async def test_adaptive_cadence_sets_effective_interval(monkeypatch):
+    market = Market(name="Adaptive", external_id="adaptive")
+    market.id = 41
+    _install_fake_loop_env(monkeypatch, market, [], [])
+    monkeypatch.setattr(bot_settings, "bot_cadence_mode", "adaptive", raising=False)
+
+    manager = BotManager()
+    await manager.start_market_loop(market.id)
+    await _spin()
+
+    stats = manager.loop_stats[market.id]
+    assert stats.ticks > 1
+    # the fake feed never moves, so the market is already backing off
+    assert stats.interval == manager.cadence.interval_for(market.id) > manager.cadence.base_interval
+    assert EFFECTIVE_INTERVAL.labels(market_id=str(market.id))._value.get() == stats.interval
+
+    await manager.stop_market_loop(market.id)
+    assert market.id not in manager.cadence.markets
+
+
+@pytest.mark.asyncio
+async def test_flat_ticks_are_deduplicated(monkeypatch):
+    market = Market(name="Flat", external_id="flat")
+    market.id = 42
+    recorded_ticks: list[PnLTicks] = []
+    moved = {"mid_price": 0.60, "best_bid": 0.59, "best_ask": 0.61, "liquidity": 1002.0, "source": "test"}
+    flat = {"mid_price": 0.55, "best_bid": 0.54, "best_ask": 0.56, "liquidity": 1002.0, "source": "test"}
+    _install_fake_loop_env(monkeypatch, market, recorded_ticks, [flat, flat, flat, moved])
+    monkeypatch.setattr(bot_settings, "bot_quote_size", 10.0, raising=False)
+    monkeypatch.setattr(bot_settings, "bot_tick_dedup", True, raising=False)
+    monkeypatch.setattr(bot_settings, "bot_tick_heartbeat_seconds", 3600.0, raising=False)
+
+    manager = BotManager()
+    await manager.start_market_loop(market.id)
+    await _spin(20)
+    stats = manager.loop_stats[market.id]
+    skipped = TICKS_DEDUPLICATED.labels(market_id=str(market.id))._value.get()
+    await manager.stop_market_loop(market.id)
+
+    # first tick, the move to 0.60 and the fall back to the default 0.55;
+    # every other tick repeats the last written row
+    assert [tick.pnl for tick in recorded_ticks] == [Decimal("0"), Decimal("0.50"), Decimal("0")]
+    assert stats.ticks_deduplicated == stats.ticks - 3 > 0
+    assert skipped == stats.ticks_deduplicated
+
+
+def test_should_persist_tick_heartbeat_and_epsilon(monkeypatch):
+    monkeypatch.setattr(bot_settings, "bot_tick_dedup", True, raising=False)
+    monkeypatch.setattr(bot_settings, "bot_tick_dedup_epsilon", 0.000001, raising=False)
+    monkeypatch.setattr(bot_settings, "bot_tick_heartbeat_seconds", 60.0, raising=False)
+    last = (Decimal("1.5"), Decimal("0"), 100.0)
+
+    assert should_persist_tick(None, Decimal("1.5"), Decimal("0"), 100.0)
+    assert not should_persist_tick(last, Decimal("1.5000001"), Decimal("0"), 159.0)
+    assert should_persist_tick(last, Decimal("1.500002"), Decimal("0"), 101.0)
+    assert should_persist_tick(last, Decimal("1.5"), Decimal("1"), 101.0)
+    assert should_persist_tick(last, Decimal("1.5"), Decimal("0"), 160.0)
+
+    monkeypatch.setattr(bot_settings, "bot_tick_dedup", False, raising=False)
+    assert should_persist_tick(last, Decimal("1.5"), Decimal("0"), 101.0)
+
+
+@pytest.mark.asyncio
+async def test_bot_loop_quotes_and_tracks_fills(monkeypatch):
+    market = Market(name="Quoted", external_id="quoted", base_spread_bps=100)
+    market.id = 50
+    recorded_ticks: list[PnLTicks] = []
+    drop = {"mid_price": 0.45, "best_bid": 0.44, "best_ask": 0.46, "liquidity": 1000.0, "source": "test"}
+    flat = {"mid_price": 0.50, "best_bid": 0.49, "best_ask": 0.51, "liquidity": 1000.0, "source": "test"}
+    _install_fake_loop_env(monkeypatch, market, recorded_ticks, [flat, drop, drop])
+    monkeypatch.setattr(bot_settings, "bot_quoting", True, raising=False)
+    monkeypatch.setattr(bot_settings, "bot_order_batch_delay_ms", 0.0, raising=False)
+
+    manager = BotManager()
+    exchange = manager.quoting.adapter
+    await manager.start_market_loop(market.id)
+    await _spin(40)
+    state = manager.states[market.id]
+    stats = manager.loop_stats[market.id]
+    await manager.stop_market_loop(market.id)
+    await manager.quoting.close()
+
+    # the drop to 0.45 fills the 0.497 bid, then the default 0.55 mid lifts the re-quoted ask
+    inventories = [tick.inventory for tick in recorded_ticks]
+    assert inventories[:3] == [Decimal("0"), Decimal("25"), Decimal("25")]
+    assert state.inventory == Decimal("0")
+    assert "quoting" in stats.phases
+    assert exchange.orders == {} and market.id not in manager.quoting.resting
+
+
+@pytest.mark.asyncio
+async def test_fills_survive_a_failed_requote(monkeypatch):
+    market = Market(name="Quoted", external_id="quoted", base_spread_bps=100)
+    market.id = 51
+    drop = {"mid_price": 0.45, "best_bid": 0.44, "best_ask": 0.46, "liquidity": 1000.0, "source": "test"}
+    flat = {"mid_price": 0.50, "best_bid": 0.49, "best_ask": 0.51, "liquidity": 1000.0, "source": "test"}
+    _install_fake_loop_env(monkeypatch, market, [], [flat, drop])
+    monkeypatch.setattr(bot_settings, "bot_quoting", True, raising=False)
+    monkeypatch.setattr(bot_settings, "bot_order_batch_delay_ms", 0.0, raising=False)
+
+    manager = BotManager()
+    exchange = manager.quoting.adapter
+    place_orders = exchange.place_orders
+    placed = []
+
+    async def place_once(orders, signatures=None):
+        if placed:
+            raise RuntimeError("exchange down")
+        placed.append(orders)
+        return await place_orders(orders, signatures)
+
+    monkeypatch.setattr(exchange, "place_orders", place_once)
+    await manager.start_market_loop(market.id)
+    await _spin(40)
+    state = manager.states[market.id]
+    errors = manager.loop_stats[market.id].errors
+    await manager.stop_market_loop(market.id)
+    await manager.quoting.close()
+
+    # the 0.497 bid filled on the drop tick, whose requote then failed
+    assert errors > 0
+    assert state.inventory == Decimal("25")
+    assert state.pnl == (Decimal("0.45") - Decimal("0.497")) * 25
+
+
+@pytest.mark.asyncio
+async def test_loop_that_ends_on_its_own_drops_its_stats(monkeypatch):
+    # the market lookup finds nothing, as after the market row is deleted
+    _install_fake_loop_env(monkeypatch, None, [], [])
+
+    manager = BotManager()
+    await manager.start_market_loop(31)
+    await _spin()
+
+    assert manager.tasks[31].done()
+    assert 31 not in manager.loop_stats
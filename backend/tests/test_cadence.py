@@ -0,0 +1,58 @@
+import pytest
+
+from core.cadence import CadenceController
+
+
+def _controller(**overrides) -> CadenceController:
+    params = dict(base_interval=1.0, min_interval=0.5, max_interval=30.0, target_move=0.002)
+    params.update(overrides)
+    return CadenceController(**params)
+
+
+def test_flat_market_backs_off_to_max_interval():
+    cadence = _controller()
+    intervals = [cadence.observe(1, 0.5, now=float(t)) for t in range(10)]
+
+    assert intervals[:4] == [1.0, 2.0, 4.0, 8.0]
+    assert intervals[-1] == 30.0
+
+
+def test_volatile_market_tightens_to_min_interval():
+    cadence = _controller()
+    intervals = [cadence.observe(1, 0.5 + 0.02 * (t % 2), now=float(t)) for t in range(5)]
+
+    assert intervals[-1] == 0.5
+    assert intervals == sorted(intervals, reverse=True)
+
+
+def test_wide_spread_and_thin_book_allow_slower_ticks():
+    tight = _controller()
+    wide = _controller()
+    for t in range(30):
+        price = 0.5 + 0.02 * (t % 2)
+        tight.observe(1, price, best_bid=price - 0.005, best_ask=price + 0.005, liquidity=1000.0, now=float(t))
+        wide.observe(1, price, best_bid=price - 0.1, best_ask=price + 0.1, liquidity=1000.0, now=float(t))
+
+    # target move becomes a quarter of the 0.2 spread: (0.05 ** 2) / (0.02 ** 2) seconds
+    assert wide.interval_for(1) == pytest.approx(6.25)
+    assert tight.interval_for(1) == 0.5
+
+    thin = _controller()
+    for t in range(30):
+        price = 0.5 + 0.02 * (t % 2)
+        thin.observe(1, price, best_bid=price - 0.1, best_ask=price + 0.1, liquidity=250.0, now=float(t))
+    assert thin.interval_for(1) == pytest.approx(12.5)
+
+
+def test_budget_stretches_every_interval():
+    cadence = _controller(max_ticks_per_second=5.0)
+    for market_id in range(10):
+        cadence.observe(market_id, 0.5, now=0.0)
+
+    assert cadence.demand == pytest.approx(10.0)
+    assert cadence.interval_for(3) == pytest.approx(2.0)
+
+    for market_id in range(6):
+        cadence.forget(market_id)
+    assert cadence.demand == pytest.approx(4.0)
+    assert cadence.interval_for(7) == pytest.approx(1.0)
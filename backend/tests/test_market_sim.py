@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.fake_polymarket import FaultConfig, create_fake_polymarket_app
+from core import market_sim
+from core.market_sim import MarketSimulator, advance_simulation
+from polymarket_client import fetch_market_snapshot, settings as client_settings
+
+
+IDS = [f"market-{idx}" for idx in range(50)]
+
+
+def test_paths_depend_only_on_seed_and_market():
+    first, second = MarketSimulator(seed=5), MarketSimulator(seed=5, capacity=2)
+    first.add_markets(IDS)
+    second.add_markets(list(reversed(IDS)) + ["extra"])
+    first.advance(300)
+    for _ in range(300):
+        second.advance()
+
+    for external_id in IDS:
+        assert first.midprice(external_id) == pytest.approx(second.midprice(external_id), abs=1e-12)
+    other = MarketSimulator(seed=6)
+    other.add_markets(IDS)
+    other.advance(300)
+    assert other.midprice(IDS[0]) != first.midprice(IDS[0])
+
+
+def test_markets_added_late_match_markets_added_at_step_zero():
+    early, late = MarketSimulator(seed=5), MarketSimulator(seed=5)
+    early.add_markets(IDS)
+    early.advance(700)
+    late.add_markets(IDS[:3])
+    late.advance(300)
+    late.add_markets(IDS)
+    late.advance(400)
+
+    assert late.mids(late.add_markets(IDS)) == pytest.approx(early.mids(early.add_markets(IDS)), abs=1e-12)
+    assert late.quotes(IDS) == early.quotes(IDS)
+
+
+def test_step_clock_moves_only_when_advanced(monkeypatch):
+    monkeypatch.setattr(market_sim.settings, "market_sim_clock", "steps")
+    monkeypatch.setattr(market_sim, "_simulator", MarketSimulator(seed=4, step_seconds=1e-9))
+    reference = MarketSimulator(seed=4)
+    reference.advance(10)
+
+    before = market_sim.simulated_midprice("sim-1")
+    assert market_sim.simulated_midprice("sim-1") == before
+    assert advance_simulation(10) == 10
+    assert market_sim.simulated_quote("sim-1") == reference.quote("sim-1")
+
+
+def test_factor_share_sets_cross_market_correlation():
+    def move_correlation(correlation):
+        sim = MarketSimulator(seed=1, factors=1, correlation=correlation)
+        sim.add_markets(IDS[:2])
+        path = []
+        for _ in range(400):
+            sim.advance()
+            path.append(sim.x[:2].copy())
+        moves = np.diff(np.array(path), axis=0)
+        return abs(np.corrcoef(moves.T)[0, 1])
+
+    assert move_correlation(1.0) > 0.99
+    assert move_correlation(0.0) < 0.2
+
+
+def test_books_are_ordered_around_the_mid():
+    sim = MarketSimulator(seed=2, depth_levels=4)
+    sim.add_markets(IDS)
+    sim.advance(1000)
+
+    for quote in sim.quotes(IDS):
+        bids = [level["price"] for level in quote["bids"]]
+        asks = [level["price"] for level in quote["asks"]]
+        assert 0 < bids[-1] <= bids[0] < quote["midPrice"] < asks[0] <= asks[-1] < 1
+        assert quote["bestBid"] == bids[0] and quote["bestAsk"] == asks[0]
+        assert quote["liquidity"] == pytest.approx(sum(level["size"] for level in quote["bids"] + quote["asks"]))
+
+
+@pytest.mark.asyncio
+async def test_simulated_data_source_needs_no_network(monkeypatch):
+    monkeypatch.setattr(client_settings, "market_data_source", "simulated")
+    monkeypatch.setattr(client_settings, "polymarket_api_base", "http://unreachable.invalid")
+
+    snapshot = await fetch_market_snapshot("sim-1")
+
+    assert snapshot["source"] == "simulated"
+    assert snapshot["best_bid"] < snapshot["mid_price"] < snapshot["best_ask"]
+    assert snapshot["liquidity"] > 0
+
+
+def test_fake_websocket_sends_books_then_changes():
+    app = create_fake_polymarket_app(FaultConfig(seed=3, step_seconds=0.001))
+    with TestClient(app) as client, client.websocket_connect("/ws/market") as ws:
+        ws.send_json({"assets_ids": ["a", "b"], "interval": 0.01})
+        first = [ws.receive_json() for _ in range(2)]
+        change = ws.receive_json()
+
+    assert [event["event_type"] for event in first] == ["book", "book"]
+    assert {event["asset_id"] for event in first} == {"a", "b"}
+    assert change["event_type"] == "price_change"
+    assert change["best_bid"] < change["price"] < change["best_ask"]
@@ -69,9 +69,10 @@ async def test_start_market_triggers_bot_loop(client, session, monkeypatch):
 
     captured = {"called": False}
 
-    async def fake_start(mid: int):
+    async def fake_start(mid: int, priority: int = 0):
         captured["called"] = True
         assert mid == market.id
+        assert priority == 0
 
     monkeypatch.setattr("routes.markets.bot_manager.start_market_loop", fake_start)
 
@@ -110,3 +111,131 @@ async def test_stop_market_triggers_bot_stop(client, monkeypatch):
     assert res.status_code == 200
     assert captured["called"]
 
+
+@pytest.mark.asyncio
+async def test_list_markets_etag_and_invalidation(client, session):
+    session.add(Market(name="A", external_id="a"))
+    await session.commit()
+
+    first = await client.get("/markets")
+    etag = first.headers["etag"]
+
+    cached = await client.get("/markets", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    # written behind the API's back: served from cache until the TTL runs out
+    session.add(Market(name="B", external_id="b"))
+    await session.commit()
+    assert (await client.get("/markets", headers={"If-None-Match": etag})).status_code == 304
+
+    created = await client.post(
+        "/markets", json={"name": "C", "external_id": "c", "base_spread_bps": 5, "enabled": True}
+    )
+    assert created.status_code == 200
+
+    fresh = await client.get("/markets", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert [m["external_id"] for m in fresh.json()] == ["a", "b", "c"]
+    assert fresh.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_list_markets_pagination_and_fields(client, session):
+    for idx in range(5):
+        session.add(Market(name=f"M{idx}", external_id=f"m{idx}"))
+    await session.commit()
+
+    page = await client.get("/markets", params={"limit": 2, "fields": "external_id,enabled"})
+    assert page.json() == [{"external_id": "m0", "enabled": True}, {"external_id": "m1", "enabled": True}]
+
+    after = page.headers["x-next-after-id"]
+    rest = await client.get("/markets", params={"limit": 3, "after_id": after, "fields": "name"})
+    assert [m["name"] for m in rest.json()] == ["M2", "M3", "M4"]
+
+    last = await client.get("/markets", params={"limit": 3, "after_id": rest.headers["x-next-after-id"]})
+    assert last.json() == []
+    assert "x-next-after-id" not in last.headers
+
+    assert (await client.get("/markets", params={"fields": "secret"})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_markets_is_idempotent_upsert(client, session):
+    session.add(Market(name="Old", external_id="b", base_spread_bps=10))
+    await session.commit()
+
+    items = [
+        {"name": "A", "external_id": "a", "base_spread_bps": 5},
+        {"name": "B", "external_id": "b", "base_spread_bps": 20},
+        {"name": "A2", "external_id": "a", "base_spread_bps": 7},
+    ]
+    first = await client.post("/markets/bulk", json={"markets": items})
+    assert first.status_code == 200
+    results = first.json()["results"]
+    assert [r["status"] for r in results] == ["duplicate", "updated", "created"]
+    assert results[0]["id"] == results[2]["id"]
+
+    again = await client.post("/markets/bulk", json={"markets": items})
+    assert [r["status"] for r in again.json()["results"]] == ["duplicate", "updated", "updated"]
+    assert [r["id"] for r in again.json()["results"]] == [r["id"] for r in results]
+
+    listed = {m["external_id"]: m for m in (await client.get("/markets")).json()}
+    assert len(listed) == 2
+    assert listed["a"]["name"] == "A2"
+    assert listed["b"]["base_spread_bps"] == 20
+
+
+@pytest.mark.asyncio
+async def test_bulk_start_and_stop_report_per_market_status(client, session, monkeypatch):
+    markets = [Market(name=f"M{idx}", external_id=f"m{idx}") for idx in range(3)]
+    session.add_all(markets)
+    await session.commit()
+    running = {markets[0].id}
+    priorities = {}
+
+    async def fake_start(mid: int, priority: int = 0):
+        running.add(mid)
+        priorities[mid] = priority
+
+    async def fake_stop(mid: int):
+        running.discard(mid)
+
+    monkeypatch.setattr("routes.markets.bot_manager.start_market_loop", fake_start)
+    monkeypatch.setattr("routes.markets.bot_manager.stop_market_loop", fake_stop)
+    monkeypatch.setattr("routes.markets.bot_manager.is_running", lambda mid: mid in running)
+
+    ids = [m.id for m in markets]
+    app.dependency_overrides[get_current_address] = lambda: "0xabc"
+    try:
+        started = await client.post("/markets/bulk/start", json={"market_ids": ids + [999, ids[1]], "priority": 2})
+        stopped = await client.post("/markets/bulk/stop", json={"market_ids": [ids[0], ids[0], 999]})
+    finally:
+        app.dependency_overrides.pop(get_current_address, None)
+
+    assert [(r["market_id"], r["status"]) for r in started.json()["results"]] == [
+        (ids[0], "already_running"),
+        (ids[1], "started"),
+        (ids[2], "started"),
+        (999, "not_found"),
+    ]
+    assert priorities == {mid: 2 for mid in ids}
+    assert stopped.json()["results"] == [
+        {"market_id": ids[0], "status": "stopped"},
+        {"market_id": 999, "status": "not_running"},
+    ]
+    assert running == {ids[1], ids[2]}
+
+
+@pytest.mark.asyncio
+async def test_bulk_start_requires_auth(client):
+    res = await client.post("/markets/bulk/start", json={"market_ids": [1]})
+    assert res.status_code == 401
+
+
+def test_list_markets_schema_allows_field_subsets():
+    schema = app.openapi()
+    listed = schema["paths"]["/markets"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+
+    assert listed["items"]["$ref"].endswith("/MarketFieldsOut")
+    assert "required" not in schema["components"]["schemas"]["MarketFieldsOut"]
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+from prometheus_client import CollectorRegistry, Counter
+
+from core.bot_manager import LoopStats
+from core.metrics import MarketSummaryCollector, MetricsPayloadCache, market_label, settings as metrics_settings
+
+
+def _stats(pnl: float) -> LoopStats:
+    return LoopStats(pnl=pnl, mid_price=0.5, last_tick_at=time.time())
+
+
+def _samples(collector):
+    return {
+        (sample.name, sample.labels.get("market_id"), sample.labels.get("le")): sample.value
+        for family in collector.collect()
+        for sample in family.samples
+    }
+
+
+def test_market_label_collapses_in_aggregated_mode(monkeypatch):
+    assert market_label(7) == "7"
+    monkeypatch.setattr(metrics_settings, "bot_metrics_mode", "aggregated")
+    assert market_label(7) == "all"
+
+
+def test_summary_collector_is_silent_in_per_market_mode():
+    collector = MarketSummaryCollector(lambda: {1: _stats(5.0)})
+    assert list(collector.collect()) == []
+
+
+def test_summary_collector_bounds_series_to_top_k(monkeypatch):
+    monkeypatch.setattr(metrics_settings, "bot_metrics_mode", "aggregated")
+    monkeypatch.setattr(metrics_settings, "bot_metrics_top_k", 2)
+    stats = {market_id: _stats(pnl) for market_id, pnl in enumerate([1.0, -50.0, 3.0, 20.0, 0.5])}
+
+    samples = _samples(MarketSummaryCollector(lambda: stats))
+
+    topk = {market_id for name, market_id, _ in samples if name == "bot_topk_market_pnl"}
+    assert topk == {"1", "3"}
+    assert samples[("bot_markets_tracked", None, None)] == 5
+    assert samples[("bot_other_market_pnl_gcount", None, None)] == 3
+    assert samples[("bot_other_market_pnl_gsum", None, None)] == pytest.approx(4.5)
+    assert samples[("bot_other_market_pnl_bucket", None, "1")] == 2
+
+
+@pytest.mark.asyncio
+async def test_metrics_cache_reuses_payload_within_ttl():
+    registry = CollectorRegistry()
+    counter = Counter("cache_probe", "probe", registry=registry)
+    cache = MetricsPayloadCache(ttl_seconds=60, registry=registry)
+
+    first = await cache.get()
+    counter.inc()
+    assert await cache.get() == first
+
+    cache.invalidate()
+    assert await cache.get() != first
+
+
+@pytest.mark.asyncio
+async def test_metrics_cache_renders_concurrent_scrapes_once(monkeypatch):
+    calls = []
+
+    def fake_generate(registry):
+        calls.append(registry)
+        return b"payload"
+
+    monkeypatch.setattr("core.metrics.generate_latest", fake_generate)
+    cache = MetricsPayloadCache(ttl_seconds=60)
+
+    results = await asyncio.gather(*(cache.get() for _ in range(5)))
+
+    assert results == [b"payload"] * 5
+    assert len(calls) == 1
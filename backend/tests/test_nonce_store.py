@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from nonce_store import MemoryNonceStore, SQLiteNonceStore, build_nonce_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryNonceStore(retention_seconds=10)
+    return SQLiteNonceStore(str(tmp_path / "nonces.sqlite"), retention_seconds=10)
+
+
+@pytest.mark.asyncio
+async def test_issue_get_and_consume(store):
+    await store.issue("0xa", "n1", now=100.0)
+
+    assert (await store.get("0xa", now=101.0)).nonce == "n1"
+    assert not await store.consume("0xa", "wrong", now=101.0)
+    assert await store.consume("0xa", "n1", now=101.0)
+    assert not await store.consume("0xa", "n1", now=101.0)
+    assert await store.get("0xa", now=101.0) is None
+
+
+@pytest.mark.asyncio
+async def test_reissue_replaces_previous_nonce(store):
+    await store.issue("0xa", "n1", now=100.0)
+    await store.issue("0xa", "n2", now=105.0)
+
+    assert not await store.consume("0xa", "n1", now=106.0)
+    assert (await store.get("0xa", now=112.0)).nonce == "n2"
+
+
+@pytest.mark.asyncio
+async def test_records_expire_after_retention(store):
+    await store.issue("0xa", "n1", now=100.0)
+
+    assert await store.get("0xa", now=109.5) is not None
+    assert await store.get("0xa", now=110.5) is None
+
+
+@pytest.mark.asyncio
+async def test_timer_wheel_purges_expired_records():
+    store = MemoryNonceStore(retention_seconds=5)
+    for idx in range(50):
+        await store.issue(f"0x{idx}", "n", now=100.0 + idx * 0.1)
+    await store.issue("0xlate", "n", now=103.0)
+    assert len(store) == 51
+
+    # the record due at exactly 106.0 waits for the second to elapse
+    await store.get("0xlate", now=106.0)
+    assert len(store) == 41
+    await store.get("0xlate", now=107.0)
+    assert len(store) == 31
+
+    # an idle gap longer than the wheel still clears everything due
+    await store.get("0xnone", now=1000.0)
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_timer_wheel_keeps_records_due_later_in_the_current_second():
+    store = MemoryNonceStore(retention_seconds=5)
+    await store.issue("0xa", "n", now=100.5)  # due at 105.5
+
+    assert await store.get("0xa", now=105.2) is not None
+    await store.get("0xother", now=106.0)
+    assert len(store) == 0
+
+
+def test_memory_store_is_refused_with_several_workers(tmp_path):
+    with pytest.raises(RuntimeError):
+        build_nonce_store("memory", str(tmp_path / "nonces.sqlite"), 10, workers=4)
+
+    assert isinstance(build_nonce_store("memory", str(tmp_path / "nonces.sqlite"), 10), MemoryNonceStore)
+    assert isinstance(build_nonce_store("sqlite", str(tmp_path / "nonces.sqlite"), 10, workers=4), SQLiteNonceStore)
+
+
+def test_importing_the_app_opens_no_nonce_database(tmp_path):
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, AUTH_NONCE_STORE="sqlite", PYTHONPATH=backend)
+    subprocess.run([sys.executable, "-c", "import main"], cwd=tmp_path, env=env, check=True)
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,108 @@
+import pytest
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+
+from core.exchange import BUY, SELL, OrderRequest
+from core.order_signing import (
+    DEFAULT_EXCHANGE_ADDRESS,
+    SIGNING_QUEUE_DEPTH,
+    OrderSigner,
+    order_from_request,
+    sign_orders,
+)
+
+
+TEST_KEY = "0x" + "11" * 32
+TEST_ADDRESS = Account.from_key(TEST_KEY).address
+
+
+def _reference_signature(order) -> str:
+    typed = {
+        "types": {
+            "EIP712Domain": [
+                {"name": "name", "type": "string"},
+                {"name": "version", "type": "string"},
+                {"name": "chainId", "type": "uint256"},
+                {"name": "verifyingContract", "type": "address"},
+            ],
+            "Order": [
+                {"name": "salt", "type": "uint256"},
+                {"name": "maker", "type": "address"},
+                {"name": "signer", "type": "address"},
+                {"name": "taker", "type": "address"},
+                {"name": "tokenId", "type": "uint256"},
+                {"name": "makerAmount", "type": "uint256"},
+                {"name": "takerAmount", "type": "uint256"},
+                {"name": "expiration", "type": "uint256"},
+                {"name": "nonce", "type": "uint256"},
+                {"name": "feeRateBps", "type": "uint256"},
+                {"name": "side", "type": "uint8"},
+                {"name": "signatureType", "type": "uint8"},
+            ],
+        },
+        "primaryType": "Order",
+        "domain": {
+            "name": "Polymarket CTF Exchange",
+            "version": "1",
+            "chainId": 137,
+            "verifyingContract": DEFAULT_EXCHANGE_ADDRESS,
+        },
+        "message": dict(
+            zip(
+                ["salt", "maker", "signer", "taker", "tokenId", "makerAmount", "takerAmount",
+                 "expiration", "nonce", "feeRateBps", "side", "signatureType"],
+                order,
+            )
+        ),
+    }
+    return "0x" + Account.sign_message(encode_typed_data(full_message=typed), TEST_KEY).signature.hex().removeprefix("0x")
+
+
+def test_order_amounts_follow_side():
+    buy = order_from_request(OrderRequest(1, BUY, 0.42, 100), token_id=7, maker=TEST_ADDRESS, salt=1)
+    sell = order_from_request(OrderRequest(1, SELL, 0.42, 100), token_id=7, maker=TEST_ADDRESS, salt=1)
+
+    assert (buy.maker_amount, buy.taker_amount, buy.side) == (42_000_000, 100_000_000, 0)
+    assert (sell.maker_amount, sell.taker_amount, sell.side) == (100_000_000, 42_000_000, 1)
+
+
+def test_signatures_match_eth_account_typed_data():
+    signer = OrderSigner(TEST_KEY, executor="thread")
+    orders = [
+        order_from_request(OrderRequest(1, side, 0.5 + i / 100, 10 + i), token_id=123, maker=TEST_ADDRESS, salt=i)
+        for i, side in enumerate([BUY, SELL, BUY])
+    ]
+
+    signatures = sign_orders(signer.signing_key, orders)
+
+    assert signer.address == TEST_ADDRESS
+    assert signatures == [_reference_signature(order) for order in orders]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor", ["thread", "process"])
+async def test_sign_many_batches_across_workers_in_order(executor):
+    signer = OrderSigner(TEST_KEY, workers=2, batch_size=3, executor=executor)
+    orders = [
+        order_from_request(OrderRequest(1, BUY, 0.5, 10), token_id=1, maker=TEST_ADDRESS, salt=salt)
+        for salt in range(8)
+    ]
+    try:
+        await signer.warm_up()
+        signed = await signer.sign_many(orders)
+        single = await signer.sign(orders[5])
+    finally:
+        signer.close()
+
+    assert [item.order for item in signed] == orders
+    assert [item.signature for item in signed] == sign_orders(signer.signing_key, orders)
+    assert single == signed[5]
+    assert SIGNING_QUEUE_DEPTH._value.get() == 0
+
+
+def test_signing_key_repr_hides_the_private_key():
+    signer = OrderSigner(TEST_KEY, executor="thread")
+
+    assert TEST_KEY.removeprefix("0x") not in repr(signer.signing_key)
+    assert TEST_KEY.removeprefix("0x") not in str(signer.signing_key)
+    assert "chain_id=137" in repr(signer.signing_key)
@@ -0,0 +1,100 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+from models import Market, PnLTicks
+from routes.pnl import export_pnl, settings as pnl_settings
+
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest_asyncio.fixture
+async def seeded(session, session_factory, monkeypatch):
+    monkeypatch.setattr("routes.pnl.ReadSessionLocal", session_factory)
+    monkeypatch.setattr(pnl_settings, "pnl_export_chunk_size", 2)
+    markets = [Market(name=f"Export {i}", external_id=f"export-{i}") for i in range(2)]
+    session.add_all(markets)
+    await session.commit()
+    session.add_all(
+        PnLTicks(market_id=market.id, ts=T0 + timedelta(seconds=offset), pnl=offset / 10, inventory=1)
+        for offset in range(5)
+        for market in markets
+    )
+    await session.commit()
+    return [market.id for market in markets]
+
+
+@pytest.mark.asyncio
+async def test_export_csv_streams_all_rows_in_ts_order(client, seeded):
+    res = await client.get("/pnl/export")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert len(rows) == 10
+    assert rows[0] == {"market_id": str(seeded[0]), "ts": "2026-01-01T12:00:00+00:00", "pnl": "0.0", "inventory": "1.0"}
+    assert [row["ts"] for row in rows] == sorted(row["ts"] for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_filters_by_market_and_range(client, seeded):
+    params = {
+        "market_ids": str(seeded[1]),
+        "from": (T0 + timedelta(seconds=1)).isoformat(),
+        "to": (T0 + timedelta(seconds=4)).isoformat(),
+        "format": "ndjson",
+    }
+    res = await client.get("/pnl/export", params=params)
+
+    assert res.status_code == 200
+    lines = [json.loads(line) for line in res.text.splitlines()]
+    assert [(line["market_id"], line["pnl"]) for line in lines] == [(seeded[1], 0.1), (seeded[1], 0.2), (seeded[1], 0.3)]
+
+
+@pytest.mark.asyncio
+async def test_export_rejects_bad_parameters(client, seeded):
+    assert (await client.get("/pnl/export", params={"market_ids": "1,x"})).status_code == 422
+    assert (await client.get("/pnl/export", params={"format": "parquet"})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_export_arrow_round_trips(client, seeded):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc  # noqa: F401
+
+    res = await client.get("/pnl/export", params={"format": "arrow"})
+
+    assert res.status_code == 200
+    table = pa.ipc.open_stream(res.content).read_all()
+    assert table.num_rows == 10
+    assert table.column_names == ["market_id", "ts", "pnl", "inventory"]
+
+
+@pytest.mark.asyncio
+async def test_export_slot_is_taken_by_the_handler_and_released_by_the_stream(client, seeded, monkeypatch):
+    slots = asyncio.Semaphore(1)
+    monkeypatch.setattr("routes.pnl.export_slots", slots)
+
+    response = await export_pnl(market_ids=None, start=None, end=None, format="csv")
+    assert slots.locked()
+    assert (await client.get("/pnl/export")).status_code == 429
+
+    sent = []
+
+    async def receive():
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await response({"type": "http"}, receive, send)
+    assert sent[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+    assert not slots.locked()
+    assert (await client.get("/pnl/export")).status_code == 200
+    assert not slots.locked()
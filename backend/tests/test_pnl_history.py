@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import Market, PnLTicks
+from routes.pnl import settings as pnl_settings, step_series
+
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+async def _seed_ticks(session, *ticks):
+    market = Market(name="History", external_id="history")
+    session.add(market)
+    await session.commit()
+    session.add_all(
+        PnLTicks(market_id=market.id, ts=T0 + timedelta(seconds=offset), pnl=pnl, inventory=0)
+        for offset, pnl in ticks
+    )
+    await session.commit()
+    return market.id
+
+
+def test_step_series_carries_last_value_forward():
+    utc = T0.replace(tzinfo=timezone.utc)
+    points = [(utc - timedelta(seconds=5), 1.0, 0.0), (utc + timedelta(seconds=25), 2.0, 0.0)]
+
+    samples = step_series(points, utc, utc + timedelta(seconds=40), 10)
+
+    assert [pnl for _, pnl, _ in samples] == [1.0, 1.0, 1.0, 2.0, 2.0]
+    assert step_series(points[1:], utc, utc + timedelta(seconds=40), 10)[0][0] == utc + timedelta(seconds=30)
+
+
+@pytest.mark.asyncio
+async def test_history_returns_change_points_with_carried_in_value(client, session):
+    market_id = await _seed_ticks(session, (-30, 1.0), (10, 1.5), (50, 3.0), (120, 4.0))
+
+    res = await client.get(
+        f"/pnl/{market_id}/history",
+        params={"start": T0.isoformat(), "end": (T0 + timedelta(seconds=60)).isoformat()},
+    )
+
+    assert res.status_code == 200
+    body = res.json()
+    assert [(p["ts"], p["pnl"]) for p in body["points"]] == [
+        ("2026-01-01T12:00:00+00:00", 1.0),
+        ("2026-01-01T12:00:10+00:00", 1.5),
+        ("2026-01-01T12:00:50+00:00", 3.0),
+    ]
+    assert body["truncated"] is False
+
+
+@pytest.mark.asyncio
+async def test_history_resamples_on_step_grid(client, session, monkeypatch):
+    market_id = await _seed_ticks(session, (-30, 1.0), (10, 1.5), (50, 3.0))
+    params = {"start": T0.isoformat(), "end": (T0 + timedelta(seconds=60)).isoformat(), "step": 20}
+
+    res = await client.get(f"/pnl/{market_id}/history", params=params)
+
+    assert res.status_code == 200
+    assert [p["pnl"] for p in res.json()["points"]] == [1.0, 1.5, 1.5, 3.0]
+
+    monkeypatch.setattr(pnl_settings, "pnl_history_max_points", 2)
+    res = await client.get(f"/pnl/{market_id}/history", params=params)
+    assert res.status_code == 422
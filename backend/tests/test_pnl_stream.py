@@ -0,0 +1,242 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from core.pnl_feed import PnLFeed, pnl_feed
+from core.pnl_protocol import FRAME_DELTA, FRAME_SNAPSHOT, DeltaEncoder, decode_binary, encode_binary
+from main import app
+from models import Market, PnLTicks
+from routes.pnl import pnl_event_stream
+
+
+@pytest.fixture
+def live_feed():
+    pnl_feed.reset()
+    pnl_feed._seeded = True
+    yield pnl_feed
+    pnl_feed.reset()
+
+
+def test_encoder_sends_snapshot_then_only_changed_deltas():
+    encoder = DeltaEncoder(quantum=0.01, full_every=100, market_ids=[1, 2])
+    latest = {1: (1.0, 0.0), 2: (2.0, 5.0), 3: (9.0, 9.0)}
+
+    assert encoder.next_frame(latest) == (FRAME_SNAPSHOT, 1, [(1, 100, 0), (2, 200, 500)])
+    assert encoder.next_frame(latest) is None
+
+    latest[1] = (1.004, 0.0)  # below one quantum
+    latest[2] = (1.5, 5.0)
+    assert encoder.next_frame(latest) == (FRAME_DELTA, 2, [(2, -50, 0)])
+
+
+def test_encoder_periodic_full_snapshot_and_resync():
+    encoder = DeltaEncoder(quantum=1, full_every=2, market_ids=[1])
+    latest = {1: (1.0, 0.0)}
+
+    assert encoder.next_frame(latest)[0] == FRAME_SNAPSHOT
+    assert encoder.next_frame(latest) is None
+    assert encoder.next_frame(latest) is None
+    assert encoder.next_frame(latest)[0] == FRAME_SNAPSHOT
+
+    encoder.resync()
+    assert encoder.next_frame(latest)[0] == FRAME_SNAPSHOT
+
+    encoder.unsubscribe([1])
+    assert encoder.next_frame(latest) is None
+
+
+def test_binary_frames_round_trip():
+    entries = [(3, -12345, 0), (40, 7, -1), (1_000_000, 2**40, -(2**40))]
+
+    decoded = decode_binary(encode_binary(FRAME_DELTA, 99, entries))
+
+    assert decoded == {"type": "pnl_delta", "seq": 99, "m": [list(e) for e in entries]}
+    assert len(encode_binary(FRAME_DELTA, 1, [(1, 1, 0)])) == 7
+
+
+def test_ws_v2_streams_subscribed_markets(live_feed):
+    live_feed.publish(1, 1.5, 0.0)
+    live_feed.publish(2, -0.25, 3.0)
+
+    with TestClient(app).websocket_connect("/ws/pnl?v=2&interval=0.05&quantum=0.01&markets=1") as ws:
+        welcome = ws.receive_json()
+        assert welcome["version"] == 2
+        assert welcome["market_ids"] == [1]
+
+        assert json.loads(ws.receive_text()) == {"type": "pnl_snapshot", "seq": 1, "m": [[1, 150, 0]]}
+
+        live_feed.publish(1, 1.75, 0.0)
+        assert json.loads(ws.receive_text()) == {"type": "pnl_delta", "seq": 2, "m": [[1, 25, 0]]}
+
+        ws.send_json({"type": "subscribe", "market_ids": [2]})
+        assert json.loads(ws.receive_text()) == {
+            "type": "pnl_snapshot",
+            "seq": 3,
+            "m": [[1, 175, 0], [2, -25, 300]],
+        }
+
+
+def test_ws_v2_binary_encoding(live_feed):
+    live_feed.publish(5, 0.5, 1.0)
+
+    with TestClient(app).websocket_connect("/ws/pnl?v=2&encoding=binary&interval=0.05&markets=5") as ws:
+        assert ws.receive_json()["encoding"] == "binary"
+        frame = decode_binary(ws.receive_bytes())
+
+    assert frame == {"type": "pnl_snapshot", "seq": 1, "m": [[5, 500000, 1000000]]}
+
+
+def test_feed_ring_buffer_resumes_or_asks_for_snapshot():
+    feed = PnLFeed(buffer_size=3)
+    for pnl in range(5):
+        feed.publish(1, float(pnl), 0.0)
+
+    assert [u.seq for u in feed.updates_since(3)] == [4, 5]
+    assert feed.updates_since(5) == []
+    assert feed.updates_since(1) is None  # seq 2 already dropped
+    assert feed.updates_since(99) is None
+    assert feed.snapshot() == [{"market_id": 1, "pnl": 4.0, "inventory": 0.0}]
+
+
+@pytest.mark.asyncio
+async def test_long_poll_waits_for_next_tick(client, live_feed):
+    live_feed.publish(1, 1.0, 0.0)
+
+    first = (await client.get("/pnl/updates")).json()
+    assert first["reset"] is True
+    assert first["snapshot"] == [{"market_id": 1, "pnl": 1.0, "inventory": 0.0}]
+
+    poll = asyncio.create_task(client.get("/pnl/updates", params={"since": first["seq"], "timeout": 5}))
+    await asyncio.sleep(0.05)
+    assert not poll.done()
+    live_feed.publish(2, -1.0, 0.0)
+    live_feed.publish(1, 2.0, 0.0)
+    body = (await poll).json()
+
+    assert body["reset"] is False
+    assert body["seq"] == live_feed.cursor(3)
+    assert [(t["seq"], t["market_id"]) for t in body["ticks"]] == [(2, 2), (3, 1)]
+
+    filtered = (await client.get("/pnl/updates", params={"since": live_feed.cursor(1), "markets": "1", "timeout": 0})).json()
+    assert [t["seq"] for t in filtered["ticks"]] == [3]
+    empty = (await client.get("/pnl/updates", params={"since": live_feed.cursor(3), "timeout": 0})).json()
+    assert empty == {"seq": live_feed.cursor(3), "reset": False, "ticks": []}
+
+
+@pytest.mark.asyncio
+async def test_cursors_from_another_process_get_a_snapshot(client, live_feed):
+    live_feed.publish(1, 1.0, 0.0)
+    live_feed.publish(1, 2.0, 0.0)
+    stale = live_feed.cursor(1)
+    live_feed.reset()
+    live_feed.publish(1, 5.0, 0.0)
+    live_feed.publish(1, 6.0, 0.0)
+
+    body = (await client.get("/pnl/updates", params={"since": stale, "timeout": 0})).json()
+    assert body["reset"] is True
+    assert body["seq"] == live_feed.cursor(2)
+    assert body["snapshot"] == [{"market_id": 1, "pnl": 6.0, "inventory": 0.0}]
+    assert (await client.get("/pnl/updates", params={"since": "garbage", "timeout": 0})).json()["reset"] is True
+
+
+@pytest.mark.asyncio
+async def test_bad_market_filter_is_rejected(client, live_feed):
+    assert (await client.get("/pnl/updates", params={"markets": "1,x", "timeout": 0})).status_code == 422
+    assert (await client.get("/pnl/stream", params={"markets": "1,x"})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_resumes_from_last_event_id(live_feed):
+    for pnl in (1.0, 2.0, 3.0):
+        live_feed.publish(7, pnl, 0.0)
+
+    async def connected():
+        return False
+
+    events = pnl_event_stream(live_feed, live_feed.cursor(1), [7], 0.05, connected)
+    assert (await events.__anext__()).startswith("retry:")
+    replayed = [await events.__anext__() for _ in range(2)]
+    assert [e.splitlines()[0] for e in replayed] == [f"id: {live_feed.cursor(seq)}" for seq in (2, 3)]
+    assert json.loads(replayed[1].splitlines()[2][len("data: "):])["pnl"] == 3.0
+
+    assert await events.__anext__() == ": keepalive\n\n"
+    live_feed.publish(7, 4.0, 0.0)
+    assert (await events.__anext__()).splitlines()[:2] == [f"id: {live_feed.cursor(4)}", "event: pnl_tick"]
+    await events.aclose()
+
+    fresh = pnl_event_stream(live_feed, None, [], 0.05, connected)
+    await fresh.__anext__()
+    snapshot = (await fresh.__anext__()).splitlines()
+    assert snapshot[:2] == [f"id: {live_feed.cursor(4)}", "event: pnl_snapshot"]
+    await fresh.aclose()
+
+
+def test_ws_v2_ignores_malformed_commands(live_feed):
+    live_feed.publish(1, 1.0, 0.0)
+
+    with TestClient(app).websocket_connect("/ws/pnl?v=2&interval=0.05&quantum=0.01") as ws:
+        ws.receive_json()
+        ws.send_text("{not json")
+        ws.send_json({"type": "subscribe", "market_ids": ["x"]})
+        ws.send_json({"type": "subscribe", "market_ids": 7})
+        ws.send_json(["subscribe"])
+        ws.send_bytes(b"\xff")
+        ws.send_json({"type": "subscribe", "market_ids": [1]})
+
+        frame = json.loads(ws.receive_text())
+        if not frame["m"]:  # the empty snapshot sent before the subscribe landed
+            frame = json.loads(ws.receive_text())
+        assert frame["type"] == "pnl_snapshot" and frame["m"] == [[1, 100, 0]]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "interval=nan",
+        "interval=inf",
+        "quantum=nan",
+        "quantum=inf",
+        "quantum=0",
+        "full_every=0",
+        "full_every=-3",
+        "full_every=1000000",
+        "encoding=xml",
+        "markets=1,x",
+    ],
+)
+def test_ws_v2_rejects_bad_parameters(live_feed, query):
+    with TestClient(app).websocket_connect(f"/ws/pnl?v=2&{query}") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+
+    assert closed.value.code == 1008
+
+
+@pytest.mark.asyncio
+async def test_poll_picks_up_markets_running_in_other_workers(session, session_factory):
+    markets = [Market(name=f"Feed {i}", external_id=f"feed-{i}") for i in range(2)]
+    session.add_all(markets)
+    await session.commit()
+    ours, theirs = (market.id for market in markets)
+    session.add_all(PnLTicks(market_id=mid, ts=datetime(2026, 1, 1), pnl=1.0, inventory=0) for mid in (ours, theirs))
+    await session.commit()
+
+    feed = PnLFeed()
+    assert await feed.poll(session_factory, owned={ours}) == 0  # seeded, nothing new yet
+    feed.publish(ours, 5.0, 1.0)
+
+    session.add_all(
+        PnLTicks(market_id=mid, ts=datetime(2026, 1, 1, 0, 0, 1), pnl=pnl, inventory=0)
+        for mid, pnl in ((ours, 4.0), (theirs, 2.0), (theirs, 3.0))
+    )
+    await session.commit()
+    assert await feed.poll(session_factory, owned={ours}) == 1
+
+    assert feed.latest[theirs] == (3.0, 0.0)
+    assert feed.latest[ours] == (5.0, 1.0)
+    assert [(u.market_id, u.pnl) for u in feed.updates_since(1)] == [(theirs, 3.0)]
+    assert await feed.poll(session_factory, owned={ours}) == 0
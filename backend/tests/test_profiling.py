@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from auth_utils import create_jwt
+from core.loop_monitor import LoopLagMonitor
+from core.profiling import SamplingProfiler, dump_task_stacks
+from routes.auth import settings as auth_settings
+
+
+def _busy_wait(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampling_profiler_emits_collapsed_stacks():
+    profiler = SamplingProfiler()
+    worker = threading.Thread(target=_busy_wait, args=(0.2,), name="busy")
+    worker.start()
+
+    assert profiler.start(duration_seconds=0.1, interval_seconds=0.001)
+    assert not profiler.start(duration_seconds=0.1)
+    worker.join()
+    profiler.stop()
+
+    output = profiler.collapsed()
+    busy_lines = [line for line in output.splitlines() if line.startswith("thread:busy;")]
+    assert busy_lines
+    stack, count = busy_lines[0].rsplit(" ", 1)
+    assert "_busy_wait" in stack
+    assert int(count) > 0
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_detects_blocked_loop():
+    monitor = LoopLagMonitor(interval_seconds=0.01)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    _busy_wait(0.1)
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+
+    assert monitor.samples > 0
+    assert monitor.max_lag >= 0.05
+    assert not monitor.snapshot()["running"]
+
+
+@pytest.mark.asyncio
+async def test_dump_task_stacks_labels_tasks():
+    async def parked():
+        await asyncio.Event().wait()
+
+    task = asyncio.create_task(parked())
+    await asyncio.sleep(0)
+    try:
+        dumped = dump_task_stacks({task: "market:9"})
+    finally:
+        task.cancel()
+
+    entry = next(item for item in dumped if item["label"] == "market:9")
+    assert entry["coro"].endswith("parked")
+    assert entry["stack"]
+
+
+@pytest.mark.asyncio
+async def test_profiling_endpoints_require_auth(client):
+    assert (await client.post("/debug/profile/start")).status_code == 401
+    assert (await client.get("/debug/tasks")).status_code == 401
+    assert (await client.get("/debug/loop-lag")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_profiling_endpoints_restricted_to_admins(client, monkeypatch):
+    monkeypatch.setattr(auth_settings, "admin_addresses", ["0xadmin"])
+    headers = {"Authorization": f"Bearer {create_jwt('0xsomeone')}"}
+
+    res = await client.get("/debug/tasks", headers=headers)
+
+    assert res.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_debug_endpoints_closed_without_configured_admins(client, monkeypatch):
+    monkeypatch.setattr(auth_settings, "admin_addresses", [])
+    headers = {"Authorization": f"Bearer {create_jwt('0xadmin')}"}
+
+    for path in ("/debug/tasks", "/debug/loop-lag", "/debug/loops", "/debug/profile"):
+        assert (await client.get(path, headers=headers)).status_code == 403
+    assert (await client.get("/debug/loops")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_profile_round_trip(client, monkeypatch):
+    monkeypatch.setattr(auth_settings, "admin_addresses", ["0xadmin"])
+    monkeypatch.setattr("routes.debug.profiler", SamplingProfiler())
+    headers = {"Authorization": f"Bearer {create_jwt('0xadmin')}"}
+
+    started = await client.post("/debug/profile/start?seconds=5&interval_ms=1", headers=headers)
+    assert started.status_code == 200
+    assert (await client.post("/debug/profile/start", headers=headers)).status_code == 409
+    await asyncio.sleep(0.05)
+
+    stopped = await client.post("/debug/profile/stop", headers=headers)
+    assert stopped.status_code == 200
+    assert stopped.headers["content-type"].startswith("text/plain")
+    assert stopped.text.strip()
+
+    tasks = await client.get("/debug/tasks", headers=headers)
+    assert tasks.status_code == 200
+    assert tasks.json()["tasks"]
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from core.exchange import BUY, SELL, OrderRequest, SimulatedExchange
+from core.order_signing import OrderSigner
+from core.quoting import OrderBatcher, QuotingEngine, RestingQuote, compute_quotes, diff_quotes
+
+
+def test_quotes_straddle_mid_and_skew_against_inventory():
+    flat = compute_quotes(0.5, 0.0, spread_bps=100, size=10, inventory_cap=100)
+    assert (flat[BUY].price, flat[SELL].price) == (0.497, 0.503)
+    assert flat[BUY].size == flat[SELL].size == 10
+
+    long = compute_quotes(0.5, 50.0, spread_bps=100, size=10, inventory_cap=100)
+    assert long[BUY].price < flat[BUY].price and long[SELL].price < flat[SELL].price
+    assert long[BUY].size == 5 and long[SELL].size == 10
+
+    at_cap = compute_quotes(0.5, 100.0, spread_bps=100, size=10, inventory_cap=100)
+    assert BUY not in at_cap and at_cap[SELL].size == 10
+
+
+def test_diff_only_touches_changed_sides():
+    desired = compute_quotes(0.5, 0.0, spread_bps=100, size=10, inventory_cap=100)
+    resting = {side: RestingQuote(f"id-{side}", quote.price, quote.size) for side, quote in desired.items()}
+
+    assert diff_quotes(1, resting, desired) == ([], [])
+
+    moved = dict(desired, buy=desired[BUY]._replace(price=0.496))
+    assert diff_quotes(1, resting, moved) == ([OrderRequest(1, BUY, 0.496, 10)], ["id-buy"])
+
+    partly_filled = dict(resting, sell=resting[SELL]._replace(size=2))
+    places, cancels = diff_quotes(1, partly_filled, desired)
+    assert cancels == ["id-sell"] and [order.side for order in places] == [SELL]
+
+
+@pytest.mark.asyncio
+async def test_simulated_exchange_matches_in_price_time_priority():
+    exchange = SimulatedExchange()
+    first, second, better = await exchange.place_orders(
+        [OrderRequest(1, SELL, 0.52, 5), OrderRequest(1, SELL, 0.52, 5), OrderRequest(1, SELL, 0.51, 5)]
+    )
+
+    exchange.submit_taker(OrderRequest(1, BUY, 0.52, 8))
+
+    fills = await exchange.fetch_fills(1)
+    assert [(fill.order_id, fill.price, fill.size) for fill in fills] == [(better, 0.51, 5), (first, 0.52, 3)]
+    assert exchange.orders[first].remaining == 2 and second in exchange.orders
+
+    await exchange.cancel_orders([first, second])
+    await exchange.observe_mid(1, 0.60)
+    assert await exchange.fetch_fills(1) == [] and exchange.books[1].best(SELL) is None
+
+
+@pytest.mark.asyncio
+async def test_batcher_coalesces_concurrent_submits():
+    exchange = SimulatedExchange()
+    batcher = OrderBatcher(exchange, batch_size=100, max_delay=0.001)
+
+    results = await asyncio.gather(
+        *(batcher.submit([OrderRequest(mid, BUY, 0.4, 1), OrderRequest(mid, SELL, 0.6, 1)], []) for mid in range(20))
+    )
+    await batcher.stop()
+
+    assert exchange.calls == 1
+    assert all(len(ids) == 2 for ids in results)
+    assert len({order_id for ids in results for order_id in ids}) == 40
+
+
+@pytest.mark.asyncio
+async def test_requote_sends_nothing_when_quotes_are_unchanged():
+    exchange = SimulatedExchange()
+    engine = QuotingEngine(exchange, quote_size=10, inventory_cap=100, max_delay=0)
+
+    assert await engine.requote(1, 0.5, 0.0, 100) == (2, 0)
+    assert await engine.requote(1, 0.5, 0.0, 100) == (0, 0)
+    assert await engine.requote(1, 0.51, 0.0, 100) == (2, 2)
+    await engine.close()
+
+    assert exchange.orders == {}
+
+
+@pytest.mark.asyncio
+async def test_cancel_market_takes_down_orders_placed_after_the_loop_was_cancelled():
+    exchange = SimulatedExchange()
+    engine = QuotingEngine(exchange, quote_size=10, inventory_cap=100, max_delay=0.01)
+
+    loop = asyncio.create_task(engine.requote(1, 0.5, 0.0, 100))
+    await asyncio.sleep(0)
+    loop.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await loop
+    await engine.cancel_market(1)
+
+    assert exchange.calls == 2 and exchange.orders == {}
+    assert engine.resting == {} and engine.inflight == {}
+    await engine.close()
+
+
+@pytest.mark.asyncio
+async def test_batcher_signs_placements_with_the_order_signer():
+    exchange = SimulatedExchange()
+    signer = OrderSigner("0x" + "11" * 32, executor="thread")
+    engine = QuotingEngine(exchange, quote_size=10, inventory_cap=100, max_delay=0, signer=signer)
+
+    await engine.requote(1, 0.5, 0.0, 100)
+    order_ids = [quote.order_id for quote in engine.resting[1].values()]
+    signatures = dict(exchange.signatures)
+    await engine.close()
+
+    assert sorted(signatures) == sorted(order_ids)
+    assert all(sig.startswith("0x") and len(sig) == 132 for sig in signatures.values())
+    assert signer._executor is None
@@ -0,0 +1,78 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from rate_limit import GcraRateLimiter, MemoryRateLimitBackend, SQLiteRateLimitBackend
+
+
+@pytest.mark.asyncio
+async def test_gcra_allows_burst_then_one_per_emission_interval():
+    limiter = GcraRateLimiter(max_requests=5, window_seconds=10)
+
+    assert [await limiter.allow("ip", now=100.0) for _ in range(5)] == [True] * 5
+    assert not await limiter.allow("ip", now=100.0)
+    assert not await limiter.allow("ip", now=101.9)
+    assert await limiter.allow("ip", now=102.0)
+    assert not await limiter.allow("ip", now=102.0)
+    assert await limiter.allow("other", now=102.0)
+
+
+@pytest.mark.asyncio
+async def test_gcra_disabled_when_max_requests_is_zero():
+    limiter = GcraRateLimiter(max_requests=0, window_seconds=10)
+    assert all([await limiter.allow("ip", now=0.0) for _ in range(100)])
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_idle_keys():
+    backend = MemoryRateLimitBackend(sweep_interval_seconds=5)
+    limiter = GcraRateLimiter(max_requests=2, window_seconds=2, backend=backend)
+
+    for idx in range(100):
+        await limiter.allow(f"ip-{idx}", now=0.0)
+    assert len(backend) == 100
+
+    await limiter.allow("late", now=10.0)
+    assert len(backend) == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_shares_limit_across_instances(tmp_path):
+    path = str(tmp_path / "limits.sqlite")
+    worker_a = GcraRateLimiter(3, 60, SQLiteRateLimitBackend(path))
+    worker_b = GcraRateLimiter(3, 60, SQLiteRateLimitBackend(path))
+
+    assert await worker_a.allow("ip", now=0.0)
+    assert await worker_b.allow("ip", now=0.0)
+    assert await worker_a.allow("ip", now=0.0)
+    assert not await worker_b.allow("ip", now=0.0)
+
+    assert worker_b.backend.evict_idle(now=1000.0) == 1
+    assert await worker_a.allow("ip", now=1000.0)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_waits_for_a_locked_file_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "limits.sqlite")
+    backend = SQLiteRateLimitBackend(path, busy_timeout_ms=300)
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        # the lock is never released, so this fails open after the busy timeout
+        assert await GcraRateLimiter(1, 60, backend).allow("ip", now=0.0)
+    finally:
+        task.cancel()
+        holder.execute("ROLLBACK")
+        holder.close()
+
+    assert ticks >= 10
@@ -0,0 +1,80 @@
+import random
+
+import numpy as np
+import pytest
+
+from core.risk import RiskEngine, risk_monitor
+
+
+def _feed(engine, steps, moves, positions, seed=0):
+    rng = random.Random(seed)
+    prices = {mid: 0.5 for mid in positions}
+    snapshot = engine.update(prices, positions)
+    for _ in range(steps):
+        shock = rng.gauss(0, 0.01)
+        prices = {mid: price + moves(mid, shock, rng) for mid, price in prices.items()}
+        snapshot = engine.update(prices, positions)
+    return snapshot
+
+
+def test_hedged_book_has_less_var_than_correlated_one():
+    def together(mid, shock, rng):
+        return shock + rng.gauss(0, 0.001)
+
+    correlated = _feed(RiskEngine(halflife=30), 200, together, {1: 100.0, 2: 100.0})
+    hedged = _feed(RiskEngine(halflife=30), 200, together, {1: 100.0, 2: -100.0})
+
+    assert hedged.var_parametric < correlated.var_parametric / 5
+    assert correlated.gross_exposure == pytest.approx(hedged.gross_exposure)
+    assert abs(hedged.net_exposure) < hedged.gross_exposure / 10
+    assert correlated.var_historical is not None and correlated.var_historical > 0
+
+
+def test_parametric_var_matches_direct_ew_covariance():
+    engine = RiskEngine(window=64, halflife=10, confidence=0.95)
+    rng = np.random.default_rng(7)
+    positions = {1: 50.0, 2: -20.0, 3: 10.0}
+    prices = np.full(3, 0.5)
+    engine.update(dict(zip(positions, prices)), positions)
+    moves = rng.normal(0, 0.01, size=(40, 3))
+    moves[::3, 1] = 0.0  # quiet ticks go through the sparse update
+    for move in moves:
+        prices = prices + move
+        snapshot = engine.update(dict(zip(positions, prices)), positions)
+
+    weights = engine.lam ** np.arange(len(moves) - 1, -1, -1)
+    cov = (1 - engine.lam) * (moves.T * weights) @ moves
+    x = np.array(list(positions.values()))
+    assert snapshot.var_parametric == pytest.approx(engine.z * np.sqrt(x @ cov @ x))
+    assert sum(component for *_, component in snapshot.contributions) == pytest.approx(snapshot.var_parametric)
+
+
+def test_markets_that_drop_out_free_their_slot():
+    engine = RiskEngine(capacity=2)
+    engine.update({1: 0.5, 2: 0.5}, {1: 10.0, 2: 10.0})
+    engine.update({1: 0.6, 2: 0.4}, {1: 10.0, 2: 10.0})
+    engine.update({1: 0.6, 3: 0.5}, {1: 10.0, 3: 10.0})
+
+    assert engine.capacity == 2
+    assert engine.slots[3] == 1
+    assert engine.cov[1, 1] == 0.0 and engine.cov[0, 0] > 0
+
+    engine.update({1: 0.6, 3: 0.5, 4: 0.5}, {1: 10.0, 3: 10.0, 4: 10.0})
+    assert engine.capacity == 4 and engine.slots[4] == 2
+
+
+@pytest.mark.asyncio
+async def test_risk_endpoint_serves_latest_snapshot(client):
+    risk_monitor.reset()
+    try:
+        assert (await client.get("/risk")).status_code == 503
+
+        risk_monitor.refresh(lambda: ({1: 0.5, 2: 0.4}, {1: 10.0, 2: -5.0}))
+        res = await client.get("/risk", params={"top": 1})
+        assert res.status_code == 200
+        body = res.json()
+        assert body["markets"] == 2
+        assert body["gross_exposure"] == pytest.approx(7.0)
+        assert len(body["top_contributors"]) == 1
+    finally:
+        risk_monitor.reset()
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.readiness import Readiness
+from db import init_db
+from polymarket_client import close_http_client, get_http_client
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_app_defers_crypto_and_http_stacks():
+    code = "import sys, main; print(sorted(m for m in ('eth_account', 'httpx', 'numpy') if m in sys.modules))"
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_URL": "sqlite+aiosqlite:///:memory:"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert out.stdout.strip() == "[]"
+
+
+@pytest.mark.asyncio
+async def test_init_db_creates_only_missing_tables(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{(tmp_path / 'schema.sqlite').as_posix()}")
+    try:
+        created = await init_db(engine)
+        assert {"markets", "pnl_ticks", "bot_state", "wallet_auth"} <= set(created)
+        assert await init_db(engine) == []
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_ready_endpoint_waits_for_all_checks(client, monkeypatch):
+    state = Readiness()
+    monkeypatch.setattr("main.readiness", state)
+    state.expect("database", "crypto")
+
+    assert (await client.get("/ready")).status_code == 503
+
+    assert await state.check("database", asyncio.sleep(0))
+    assert not await state.check("crypto", _boom())
+    res = await client.get("/ready")
+    assert res.status_code == 503
+    assert res.json()["checks"]["crypto"]["status"] == "failed"
+
+    assert await state.check("crypto", asyncio.sleep(0))
+    res = await client.get("/ready")
+    assert res.status_code == 200
+    assert res.json()["ready"] is True
+    assert (await client.get("/health")).json() == {"ok": True}
+
+
+async def _boom():
+    raise RuntimeError("not yet")
+
+
+@pytest.mark.asyncio
+async def test_failed_checks_are_retried_until_they_pass():
+    state = Readiness()
+    state.expect("database")
+    outcomes = [_boom, _boom, lambda: asyncio.sleep(0)]
+
+    await state.check_until_ok("database", lambda: outcomes.pop(0)(), initial_delay=0.001)
+
+    assert state.ready
+    assert outcomes == []
+
+
+@pytest.mark.asyncio
+async def test_http_client_is_shared_per_event_loop():
+    first = get_http_client()
+    try:
+        assert get_http_client() is first
+    finally:
+        await close_http_client()
+    assert first.is_closed
@@ -0,0 +1,81 @@
+import json
+import time
+
+from core.tracing import FileSpanExporter, OtlpHttpSpanExporter, Span, Tracer
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+def test_disabled_tracer_yields_no_span():
+    tracer = Tracer()
+    with tracer.span("noop") as span:
+        assert span is None
+    assert not tracer.enabled
+
+
+def test_child_spans_share_trace_and_reference_parent():
+    exporter = ListExporter()
+    tracer = Tracer(exporter, batch_size=1)
+
+    with tracer.span("root", market_id="1") as root:
+        with tracer.span("child", parent=root) as child:
+            pass
+
+    assert child.trace_id == root.trace_id
+    assert child.parent_span_id == root.span_id
+    assert child.end_ns >= child.start_ns
+    assert root.attributes == {"market_id": "1"}
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    span = Span(name="tick", trace_id="a" * 32, span_id="b" * 16, start_ns=1, end_ns=2)
+
+    FileSpanExporter(str(path)).export([span, span])
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["name"] == "tick"
+
+
+def test_otlp_encoding_marks_errors():
+    span = Span(name="tick", trace_id="a" * 32, span_id="b" * 16, error="boom", attributes={"n": 1})
+
+    body = OtlpHttpSpanExporter("http://collector")._encode([span])
+
+    (encoded,) = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert encoded["status"]["code"] == 2
+    assert encoded["attributes"] == [{"key": "n", "value": {"intValue": "1"}}]
+
+
+def test_small_batches_go_out_on_the_flush_interval():
+    exporter = ListExporter()
+    tracer = Tracer(exporter, batch_size=256, flush_interval=0.05)
+
+    with tracer.span("lonely"):
+        pass
+    deadline = time.monotonic() + 2.0
+    while not exporter.spans and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert [span.name for span in exporter.spans] == ["lonely"]
+    tracer.shutdown()
+
+
+def test_shutdown_exports_buffered_spans():
+    exporter = ListExporter()
+    tracer = Tracer(exporter, batch_size=256, flush_interval=60.0)
+
+    for idx in range(3):
+        with tracer.span(f"tick-{idx}"):
+            pass
+    assert exporter.spans == []
+    tracer.shutdown()
+
+    assert [span.name for span in exporter.spans] == ["tick-0", "tick-1", "tick-2"]